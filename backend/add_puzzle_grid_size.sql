@@ -0,0 +1,6 @@
+-- Add grid dimensions to crosswordpuzzlebank so puzzles larger than 9x9 can be stored
+-- Run this SQL script manually in your MySQL client before deploying the matching backend
+
+ALTER TABLE crosswordpuzzlebank
+    ADD COLUMN gridRows INT NULL DEFAULT 9,
+    ADD COLUMN gridCols INT NULL DEFAULT 9;
@@ -0,0 +1,6 @@
+-- Index crosswordpuzzleresults.createdDate so time-bucketed leaderboards (today, week,
+-- event windows) read a half-open createdDate range instead of scanning the table.
+-- Run this SQL script manually in your MySQL client before deploying the matching backend
+
+ALTER TABLE crosswordpuzzleresults
+    ADD INDEX idx_results_created_email (createdDate, Email);
@@ -0,0 +1,10 @@
+-- Add sessionID (holding the submit's attemptID) and the scored word counts to
+-- crosswordpuzzleresults so repeated submits of one attempt are idempotent and get
+-- the stored result back.
+-- Run this SQL script manually in your MySQL client before deploying the matching backend
+
+ALTER TABLE crosswordpuzzleresults
+    ADD COLUMN sessionID VARCHAR(100) NULL,
+    ADD COLUMN correctWords INT NULL,
+    ADD COLUMN totalWords INT NULL,
+    ADD UNIQUE INDEX uniq_results_session_puzzle (sessionID, puzzleID);
@@ -0,0 +1,9 @@
+-- Add typed shadow columns for gameScore/duration so aggregations stop casting strings per row
+-- Run this SQL script manually in your MySQL client, then deploy with RESULTS_TYPED_COLUMNS=write
+-- so new rows fill the columns, fill existing rows with: python manage.py backfill_typed_columns
+-- and finally set RESULTS_TYPED_COLUMNS=true to read them
+
+ALTER TABLE crosswordpuzzleresults
+    ADD COLUMN scoreValue DOUBLE NULL,
+    ADD COLUMN durationSeconds INT NULL,
+    ADD INDEX idx_results_email_score (Email, scoreValue);
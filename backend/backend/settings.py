@@ -1,5 +1,9 @@
 import os
 from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.dateparse import parse_datetime
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,6 +52,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'hackathon.middleware.CorsMiddleware',
+    'hackathon.middleware.ReadYourWritesMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -90,6 +95,64 @@ if not DATABASES['default'].get('NAME'):
         'NAME': ':memory:',
     }
 
+# Puzzle, result and leaderboard tables (hackathon.db_router); without
+# STUDENT_DB_NAME they stay in default. Migrate with --database student.
+if os.getenv('STUDENT_DB_NAME'):
+    DATABASES['student'] = {
+        'ENGINE': 'django.db.backends.mysql',
+        'NAME': os.getenv('STUDENT_DB_NAME'),
+        'USER': os.getenv('STUDENT_DB_USER', os.getenv('DB_USER')),
+        'PASSWORD': os.getenv('STUDENT_DB_PASSWORD', os.getenv('DB_PASSWORD')),
+        'HOST': os.getenv('STUDENT_DB_HOST', os.getenv('DB_HOST')),
+        'PORT': os.getenv('STUDENT_DB_PORT', os.getenv('DB_PORT')),
+    }
+
+# Persistent connections, or (DB_POOL) a per-process connection pool for the
+# MySQL aliases, see hackathon.db_pool. Pooling keeps CONN_MAX_AGE at 0:
+# each request hands its connection back to the pool.
+DB_POOL = os.getenv('DB_POOL', '').strip().lower() in {'1', 'true', 'yes'}
+for _alias in ('default', 'student'):
+    if _alias not in DATABASES or DATABASES[_alias]['ENGINE'] != 'django.db.backends.mysql':
+        continue
+    DATABASES[_alias]['CONN_HEALTH_CHECKS'] = True
+    if not DB_POOL:
+        DATABASES[_alias]['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', '0'))
+        continue
+    DATABASES[_alias]['ENGINE'] = 'hackathon.db_pool'
+    DATABASES[_alias]['POOL'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+        # Seconds a request waits for a free connection before failing
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+        'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+        'idle_timeout': float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300')),
+        'pre_ping': os.getenv('DB_POOL_PRE_PING', '1').strip().lower() in {'1', 'true', 'yes'},
+    }
+
+# Read replicas of that database, "host[:port][=weight],...". Leaderboard,
+# analytics and history reads are spread over the healthy ones by weight;
+# a client stays on the primary for STICKY seconds after it writes.
+DATABASE_REPLICAS = {}
+_replica_source = DATABASES.get('student', DATABASES['default'])
+for _number, _replica in enumerate(x.strip() for x in os.getenv('DB_REPLICAS', '').split(',') if x.strip()):
+    _address, _, _weight = _replica.partition('=')
+    _host, _, _port = _address.partition(':')
+    DATABASES[f'replica{_number + 1}'] = {
+        **_replica_source,
+        'USER': os.getenv('DB_REPLICA_USER', _replica_source.get('USER')),
+        'PASSWORD': os.getenv('DB_REPLICA_PASSWORD', _replica_source.get('PASSWORD')),
+        'HOST': _host,
+        'PORT': _port or _replica_source.get('PORT'),
+        # A replica that is down must not hold a request for long
+        'OPTIONS': {'connect_timeout': int(os.getenv('DB_REPLICA_CONNECT_TIMEOUT', '2'))},
+        'TEST': {'MIRROR': 'student' if 'student' in DATABASES else 'default'},
+    }
+    DATABASE_REPLICAS[f'replica{_number + 1}'] = int(_weight or 1)
+DATABASE_REPLICA_CHECK_SECONDS = float(os.getenv('DB_REPLICA_CHECK_SECONDS', '10'))
+DATABASE_REPLICA_STICKY_SECONDS = float(os.getenv('DB_REPLICA_STICKY_SECONDS', '5'))
+
+DATABASE_ROUTERS = ['hackathon.db_router.HackathonDbRouter']
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -115,6 +178,81 @@ STATICFILES_DIRS = [BASE_DIR.parent / 'frontend']
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Compiled puzzle cache (hackathon.puzzle_cache)
+PUZZLE_CACHE_MAX_SIZE = int(os.getenv('PUZZLE_CACHE_MAX_SIZE', '256'))
+PUZZLE_CACHE_REVALIDATE_SECONDS = float(os.getenv('PUZZLE_CACHE_REVALIDATE_SECONDS', '30'))
+# Cache-Control max-age for puzzle responses; clients revalidate with If-None-Match afterwards
+PUZZLE_HTTP_MAX_AGE = int(os.getenv('PUZZLE_HTTP_MAX_AGE', '60'))
+# Serve puzzles from pre-encoded bytes without DRF rendering (see bench_puzzle_api.py)
+PUZZLE_FAST_RESPONSE = os.getenv('PUZZLE_FAST_RESPONSE', '').strip().lower() in {'1', 'true', 'yes'}
+# Upper bound on ids accepted by the round-pack endpoint, and named round sequences it can serve
+PUZZLE_PACK_MAX_SIZE = int(os.getenv('PUZZLE_PACK_MAX_SIZE', '20'))
+PUZZLE_EVENT_ROUNDS = {
+    'default': [x.strip() for x in os.getenv('PUZZLE_DEFAULT_ROUNDS', '101,102,103,105,106').split(',') if x.strip()],
+}
+
+# Write-behind persistence for submissions (hackathon.write_behind)
+SUBMISSION_WRITE_BEHIND = os.getenv('SUBMISSION_WRITE_BEHIND', '').strip().lower() in {'1', 'true', 'yes'}
+SUBMISSION_SPOOL_DIR = Path(os.getenv('SUBMISSION_SPOOL_DIR', str(BASE_DIR / 'submission_spool')))
+SUBMISSION_SPOOL_FSYNC = os.getenv('SUBMISSION_SPOOL_FSYNC', '').strip().lower() in {'1', 'true', 'yes'}
+SUBMISSION_QUEUE_MAX_SIZE = int(os.getenv('SUBMISSION_QUEUE_MAX_SIZE', '10000'))
+SUBMISSION_FLUSH_BATCH_SIZE = int(os.getenv('SUBMISSION_FLUSH_BATCH_SIZE', '200'))
+SUBMISSION_FLUSH_INTERVAL_SECONDS = float(os.getenv('SUBMISSION_FLUSH_INTERVAL_SECONDS', '0.5'))
+
+# Recent (sessionID, puzzleID) submit responses kept in memory for duplicate submits
+SUBMISSION_IDEMPOTENCY_CACHE_SIZE = int(os.getenv('SUBMISSION_IDEMPOTENCY_CACHE_SIZE', '50000'))
+
+# Typed scoreValue/durationSeconds columns (add_results_typed_columns.sql). Unset: the
+# model leaves them out of every query. 'write': inserts fill them while
+# backfill_typed_columns runs. true: aggregations also read scoreValue instead of
+# casting gameScore per row.
+_typed_columns = os.getenv('RESULTS_TYPED_COLUMNS', '').strip().lower()
+RESULTS_TYPED_COLUMNS = _typed_columns in {'1', 'true', 'yes'}
+RESULTS_TYPED_COLUMNS_WRITE = RESULTS_TYPED_COLUMNS or _typed_columns == 'write'
+
+# Day/week leaderboard buckets are [midnight, midnight) ranges in this timezone.
+# Event windows are [start, end); naive ISO datetimes are read in LEADERBOARD_TIME_ZONE.
+# Changing either needs a rebuild_leaderboard run.
+LEADERBOARD_TIME_ZONE = os.getenv('LEADERBOARD_TIME_ZONE', TIME_ZONE)
+
+def _parse_event_window(value: str, time_zone: str):
+    """(start, end) datetimes of a "start/end" window, e.g. 2026-03-14T09:00/2026-03-14T18:00."""
+    bounds = value.split('/')
+    try:
+        moments = [parse_datetime(bound.strip()) for bound in bounds]
+    except ValueError:
+        moments = [None]
+    if len(bounds) != 2 or None in moments:
+        raise ImproperlyConfigured(f'LEADERBOARD_EVENT_WINDOW must be two ISO datetimes as "start/end", got {value!r}')
+    start, end = (moment if moment.tzinfo else moment.replace(tzinfo=ZoneInfo(time_zone)) for moment in moments)
+    if start >= end:
+        raise ImproperlyConfigured(f'LEADERBOARD_EVENT_WINDOW must start before it ends, got {value!r}')
+    return tuple(moments)
+
+
+LEADERBOARD_EVENT_WINDOWS = {}
+if os.getenv('LEADERBOARD_EVENT_WINDOW'):
+    LEADERBOARD_EVENT_WINDOWS['default'] = _parse_event_window(os.getenv('LEADERBOARD_EVENT_WINDOW'), LEADERBOARD_TIME_ZONE)
+
+# Serve the leaderboard from leaderboard_rollup (run rebuild_leaderboard once before enabling)
+LEADERBOARD_USE_ROLLUPS = os.getenv('LEADERBOARD_USE_ROLLUPS', '').strip().lower() in {'1', 'true', 'yes'}
+
+# Answer /leaderboard and /leaderboard/search from an in-process rank index,
+# reloaded from the database every LEADERBOARD_RANK_INDEX_RELOAD_SECONDS
+LEADERBOARD_RANK_INDEX = os.getenv('LEADERBOARD_RANK_INDEX', '').strip().lower() in {'1', 'true', 'yes'}
+LEADERBOARD_RANK_INDEX_RELOAD_SECONDS = float(os.getenv('LEADERBOARD_RANK_INDEX_RELOAD_SECONDS', '30'))
+
+# Micro-cache for /leaderboard: fresh for TTL seconds, or until a submission is
+# stored and the entry is MIN_REFRESH seconds old; TTL 0 disables it
+LEADERBOARD_CACHE_TTL_SECONDS = float(os.getenv('LEADERBOARD_CACHE_TTL_SECONDS', '2'))
+LEADERBOARD_CACHE_MIN_REFRESH_SECONDS = float(os.getenv('LEADERBOARD_CACHE_MIN_REFRESH_SECONDS', '0.5'))
+
+# Live leaderboard (SSE, ASGI only). LocalBackend sees submissions stored by this
+# process; hackathon.live.DatabaseBackend polls the newest result id so every
+# worker sees all submissions.
+LEADERBOARD_LIVE_BACKEND = os.getenv('LEADERBOARD_LIVE_BACKEND', 'hackathon.live.LocalBackend')
+LEADERBOARD_LIVE_TICK_SECONDS = float(os.getenv('LEADERBOARD_LIVE_TICK_SECONDS', '1'))
+
 # Django REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [],
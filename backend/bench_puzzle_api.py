@@ -0,0 +1,71 @@
+"""
+Compare the DRF puzzle view with the pre-encoded fast path (PUZZLE_FAST_RESPONSE),
+with and without answers, and time the check-word endpoint (target: p99 < 5 ms).
+
+Runs in-process against the configured database with a warm puzzle cache:
+
+    python bench_puzzle_api.py [puzzle_id] [iterations]
+"""
+import json
+import os
+import sys
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup()
+
+from django.test import RequestFactory
+
+from hackathon.puzzle_cache import get_compiled_puzzle
+from hackathon.views import ApiCheckWordView, get_puzzle, get_puzzle_fast
+
+
+def _render(response):
+    if hasattr(response, 'render'):
+        response.render()
+    return response
+
+
+def bench(name, make_request, call, iterations):
+    _render(call(make_request()))
+
+    timings = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        request = make_request()
+        t0 = time.perf_counter()
+        response = _render(call(request))
+        timings.append(time.perf_counter() - t0)
+        if response.status_code != 200:
+            raise SystemExit(f'{name}: unexpected status {response.status_code}')
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1000
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000
+    print(f'{name:<16} {iterations / elapsed:>10.0f} req/s   p50 {p50:.3f} ms   p99 {p99:.3f} ms')
+
+
+if __name__ == '__main__':
+    puzzle_id = sys.argv[1] if len(sys.argv) > 1 else '101'
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    factory = RequestFactory()
+    for query in ('', '?answers=0'):
+        url = f'/api/crossword/puzzle/{puzzle_id}{query}'
+        bench(f'drf{query}', lambda: factory.get(url), lambda request: get_puzzle(request, puzzle_id), iterations)
+        bench(f'fast{query}', lambda: factory.get(url), lambda request: get_puzzle_fast(request, puzzle_id), iterations)
+
+    compiled = get_compiled_puzzle(puzzle_id)
+    hint = next((h for h in compiled.across_hints if isinstance(h, dict) and 'answer' in h), None)
+    if hint is not None:
+        body = json.dumps({'puzzleID': puzzle_id, 'direction': 'across', 'cellID': hint['cellID'], 'answer': hint['answer']})
+        check_word = ApiCheckWordView.as_view()
+        bench(
+            'check-word',
+            lambda: factory.post('/api/crossword/check-word', body, content_type='application/json'),
+            check_word,
+            iterations,
+        )
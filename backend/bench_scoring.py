@@ -0,0 +1,85 @@
+"""
+Microbenchmark for the compiled answer key against the original per-request
+scoring loops, checking that both agree on every generated submission, then
+timing the compiled key across grid sizes (cost should grow with cell count):
+
+    python bench_scoring.py [iterations]
+"""
+import random
+import string
+import sys
+import time
+
+from hackathon.scoring import GridGeometry, compile_answer_key
+
+
+def legacy_count(across_hints, down_hints, submitted_grid, stride=9):
+    correct_words_count = 0
+    total_words_count = 0
+    for hints, step in ((across_hints, 1), (down_hints, stride)):
+        try:
+            total_words_count += len(hints)
+            for hint in hints:
+                if 'answer' in hint and 'cellID' in hint:
+                    start_cell = int(hint['cellID'])
+                    answer_text = hint['answer'].upper()
+                    word_correct = True
+                    for i, char in enumerate(answer_text):
+                        if submitted_grid.get(str(start_cell + (i * step)), '').upper() != char:
+                            word_correct = False
+                            break
+                    if word_correct:
+                        correct_words_count += 1
+        except Exception:
+            pass
+    return correct_words_count, total_words_count
+
+
+def make_puzzle(rng, size=9):
+    letters = {cell: rng.choice(string.ascii_uppercase) for cell in range(1, size * size + 1)}
+    across, down = [], []
+    for row in range(size):
+        start = row * size + 1
+        across.append({'cellID': str(start), 'answer': ''.join(letters[start + i] for i in range(size)).lower()})
+    for col in range(1, size + 1):
+        down.append({'cellID': str(col), 'answer': ''.join(letters[col + i * size] for i in range(size))})
+    return across, down, letters
+
+
+def make_submission(rng, letters, error_rate):
+    grid = {}
+    for cell, letter in letters.items():
+        roll = rng.random()
+        if roll < error_rate / 2:
+            continue
+        grid[str(cell)] = rng.choice(string.ascii_letters) if roll < error_rate else rng.choice([letter, letter.lower()])
+    return grid
+
+
+def timed(fn, grids):
+    started = time.perf_counter()
+    for grid in grids:
+        fn(grid)
+    return (time.perf_counter() - started) / len(grids) * 1e6
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = random.Random(7)
+
+    for size in (9, 13, 15, 21):
+        across, down, letters = make_puzzle(rng, size)
+        key = compile_answer_key(across, down, geometry=GridGeometry(rows=size, cols=size))
+        grids = [make_submission(rng, letters, rng.choice([0.0, 0.02, 0.2, 0.8])) for _ in range(iterations)]
+
+        for grid in grids:
+            scored = key.score(grid)
+            if (scored.correct_words, scored.total_words) != legacy_count(across, down, grid, stride=size):
+                raise SystemExit(f'Mismatch for {grid!r}')
+
+        legacy_us = timed(lambda grid: legacy_count(across, down, grid, stride=size), grids)
+        compiled_us = timed(key.score, grids)
+        print(
+            f'{size:>2}x{size:<2}  legacy {legacy_us:8.2f} us   compiled {compiled_us:8.2f} us'
+            f'   ({legacy_us / compiled_us:.1f}x, {compiled_us * 1000 / (size * size):.0f} ns/cell)'
+        )
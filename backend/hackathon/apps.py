@@ -1,6 +1,26 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+
+def _serving() -> bool:
+    """False for management commands other than the serving process of runserver."""
+    if os.path.basename(sys.argv[0]) != 'manage.py' or len(sys.argv) < 2:
+        return True
+    return sys.argv[1] == 'runserver' and (os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv)
 
 
 class HackathonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hackathon'
+
+    def ready(self):
+        from . import puzzle_cache  # noqa: F401  (registers cache invalidation signals)
+
+        if settings.SUBMISSION_WRITE_BEHIND and _serving():
+            # Replays spools of dead processes now rather than on the first submit
+            from .write_behind import submission_writer
+
+            submission_writer().start()
@@ -0,0 +1,260 @@
+"""
+Connection pooling for the MySQL aliases: set ENGINE to ``hackathon.db_pool``
+and the pool options under ``POOL`` in the alias settings (see settings.py).
+
+Django still opens and closes its connection once per request (CONN_MAX_AGE
+0); closing hands the MySQL connection back to a per-process pool shared by
+every thread, so WSGI worker threads and the ASGI sync executor reuse warm
+connections instead of connecting per request.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+
+from django.db import OperationalError
+
+_pools: dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """
+    Bounded pool of DB-API connections.
+
+    At most ``max_size`` connections are open; ``acquire`` waits up to
+    ``timeout`` seconds for one to be released before raising PoolTimeout.
+    Idle connections are pinged before reuse (``pre_ping``), closed once
+    they are ``max_lifetime`` seconds old or idle for ``idle_timeout`` seconds,
+    and a reaper thread keeps ``min_size`` of them open.
+    """
+
+    def __init__(
+        self,
+        connect,
+        ping,
+        min_size: int = 0,
+        max_size: int = 10,
+        timeout: float = 10.0,
+        max_lifetime: float = 1800.0,
+        idle_timeout: float = 300.0,
+        pre_ping: bool = True,
+    ):
+        self.connect = connect
+        self.ping = ping
+        self.max_size = max(int(max_size), 1)
+        self.min_size = min(max(int(min_size), 0), self.max_size)
+        self.timeout = float(timeout)
+        self.max_lifetime = float(max_lifetime)
+        self.idle_timeout = float(idle_timeout)
+        self.pre_ping = pre_ping
+        self._pid = os.getpid()
+        # (connection, created_at, released_at), most recently released last
+        self._idle: deque = deque()
+        self._created_at: dict[int, float] = {}
+        self._size = 0
+        self._cond = threading.Condition()
+        self._reaper: threading.Thread | None = None
+        self._metrics = {
+            'acquired': 0,
+            'created': 0,
+            'closed': 0,
+            'waits': 0,
+            'waitMsTotal': 0.0,
+            'waitMsMax': 0.0,
+            'timeouts': 0,
+            'pingFailures': 0,
+            'reaped': 0,
+        }
+
+    def acquire(self):
+        self._check_fork()
+        started = time.monotonic()
+        waited = False
+        while True:
+            with self._cond:
+                self._start_reaper()
+                while not self._idle and self._size >= self.max_size:
+                    remaining = self.timeout - (time.monotonic() - started)
+                    if remaining <= 0:
+                        self._metrics['timeouts'] += 1
+                        raise PoolTimeout(f'No database connection free within {self.timeout:g}s')
+                    waited = True
+                    self._cond.wait(remaining)
+                entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    self._size += 1
+
+            if entry is None:
+                connection = self._open()
+                break
+            connection, created_at, _ = entry
+            if time.monotonic() - created_at >= self.max_lifetime:
+                self._discard(connection)
+                continue
+            if not self.pre_ping or self._ping(connection):
+                break
+            self._metrics['pingFailures'] += 1
+            self._discard(connection)
+
+        wait_ms = (time.monotonic() - started) * 1000
+        with self._cond:
+            self._metrics['acquired'] += 1
+            if waited:
+                self._metrics['waits'] += 1
+                self._metrics['waitMsTotal'] += wait_ms
+                self._metrics['waitMsMax'] = max(self._metrics['waitMsMax'], wait_ms)
+        return connection
+
+    def release(self, connection, reusable: bool = True) -> None:
+        if self._check_fork():
+            return
+        created_at = self._created_at.get(id(connection))
+        if not reusable or created_at is None or time.monotonic() - created_at >= self.max_lifetime:
+            self._discard(connection)
+            return
+        with self._cond:
+            self._idle.append((connection, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def metrics(self) -> dict:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                **self._metrics,
+                'size': self._size,
+                'idle': idle,
+                'inUse': self._size - idle,
+                'minSize': self.min_size,
+                'maxSize': self.max_size,
+            }
+
+    def reap(self) -> None:
+        """Close expired idle connections, then top the pool up to min_size."""
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            keep = deque()
+            for entry in self._idle:
+                connection, created_at, released_at = entry
+                too_old = now - created_at >= self.max_lifetime
+                too_idle = now - released_at >= self.idle_timeout and self._size - len(expired) > self.min_size
+                if too_old or too_idle:
+                    expired.append(connection)
+                else:
+                    keep.append(entry)
+            self._idle = keep
+            self._metrics['reaped'] += len(expired)
+        for connection in expired:
+            self._discard(connection)
+
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                connection = self._open()
+            except Exception:
+                return
+            self.release(connection)
+
+    def _open(self):
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created_at[id(connection)] = time.monotonic()
+            self._metrics['created'] += 1
+        return connection
+
+    def _ping(self, connection) -> bool:
+        try:
+            self.ping(connection)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._created_at.pop(id(connection), None)
+            self._size -= 1
+            self._metrics['closed'] += 1
+            self._cond.notify()
+
+    def _check_fork(self) -> bool:
+        # Sockets inherited from a parent process (e.g. gunicorn --preload)
+        # belong to the parent: forget them without closing.
+        if self._pid == os.getpid():
+            return False
+        with self._cond:
+            self._pid = os.getpid()
+            self._idle.clear()
+            self._created_at.clear()
+            self._size = 0
+            self._reaper = None
+        return True
+
+    def _start_reaper(self) -> None:
+        if self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap_forever, name='db-pool-reaper', daemon=True)
+            self._reaper.start()
+
+    def _reap_forever(self) -> None:
+        interval = max(min(self.idle_timeout, self.max_lifetime) / 2, 1.0)
+        while True:
+            try:
+                self.reap()
+            except Exception:
+                pass
+            time.sleep(interval)
+
+
+def pool_for(alias: str, settings_dict: dict, connect, ping) -> ConnectionPool:
+    pool = _pools.get(alias)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                pool = _pools[alias] = ConnectionPool(connect, ping, **settings_dict.get('POOL', {}))
+    return pool
+
+
+def pool_metrics() -> dict:
+    return {alias: pool.metrics() for alias, pool in _pools.items()}
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Takes connections from the alias's ConnectionPool and returns them on
+    close. A connection closed mid-transaction or with autocommit changed is
+    discarded instead of reused.
+    """
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        pool = pool_for(self.alias, self.settings_dict, lambda: connect(conn_params), self._ping_connection)
+        return pool.acquire()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        reusable = not self.in_atomic_block and self.autocommit == self.settings_dict['AUTOCOMMIT']
+        _pools[self.alias].release(self.connection, reusable=reusable)
+
+    def _ping_connection(self, connection) -> None:
+        connection.ping()
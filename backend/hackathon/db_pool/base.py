@@ -0,0 +1,7 @@
+from django.db.backends.mysql import base as mysql
+
+from . import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, mysql.DatabaseWrapper):
+    pass
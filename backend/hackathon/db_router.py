@@ -1,3 +1,107 @@
+from __future__ import annotations
+
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+_use_primary = contextvars.ContextVar('use_primary', default=False)
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary instead of a replica inside this block."""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def hackathon_database() -> str:
+    """Alias of the hackathon tables: 'student' when configured, else 'default'."""
+    return 'student' if 'student' in settings.DATABASES else 'default'
+
+
+class ReplicaSet:
+    """
+    Weighted choice among read replicas ({alias: weight}).
+
+    Each replica is probed with ``SELECT 1`` at most once per ``check_seconds``
+    (by whichever request finds the last probe stale); one that fails is left
+    out until a later probe succeeds. With no healthy replica reads fall back
+    to the primary.
+    """
+
+    def __init__(self, weights: dict[str, int], check_seconds: float = 10.0):
+        self.weights = {alias: int(weight) for alias, weight in weights.items() if int(weight) > 0}
+        self.check_seconds = float(check_seconds)
+        self._health = {alias: (True, float('-inf')) for alias in self.weights}
+        self._lock = threading.Lock()
+        self._reads = dict.fromkeys(self.weights, 0)
+        self._metrics = {'primaryReads': 0, 'fallbacks': 0, 'checks': 0, 'failedChecks': 0}
+
+    def choose(self, primary: str) -> str:
+        if not self.weights:
+            return primary
+        if _use_primary.get() or connections[primary].in_atomic_block:
+            self._metrics['primaryReads'] += 1
+            return primary
+
+        healthy = [alias for alias in self.weights if self._healthy(alias)]
+        if not healthy:
+            self._metrics['fallbacks'] += 1
+            return primary
+        alias = random.choices(healthy, weights=[self.weights[alias] for alias in healthy])[0]
+        self._reads[alias] += 1
+        return alias
+
+    def metrics(self) -> dict:
+        return {
+            **self._metrics,
+            'replicas': {
+                alias: {'weight': weight, 'healthy': self._health[alias][0], 'reads': self._reads[alias]}
+                for alias, weight in self.weights.items()
+            },
+        }
+
+    def _healthy(self, alias: str) -> bool:
+        healthy, checked_at = self._health[alias]
+        now = time.monotonic()
+        if now - checked_at < self.check_seconds:
+            return healthy
+        with self._lock:
+            healthy, checked_at = self._health[alias]
+            if now - checked_at < self.check_seconds:
+                return healthy
+            # Claim the probe so concurrent requests keep the last known state
+            self._health[alias] = (healthy, now)
+        healthy = self._probe(alias)
+        self._health[alias] = (healthy, time.monotonic())
+        return healthy
+
+    def _probe(self, alias: str) -> bool:
+        self._metrics['checks'] += 1
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            return True
+        except DatabaseError:
+            self._metrics['failedChecks'] += 1
+            connections[alias].close()
+            return False
+
+
+replicas = ReplicaSet(
+    getattr(settings, 'DATABASE_REPLICAS', {}),
+    getattr(settings, 'DATABASE_REPLICA_CHECK_SECONDS', 10),
+)
+
+
 class HackathonDbRouter:
     CORE_MODEL_NAMES = {
         'appuser',
@@ -5,24 +109,30 @@ class HackathonDbRouter:
         'authsession',
         'otpchallenge',
     }
+    # Leaderboard, analytics and history reads; served by a replica unless the
+    # client wrote recently (see hackathon.middleware.ReadYourWritesMiddleware)
+    REPLICA_MODEL_NAMES = {
+        'crosswordpuzzleresults',
+        'leaderboardrollup',
+    }
 
-    def db_for_read(self, model, **hints):
+    def _database(self, model):
         if getattr(model._meta, 'app_label', None) != 'hackathon':
             return None
 
         model_name = getattr(model._meta, 'model_name', '').lower()
         if model_name in self.CORE_MODEL_NAMES:
             return 'default'
-        return 'student'
+        return hackathon_database()
 
-    def db_for_write(self, model, **hints):
-        if getattr(model._meta, 'app_label', None) != 'hackathon':
-            return None
+    def db_for_read(self, model, **hints):
+        database = self._database(model)
+        if database is None or getattr(model._meta, 'model_name', '').lower() not in self.REPLICA_MODEL_NAMES:
+            return database
+        return replicas.choose(database)
 
-        model_name = getattr(model._meta, 'model_name', '').lower()
-        if model_name in self.CORE_MODEL_NAMES:
-            return 'default'
-        return 'student'
+    def db_for_write(self, model, **hints):
+        return self._database(model)
 
     def allow_relation(self, obj1, obj2, **hints):
         if getattr(obj1._meta, 'app_label', None) != 'hackathon' or getattr(obj2._meta, 'app_label', None) != 'hackathon':
@@ -40,6 +150,8 @@ class HackathonDbRouter:
         return None
 
     def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas.weights:
+            return False
         if app_label != 'hackathon':
             return None
 
@@ -53,4 +165,4 @@ class HackathonDbRouter:
 
         if str(model_name).lower() in self.CORE_MODEL_NAMES:
             return db == 'default'
-        return db == 'student'
+        return db == hackathon_database()
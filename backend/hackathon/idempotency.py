@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import Crosswordpuzzleresults
+from .scoring import parse_number
+
+
+class RecentSubmissions:
+    """Bounded LRU of submit responses keyed by (attemptID, puzzleID)."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max(1, int(max_size))
+        self._entries: OrderedDict[tuple[str, str], dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str]) -> dict | None:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: tuple[str, str], response: dict) -> None:
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+recent_submissions = RecentSubmissions(getattr(settings, 'SUBMISSION_IDEMPOTENCY_CACHE_SIZE', 50000))
+
+
+def submission_key(attempt_id, puzzle_id) -> tuple[str, str] | None:
+    """
+    Idempotency key of a submit. The client makes a new attemptID whenever a
+    round is (re)started, so only resends of one attempt share a key.
+    """
+    attempt_id = str(attempt_id or '').strip()
+    if not attempt_id or puzzle_id is None:
+        return None
+    return attempt_id, str(puzzle_id)
+
+
+def stored_submission_response(key: tuple[str, str]) -> dict | None:
+    """
+    Return the response of an earlier submission with the same key, from the
+    in-memory cache or the stored row (unique on attemptID, puzzleID), exactly
+    as it was scored then. Nothing is scored again.
+    """
+    response = recent_submissions.get(key)
+    if response is not None:
+        return response
+
+    row = (
+        Crosswordpuzzleresults.objects.filter(attemptid=key[0], puzzleid=key[1])
+        .values('gamescore', 'correct_words', 'total_words', 'status')
+        .first()
+    )
+    if row is None:
+        return None
+
+    response = {
+        'score': parse_number(row['gamescore']),
+        'correctWords': row['correct_words'],
+        'totalWords': row['total_words'],
+        'allWordsCorrect': row['status'] == 1,
+        'message': 'Submission successful',
+    }
+    recent_submissions.put(key, response)
+    return response
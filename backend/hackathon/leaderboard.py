@@ -0,0 +1,445 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, router, transaction
+from django.db.models import Count, F, Max, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, TruncDate, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .db_router import use_primary
+from .live import live_backend
+from .micro_cache import MicroCache
+from .models import Crosswordpuzzleresults, LeaderboardRollup
+from .rank_index import RankedPlayer, RankIndex
+from .result_columns import score_expression
+from .scoring import parse_number
+
+
+OVERALL = 'overall'
+DAY_PREFIX = 'day:'
+WEEK_PREFIX = 'week:'
+EVENT_PREFIX = 'event:'
+
+
+def event_timezone() -> ZoneInfo:
+    return ZoneInfo(getattr(settings, 'LEADERBOARD_TIME_ZONE', settings.TIME_ZONE))
+
+
+def local_date(moment: datetime | None = None) -> date:
+    return (moment or timezone.now()).astimezone(event_timezone()).date()
+
+
+def _midnight(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=event_timezone())
+
+
+def day_bucket(day: date) -> str:
+    return f'{DAY_PREFIX}{day.isoformat()}'
+
+
+def week_bucket(day: date) -> str:
+    return f'{WEEK_PREFIX}{(day - timedelta(days=day.weekday())).isoformat()}'
+
+
+def today_bucket() -> str:
+    return day_bucket(local_date())
+
+
+def this_week_bucket() -> str:
+    return week_bucket(local_date())
+
+
+def event_windows() -> dict[str, tuple[datetime, datetime]]:
+    """LEADERBOARD_EVENT_WINDOWS as aware [start, end) datetimes; naive values are event-local."""
+    windows = {}
+    for name, bounds in getattr(settings, 'LEADERBOARD_EVENT_WINDOWS', {}).items():
+        start, end = (parse_datetime(value) if isinstance(value, str) else value for value in bounds)
+        windows[name] = tuple(
+            moment if timezone.is_aware(moment) else timezone.make_aware(moment, event_timezone())
+            for moment in (start, end)
+        )
+    return windows
+
+
+def bucket_window(bucket: str) -> tuple[datetime, datetime] | None:
+    """Half-open [start, end) createdDate range of a bucket; None for the overall bucket."""
+    if bucket.startswith(DAY_PREFIX):
+        day = date.fromisoformat(bucket.removeprefix(DAY_PREFIX))
+        return _midnight(day), _midnight(day + timedelta(days=1))
+    if bucket.startswith(WEEK_PREFIX):
+        monday = date.fromisoformat(bucket.removeprefix(WEEK_PREFIX))
+        return _midnight(monday), _midnight(monday + timedelta(days=7))
+    if bucket.startswith(EVENT_PREFIX):
+        return event_windows()[bucket.removeprefix(EVENT_PREFIX)]
+    return None
+
+
+def resolve_bucket(filter_type: str | None, event: str | None = None) -> str | None:
+    """
+    Bucket for a leaderboard ?filter= (today, week, event with ?event=<name>);
+    anything else is the overall board. None for an unknown event.
+    """
+    if filter_type == 'today':
+        return today_bucket()
+    if filter_type == 'week':
+        return this_week_bucket()
+    if filter_type == 'event':
+        name = event or 'default'
+        return f'{EVENT_PREFIX}{name}' if name in event_windows() else None
+    return OVERALL
+
+
+def current_buckets() -> set[str]:
+    return {OVERALL, today_bucket(), this_week_bucket()} | {f'{EVENT_PREFIX}{name}' for name in event_windows()}
+
+
+def buckets_for(moment) -> tuple[str, ...]:
+    if moment is None:
+        return (OVERALL,)
+    day = local_date(moment)
+    events = tuple(
+        f'{EVENT_PREFIX}{name}' for name, (start, end) in event_windows().items() if start <= moment < end
+    )
+    return (OVERALL, day_bucket(day), week_bucket(day)) + events
+
+
+def bucket_results(bucket: str):
+    """Results with an email that count towards a bucket, as a createdDate range filter."""
+    results = Crosswordpuzzleresults.objects.filter(email__isnull=False).exclude(email='')
+    window = bucket_window(bucket)
+    if window is not None:
+        results = results.filter(createddate__gte=window[0], createddate__lt=window[1])
+    return results
+
+
+def apply_results(results) -> None:
+    """
+    Add stored results (Crosswordpuzzleresults instances) to the rollups.
+    Call inside the transaction that inserts them so both commit together.
+    """
+    deltas: dict[tuple[str, str], list] = defaultdict(lambda: [0.0, 0, None])
+    ids = []
+    for result in results:
+        ids.append(result.pk)
+        email = result.email
+        if not email:
+            continue
+        for bucket in buckets_for(result.createddate):
+            delta = deltas[(bucket, email)]
+            delta[0] += float(parse_number(result.gamescore))
+            delta[1] += 1
+            if result.createddate is not None and (delta[2] is None or result.createddate > delta[2]):
+                delta[2] = result.createddate
+
+    for (bucket, email), (score, rounds, last_played) in deltas.items():
+        _upsert(bucket, email, score, rounds, last_played)
+    if deltas:
+        # bulk_create on MySQL leaves pk unset; this transaction sees its own rows
+        newest_id = max(ids) if None not in ids else results_high_water()
+        transaction.on_commit(lambda: _committed(deltas, newest_id), using=router.db_for_write(LeaderboardRollup))
+
+
+def _committed(deltas: dict, newest_id: int) -> None:
+    rank_indexes.apply(deltas, newest_id)
+    leaderboard_cache.bump()
+    live_backend.publish()
+
+
+def _upsert(bucket: str, email: str, score: float, rounds: int, last_played) -> None:
+    changes = {
+        'total_score': F('total_score') + score,
+        'rounds_played': F('rounds_played') + rounds,
+    }
+    if last_played is not None:
+        # MySQL and SQLite return NULL from GREATEST when any argument is NULL
+        changes['last_played'] = Greatest(Coalesce(F('last_played'), Value(last_played)), Value(last_played))
+
+    if LeaderboardRollup.objects.filter(bucket=bucket, email=email).update(**changes):
+        return
+    try:
+        with transaction.atomic(using=router.db_for_write(LeaderboardRollup)):
+            LeaderboardRollup.objects.create(
+                bucket=bucket, email=email, total_score=score, rounds_played=rounds, last_played=last_played
+            )
+    except IntegrityError:
+        # Another request created the row first
+        LeaderboardRollup.objects.filter(bucket=bucket, email=email).update(**changes)
+
+
+def players_after(bucket: str, key: tuple[float, str] | None, limit: int) -> list[LeaderboardRollup]:
+    """
+    Up to ``limit`` rollup rows ranked after ``key`` (total_score, email), or from
+    the top when ``key`` is None. Ties on the score are read separately so each
+    part is a plain range scan of idx_rollup_bucket_score.
+    """
+    rows = LeaderboardRollup.objects.filter(bucket=bucket)
+    if key is None:
+        return list(rows.order_by('-total_score', 'email')[:limit])
+    score, email = key
+    page = list(rows.filter(total_score=score, email__gt=email).order_by('email')[:limit])
+    if len(page) < limit:
+        page += rows.filter(total_score__lt=score).order_by('-total_score', 'email')[: limit - len(page)]
+    return page
+
+
+def players_before(bucket: str, key: tuple[float, str], limit: int) -> list[LeaderboardRollup]:
+    """Up to ``limit`` rollup rows ranked directly before ``key``, in rank order."""
+    score, email = key
+    rows = LeaderboardRollup.objects.filter(bucket=bucket)
+    page = list(rows.filter(total_score=score, email__lt=email).order_by('-email')[:limit])
+    if len(page) < limit:
+        page += rows.filter(total_score__gt=score).order_by('total_score', '-email')[: limit - len(page)]
+    page.reverse()
+    return page
+
+
+def rank_of(bucket: str, key: tuple[float, str]) -> int:
+    score, email = key
+    rows = LeaderboardRollup.objects.filter(bucket=bucket)
+    return rows.filter(total_score__gt=score).count() + rows.filter(total_score=score, email__lt=email).count() + 1
+
+
+def results_high_water() -> int:
+    """Id of the newest stored result (0 when there are none)."""
+    return Crosswordpuzzleresults.objects.aggregate(newest=Max('id'))['newest'] or 0
+
+
+def _totals() -> dict:
+    return dict(
+        totalScore=Sum(score_expression()),
+        roundsPlayed=Count('id'),
+        lastPlayed=Max('createddate'),
+    )
+
+
+def _rollup_rows(bucket_of, entries):
+    for entry in entries:
+        yield LeaderboardRollup(
+            bucket=bucket_of(entry),
+            email=entry['email'],
+            total_score=entry['totalScore'] or 0,
+            rounds_played=entry['roundsPlayed'],
+            last_played=entry['lastPlayed'],
+        )
+
+
+def compute_rollups(up_to_id: int | None = None):
+    """
+    Aggregate the results table into fresh (unsaved) rollup rows for every
+    bucket, counting only results with an id up to ``up_to_id`` when given.
+    """
+    def results_in(bucket):
+        results = bucket_results(bucket)
+        return results if up_to_id is None else results.filter(id__lte=up_to_id)
+
+    tz = event_timezone()
+    totals = _totals()
+    results = results_in(OVERALL)
+
+    yield from _rollup_rows(lambda entry: OVERALL, results.values('email').annotate(**totals).order_by())
+
+    dated = results.filter(createddate__isnull=False)
+    daily = dated.annotate(day=TruncDate('createddate', tzinfo=tz)).values('email', 'day').annotate(**totals).order_by()
+    yield from _rollup_rows(lambda entry: day_bucket(entry['day']), daily)
+
+    weekly = dated.annotate(week=TruncWeek('createddate', tzinfo=tz)).values('email', 'week').annotate(**totals).order_by()
+    yield from _rollup_rows(lambda entry: week_bucket(entry['week'].astimezone(tz).date()), weekly)
+
+    for name in event_windows():
+        bucket = f'{EVENT_PREFIX}{name}'
+        entries = results_in(bucket).values('email').annotate(**totals).order_by()
+        yield from _rollup_rows(lambda entry, bucket=bucket: bucket, entries)
+
+
+def rollups_with_later_results(bucket: str, rows: dict, after_id: int) -> dict[str, LeaderboardRollup]:
+    """
+    Rollup rows of ``bucket`` ({email: row} computed from results up to
+    ``after_id``) plus the results stored since, as fresh rows by email.
+    """
+    expected = {
+        email: LeaderboardRollup(
+            bucket=bucket,
+            email=email,
+            total_score=row.total_score,
+            rounds_played=row.rounds_played,
+            last_played=row.last_played,
+        )
+        for email, row in rows.items()
+    }
+    later = bucket_results(bucket).filter(id__gt=after_id).values('email').annotate(**_totals()).order_by()
+    for row in _rollup_rows(lambda entry: bucket, later):
+        existing = expected.get(row.email)
+        if existing is None:
+            expected[row.email] = row
+            continue
+        existing.total_score += row.total_score
+        existing.rounds_played += row.rounds_played
+        if existing.last_played is None or (row.last_played is not None and row.last_played > existing.last_played):
+            existing.last_played = row.last_played
+    return expected
+
+
+def bucket_totals(bucket: str):
+    """(email, total score, rounds played) of every player in a bucket."""
+    if settings.LEADERBOARD_USE_ROLLUPS:
+        return LeaderboardRollup.objects.filter(bucket=bucket).values_list('email', 'total_score', 'rounds_played')
+
+    return (
+        bucket_results(bucket)
+        .values('email')
+        .annotate(totalScore=Sum(score_expression()), roundsPlayed=Count('id'))
+        .order_by()
+        .values_list('email', 'totalScore', 'roundsPlayed')
+    )
+
+
+def _load_index(bucket: str) -> tuple[RankIndex, int]:
+    """
+    A bucket's RankIndex and a high-water result id no result missing from it is
+    above. The mark is read after the totals so this also holds under READ
+    COMMITTED, where each statement sees its own snapshot.
+    """
+    with use_primary(), transaction.atomic(using=router.db_for_write(LeaderboardRollup)):
+        index = RankIndex((email, score or 0.0, rounds) for email, score, rounds in bucket_totals(bucket))
+        high_water = results_high_water()
+    return index, high_water
+
+
+class RankIndexes:
+    """
+    In-process RankIndex per bucket (overall, today, this week, events). A bucket is
+    loaded on first use and reloaded after ``reload_seconds`` so writes made by
+    other processes show up; writes committed in this process are applied at once.
+
+    A reload reads the primary without holding the lock (readers keep the stale
+    index meanwhile) and records the newest result id it could have read, its
+    high-water mark. A committed write is added to an index only if its newest
+    result id is above the mark: the reload cannot have read it. A write whose
+    ids are all below the mark yet committed after the reload read the totals
+    is skipped until the next reload, rather than counted twice.
+    """
+
+    def __init__(self, reload_seconds: float = 30.0):
+        self.reload_seconds = float(reload_seconds)
+        # bucket -> (index, loaded at, high-water result id)
+        self._indexes: dict[str, tuple[RankIndex, float, int]] = {}
+        # Buckets being reloaded -> writes committed since the reload started
+        self._loading: dict[str, list[tuple[str, float, int, int]]] = {}
+        self._lock = threading.Lock()
+        self._loaded = threading.Condition(self._lock)
+
+    def top(self, bucket: str, limit: int) -> list[RankedPlayer]:
+        check_rebuilt()
+        with self._lock:
+            return self._get(bucket).top(limit)
+
+    def rank(self, bucket: str, email: str) -> RankedPlayer | None:
+        check_rebuilt()
+        with self._lock:
+            return self._get(bucket).rank(email)
+
+    def around(self, bucket: str, email: str, radius: int) -> list[RankedPlayer]:
+        check_rebuilt()
+        with self._lock:
+            return self._get(bucket).around(email, radius)
+
+    def search(self, bucket: str, query: str, start: int = 0, count: int | None = None) -> tuple[int, list[RankedPlayer]]:
+        check_rebuilt()
+        with self._lock:
+            return self._get(bucket).search(query, start, count)
+
+    def _get(self, bucket: str) -> RankIndex:
+        # Called with the lock held; it is released while the database is read.
+        while True:
+            entry = self._indexes.get(bucket)
+            if entry is not None and (bucket in self._loading or time.monotonic() - entry[1] < self.reload_seconds):
+                return entry[0]
+            if bucket not in self._loading:
+                break
+            self._loaded.wait()
+
+        loaded_at = time.monotonic()
+        self._loading[bucket] = []
+        self._lock.release()
+        try:
+            index, high_water = _load_index(bucket)
+        finally:
+            self._lock.acquire()
+            committed = self._loading.pop(bucket)
+            self._loaded.notify_all()
+
+        for email, score, rounds, newest_id in committed:
+            if newest_id > high_water:
+                index.add(email, score, rounds)
+        current = current_buckets()
+        self._indexes = {name: value for name, value in self._indexes.items() if name in current}
+        self._indexes[bucket] = (index, loaded_at, high_water)
+        return index
+
+    def apply(self, deltas: dict, newest_id: int) -> None:
+        """Add committed deltas; ``newest_id`` is the newest result id their transaction saw."""
+        with self._lock:
+            for (bucket, email), (score, rounds, _) in deltas.items():
+                entry = self._indexes.get(bucket)
+                if entry is not None and newest_id > entry[2]:
+                    entry[0].add(email, score, rounds)
+                loading = self._loading.get(bucket)
+                if loading is not None:
+                    loading.append((email, score, rounds, newest_id))
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._indexes.clear()
+
+
+rank_indexes = RankIndexes(getattr(settings, 'LEADERBOARD_RANK_INDEX_RELOAD_SECONDS', 30))
+
+
+# Top-10 leaderboard responses keyed by bucket
+leaderboard_cache = MicroCache(
+    ttl=getattr(settings, 'LEADERBOARD_CACHE_TTL_SECONDS', 2.0),
+    min_refresh=getattr(settings, 'LEADERBOARD_CACHE_MIN_REFRESH_SECONDS', 0.5),
+)
+
+
+# Shared-cache marker a rollup rebuild sets so every process drops its rank
+# indexes and cached leaderboards (the rebuilt rows were not applied as deltas)
+REBUILT_KEY = 'leaderboard:rollups-rebuilt'
+REBUILT_CHECK_SECONDS = 1.0
+_rebuilt = {'seen': None, 'checked_at': float('-inf')}
+_rebuilt_lock = threading.Lock()
+
+
+def rollups_rebuilt() -> None:
+    """Drop leaderboard state derived from the old rollups, here and (within REBUILT_CHECK_SECONDS) elsewhere."""
+    marker = uuid.uuid4().hex
+    cache.set(REBUILT_KEY, marker, None)
+    with _rebuilt_lock:
+        _rebuilt['seen'] = marker
+    rank_indexes.invalidate()
+    leaderboard_cache.clear()
+    live_backend.publish()
+
+
+def check_rebuilt() -> None:
+    """Drop this process's leaderboard state if another process rebuilt the rollups."""
+    now = time.monotonic()
+    with _rebuilt_lock:
+        if now - _rebuilt['checked_at'] < REBUILT_CHECK_SECONDS:
+            return
+        _rebuilt['checked_at'] = now
+        marker = cache.get(REBUILT_KEY)
+        if marker == _rebuilt['seen']:
+            return
+        _rebuilt['seen'] = marker
+    rank_indexes.invalidate()
+    leaderboard_cache.clear()
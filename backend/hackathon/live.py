@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Max
+from django.utils.module_loading import import_string
+
+from .models import Crosswordpuzzleresults
+
+SUBSCRIBER_QUEUE_SIZE = 8
+
+
+class LocalBackend:
+    """
+    Change signal for a single process: stored submissions call ``publish`` and
+    the hub compares ``version`` once per tick. Also the stand-in for tests.
+    """
+
+    def __init__(self):
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def publish(self) -> None:
+        with self._lock:
+            self._version += 1
+
+    def version(self) -> int:
+        return self._version
+
+
+class DatabaseBackend(LocalBackend):
+    """
+    Change signal shared by every worker: the newest result id, read with one
+    primary-key lookup per tick, so submissions stored by any process are seen.
+    """
+
+    def version(self) -> int:
+        return Crosswordpuzzleresults.objects.aggregate(newest=Max('id'))['newest'] or 0
+
+
+def _diff(previous: list[dict], current: list[dict]) -> dict:
+    before = {row['email']: row for row in previous}
+    emails = {row['email'] for row in current}
+    return {
+        'changed': [row for row in current if before.get(row['email']) != row],
+        'removed': [email for email in before if email not in emails],
+    }
+
+
+class LeaderboardHub:
+    """
+    In-process fan-out of live leaderboard updates.
+
+    Each subscriber gets an asyncio queue. While anyone is subscribed, a ticker
+    on the event loop checks the backend once per ``tick`` seconds and, if it
+    changed, computes each subscribed board once and pushes the rows that
+    changed since the last broadcast. A subscriber that falls behind gets a
+    full snapshot instead of the deltas it missed.
+    """
+
+    def __init__(self, backend: LocalBackend, compute, tick: float = 1.0):
+        self.backend = backend
+        self.compute = compute
+        self.tick = float(tick)
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._boards: dict[str, list[dict]] = {}
+        self._seen_version = None
+        self._ticker: asyncio.Task | None = None
+        self._metrics = {'subscribers': 0, 'ticks': 0, 'computes': 0, 'broadcasts': 0, 'resyncs': 0}
+
+    async def subscribe(self, board: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        if self._seen_version is None:
+            self._seen_version = await sync_to_async(self.backend.version)()
+        if board not in self._boards:
+            self._boards[board] = await self._compute(board)
+        queue.put_nowait({'type': 'snapshot', 'board': board, 'rows': self._boards[board]})
+        self._subscribers.setdefault(board, set()).add(queue)
+        self._metrics['subscribers'] += 1
+
+        if self._ticker is None or self._ticker.done():
+            # Empty context: the ticker outlives this request and must not reuse
+            # its sync_to_async executor.
+            self._ticker = contextvars.Context().run(asyncio.get_running_loop().create_task, self._run())
+        return queue
+
+    def unsubscribe(self, board: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(board)
+        if queues is not None and queue in queues:
+            queues.discard(queue)
+            self._metrics['subscribers'] -= 1
+            if not queues:
+                del self._subscribers[board]
+                self._boards.pop(board, None)
+
+    def metrics(self) -> dict:
+        return dict(self._metrics)
+
+    async def _compute(self, board: str) -> list[dict]:
+        self._metrics['computes'] += 1
+        return await sync_to_async(self.compute)(board)
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(self.tick)
+            self._metrics['ticks'] += 1
+            version = await sync_to_async(self.backend.version)()
+            if version == self._seen_version:
+                continue
+            self._seen_version = version
+            for board in list(self._subscribers):
+                rows = await self._compute(board)
+                previous = self._boards.get(board, [])
+                self._boards[board] = rows
+                delta = _diff(previous, rows)
+                if delta['changed'] or delta['removed']:
+                    self._broadcast(board, {'type': 'delta', 'board': board, **delta}, rows)
+        self._ticker = None
+
+    def _broadcast(self, board: str, message: dict, rows: list[dict]) -> None:
+        self._metrics['broadcasts'] += 1
+        for queue in self._subscribers.get(board, ()):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._metrics['resyncs'] += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({'type': 'snapshot', 'board': board, 'rows': rows})
+
+
+live_backend: LocalBackend = import_string(
+    getattr(settings, 'LEADERBOARD_LIVE_BACKEND', 'hackathon.live.LocalBackend')
+)()
@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+from django.db.models import Q
+
+from hackathon.models import Crosswordpuzzleresults
+from hackathon.result_columns import typed_values
+
+
+class Command(BaseCommand):
+    help = 'Fill scoreValue/durationSeconds of crosswordpuzzleresults rows from gameScore/duration'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows read and updated per transaction (default: 2000)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.0,
+            help='Seconds to pause between chunks to limit load on a live database',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count rows that need a backfill without writing to DB',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if not settings.RESULTS_TYPED_COLUMNS_WRITE:
+            raise CommandError('Set RESULTS_TYPED_COLUMNS=write (after add_results_typed_columns.sql) to backfill.')
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        missing = Crosswordpuzzleresults.objects.filter(
+            Q(score_value__isnull=True, gamescore__isnull=False) | Q(duration_seconds__isnull=True, duration__isnull=False)
+        ).order_by('id')
+
+        if options['dry_run']:
+            self.stdout.write(f'Rows to backfill: {missing.count()}')
+            self.stdout.write(self.style.WARNING('Dry-run enabled: no DB changes.'))
+            return
+
+        last_id = 0
+        updated = 0
+        while True:
+            # Keyset on id: each chunk is a bounded range read, and rows whose
+            # strings do not parse are not read again.
+            rows = list(missing.filter(id__gt=last_id).values_list('id', 'gamescore', 'duration')[:chunk_size])
+            if not rows:
+                break
+
+            updates = [Crosswordpuzzleresults(id=row_id, **typed_values(gamescore, duration)) for row_id, gamescore, duration in rows]
+            with transaction.atomic(using=router.db_for_write(Crosswordpuzzleresults)):
+                Crosswordpuzzleresults.objects.bulk_update(updates, ['score_value', 'duration_seconds'], batch_size=1000)
+
+            last_id = rows[-1][0]
+            updated += len(updates)
+            self.stdout.write(f'Backfilled {updated} rows (last id {last_id})')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Backfill completed: {updated} rows updated.'))
@@ -0,0 +1,143 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+from django.db.models import UniqueConstraint
+
+from hackathon.db_router import hackathon_database
+from hackathon.models import Crosswordpuzzlebank, Crosswordpuzzleresults
+from hackathon.query_plans import PLAN_CHECKS, explain, full_scans
+
+# Unmanaged tables: migrations never create their indexes, so they are
+# declared in Meta.indexes / Meta.constraints and provisioned here.
+UNMANAGED_MODELS = (Crosswordpuzzlebank, Crosswordpuzzleresults)
+
+
+def _required(model):
+    for index in model._meta.indexes:
+        yield index.name, [model._meta.get_field(name).column for name in index.fields], index, False
+    for constraint in model._meta.constraints:
+        if isinstance(constraint, UniqueConstraint) and constraint.fields:
+            yield constraint.name, [model._meta.get_field(name).column for name in constraint.fields], constraint, True
+
+
+class Command(BaseCommand):
+    help = (
+        'Verify (or create) the indexes declared on the unmanaged result/puzzle tables and '
+        'fail if an EXPLAIN plan of a view query reads a table in full'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=hackathon_database(),
+            help='Database alias to check (default: the one holding the hackathon tables)',
+        )
+        parser.add_argument(
+            '--create',
+            action='store_true',
+            help='Create missing indexes instead of only reporting them',
+        )
+        parser.add_argument(
+            '--skip-plans',
+            action='store_true',
+            help='Only check indexes, do not EXPLAIN the view queries',
+        )
+        parser.add_argument(
+            '--save-plans',
+            dest='plans_path',
+            help='Write the captured plans to this JSON file',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        missing = self._check_indexes(connection, options['create'])
+
+        regressions = []
+        if not options['skip_plans']:
+            regressions = self._check_plans(connection, options['database'], options['plans_path'])
+
+        problems = []
+        if missing:
+            problems.append(f'{missing} missing index(es)')
+        if regressions:
+            problems.append(f'full table scans in: {", ".join(regressions)}')
+        if problems:
+            raise CommandError('; '.join(problems))
+        self.stdout.write(self.style.SUCCESS('Indexes and query plans OK.'))
+
+    def _check_indexes(self, connection, create: bool) -> int:
+        missing = 0
+        with connection.cursor() as cursor:
+            for model in UNMANAGED_MODELS:
+                table = model._meta.db_table
+                columns = {column.name.lower() for column in connection.introspection.get_table_description(cursor, table)}
+                existing = [
+                    [column.lower() for column in info['columns']]
+                    for info in connection.introspection.get_constraints(cursor, table).values()
+                    if info['index'] or info['unique'] or info['primary_key']
+                ]
+
+                for name, wanted, definition, unique in _required(model):
+                    lowered = [column.lower() for column in wanted]
+                    # Any index with the same leading columns serves the lookup
+                    if any(have[: len(lowered)] == lowered for have in existing if not unique or have == lowered):
+                        self.stdout.write(f'  ok       {table}.{name} ({", ".join(wanted)})')
+                        continue
+
+                    absent = [column for column in wanted if column.lower() not in columns]
+                    if absent:
+                        missing += 1
+                        self.stdout.write(
+                            self.style.WARNING(f'  missing  {table}.{name}: column(s) {", ".join(absent)} do not exist yet')
+                        )
+                        continue
+                    if not create:
+                        missing += 1
+                        self.stdout.write(self.style.WARNING(f'  missing  {table}.{name} ({", ".join(wanted)})'))
+                        continue
+
+                    try:
+                        with connection.schema_editor() as editor:
+                            if unique:
+                                editor.add_constraint(model, definition)
+                            else:
+                                editor.add_index(model, definition)
+                    except DatabaseError as exc:
+                        missing += 1
+                        self.stdout.write(self.style.ERROR(f'  failed   {table}.{name}: {exc}'))
+                        continue
+                    self.stdout.write(self.style.SUCCESS(f'  created  {table}.{name} ({", ".join(wanted)})'))
+        return missing
+
+    def _check_plans(self, connection, database: str, plans_path: str | None) -> list[str]:
+        vendor = connection.vendor
+        if vendor not in ('mysql', 'sqlite'):
+            self.stdout.write(self.style.WARNING(f'Query plans are not checked on {vendor}.'))
+            return []
+
+        plans = {}
+        regressions = []
+        for check in PLAN_CHECKS:
+            try:
+                plan = explain(check.queryset().using(database), vendor)
+            except DatabaseError as exc:
+                regressions.append(check.name)
+                self.stdout.write(self.style.ERROR(f'  error    {check.name}: {exc}'))
+                continue
+            plans[check.name] = plan
+            scans = full_scans(plan, vendor)
+            if not scans:
+                self.stdout.write(f'  indexed  {check.name}')
+            elif check.allow_scan:
+                self.stdout.write(f'  scan     {check.name} ({", ".join(sorted(scans))}; expected)')
+            else:
+                regressions.append(check.name)
+                self.stdout.write(self.style.ERROR(f'  SCAN     {check.name} ({", ".join(sorted(scans))})'))
+                self.stdout.write(plan)
+
+        if plans_path:
+            Path(plans_path).write_text(json.dumps(plans, indent=2), encoding='utf-8')
+            self.stdout.write(f'Plans written to {plans_path}')
+        return regressions
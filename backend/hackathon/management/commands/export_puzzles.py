@@ -0,0 +1,112 @@
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hackathon.models import Crosswordpuzzlebank
+from hackathon.puzzle_cache import compile_puzzle
+
+try:
+    import brotli
+except ImportError:  # optional: .json.br files are skipped without it
+    brotli = None
+
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def _content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+def _load_manifest(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+    except json.JSONDecodeError as exc:
+        raise CommandError(f'Existing manifest is not valid JSON: {path}') from exc
+    return manifest.get('puzzles', {}) if isinstance(manifest, dict) else {}
+
+
+class Command(BaseCommand):
+    help = 'Export active puzzles as content-hashed static JSON files (plus .gz/.br) with a manifest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            dest='output_dir',
+            default='puzzle_bundle',
+            help='Directory to write the bundle into (default: puzzle_bundle in backend folder)',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-export every puzzle even if its content hash is unchanged',
+        )
+        parser.add_argument(
+            '--all-statuses',
+            action='store_true',
+            help='Export every puzzle, not only rows with status=1',
+        )
+
+    def handle(self, *args, **options):
+        output_dir = Path(options['output_dir'])
+        full = options['full']
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = output_dir / MANIFEST_NAME
+        previous = _load_manifest(manifest_path)
+
+        queryset = Crosswordpuzzlebank.objects.order_by('puzzleid')
+        if not options['all_statuses']:
+            queryset = queryset.filter(status=1)
+
+        if brotli is None:
+            self.stdout.write(self.style.WARNING('brotli is not installed: skipping .json.br files.'))
+
+        puzzles: dict[str, dict] = {}
+        written = skipped = 0
+
+        for puzzle in queryset.iterator():
+            body = compile_puzzle(puzzle).body
+            content_hash = _content_hash(body)
+            stem = f'{puzzle.puzzleid}.{content_hash}'
+            entry = {
+                'hash': content_hash,
+                'json': f'{stem}.json',
+                'gz': f'{stem}.json.gz',
+            }
+            if brotli is not None:
+                entry['br'] = f'{stem}.json.br'
+
+            old = previous.get(puzzle.puzzleid)
+            if not full and old == entry and all((output_dir / name).exists() for key, name in entry.items() if key != 'hash'):
+                puzzles[puzzle.puzzleid] = entry
+                skipped += 1
+                continue
+
+            (output_dir / entry['json']).write_bytes(body)
+            (output_dir / entry['gz']).write_bytes(gzip.compress(body, compresslevel=9, mtime=0))
+            if brotli is not None:
+                (output_dir / entry['br']).write_bytes(brotli.compress(body, quality=11))
+
+            puzzles[puzzle.puzzleid] = entry
+            written += 1
+
+        stale_files = set()
+        for puzzle_id, old in previous.items():
+            if puzzles.get(puzzle_id) != old:
+                stale_files.update(name for key, name in old.items() if key != 'hash')
+        current_files = {name for entry in puzzles.values() for key, name in entry.items() if key != 'hash'}
+        for name in stale_files - current_files:
+            (output_dir / name).unlink(missing_ok=True)
+
+        manifest_path.write_text(json.dumps({'puzzles': puzzles}, indent=2, sort_keys=True), encoding='utf-8')
+
+        self.stdout.write(f'Puzzles exported: {written}')
+        self.stdout.write(f'Puzzles unchanged: {skipped}')
+        self.stdout.write(f'Stale files removed: {len(stale_files - current_files)}')
+        self.stdout.write(self.style.SUCCESS(f'Bundle written to {output_dir}'))
@@ -0,0 +1,134 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+
+from hackathon.models import Crosswordpuzzlebank
+from hackathon.puzzle_format import (
+    canonical_black_boxes,
+    canonical_hint_array,
+    parse_black_boxes,
+    parse_hint_array,
+)
+from hackathon.scoring import DEFAULT_GRID_SIZE, GridGeometry, compile_answer_key
+
+
+FIELDS = {
+    'accrosshintarray': canonical_hint_array,
+    'downhintarray': canonical_hint_array,
+    'blackboxarray': canonical_black_boxes,
+}
+
+
+def _layout_problems(row: dict) -> tuple[str, ...]:
+    across = parse_hint_array(row['accrosshintarray'])
+    down = parse_hint_array(row['downhintarray'])
+    black_boxes = parse_black_boxes(row['blackboxarray'])
+    if across is None or down is None or black_boxes is None:
+        return ()
+    geometry = GridGeometry(rows=row['gridrows'] or DEFAULT_GRID_SIZE, cols=row['gridcols'] or DEFAULT_GRID_SIZE)
+    try:
+        black_boxes = [int(x) for x in black_boxes]
+    except (TypeError, ValueError):
+        return ()
+    return compile_answer_key(across, down, geometry=geometry, black_boxes=black_boxes).problems
+
+
+class Command(BaseCommand):
+    help = 'Rewrite crosswordpuzzlebank hint arrays and blackBoxArray into canonical JSON (chunked, resumable)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Rows fetched and written per transaction (default: 200)',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            dest='checkpoint_path',
+            default='normalize_puzzles.checkpoint',
+            help='File holding the last processed puzzleID; the run resumes after it',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore an existing checkpoint and start from the first row',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing to DB',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        checkpoint = Path(options['checkpoint_path'])
+        dry_run = options['dry_run']
+
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        last_id = None
+        if checkpoint.exists() and not options['restart']:
+            last_id = checkpoint.read_text(encoding='utf-8').strip() or None
+            if last_id:
+                self.stdout.write(f'Resuming after puzzleID {last_id!r}')
+
+        scanned = rewritten = 0
+        unfixable: list[tuple[str, str]] = []
+        layout_problems: list[tuple[str, str]] = []
+
+        while True:
+            queryset = Crosswordpuzzlebank.objects.order_by('puzzleid')
+            if last_id is not None:
+                queryset = queryset.filter(puzzleid__gt=last_id)
+            rows = list(queryset.values('puzzleid', 'gridrows', 'gridcols', *FIELDS)[:chunk_size])
+            if not rows:
+                break
+
+            updates: list[tuple[str, dict]] = []
+            for row in rows:
+                changes = {}
+                for field_name, canonicalize in FIELDS.items():
+                    raw = row[field_name]
+                    if not raw:
+                        continue
+                    canonical = canonicalize(raw)
+                    if canonical is None:
+                        unfixable.append((row['puzzleid'], field_name))
+                    elif canonical != raw:
+                        changes[field_name] = canonical
+                if changes:
+                    updates.append((row['puzzleid'], changes))
+                layout_problems.extend((row['puzzleid'], problem) for problem in _layout_problems(row))
+
+            last_id = rows[-1]['puzzleid']
+            if not dry_run:
+                with transaction.atomic(using=router.db_for_write(Crosswordpuzzlebank)):
+                    for puzzle_id, changes in updates:
+                        Crosswordpuzzlebank.objects.filter(puzzleid=puzzle_id).update(**changes)
+                checkpoint.write_text(last_id, encoding='utf-8')
+
+            scanned += len(rows)
+            rewritten += len(updates)
+            for puzzle_id, changes in updates:
+                self.stdout.write(f'{puzzle_id}: {", ".join(sorted(changes))}')
+
+        self.stdout.write(f'Rows scanned: {scanned}')
+        self.stdout.write(f'Rows {"to rewrite" if dry_run else "rewritten"}: {rewritten}')
+        if unfixable:
+            self.stdout.write(self.style.WARNING(f'Fields that could not be normalized: {len(unfixable)}'))
+            for puzzle_id, field_name in unfixable:
+                self.stdout.write(self.style.WARNING(f'  {puzzle_id}: {field_name}'))
+        if layout_problems:
+            self.stdout.write(self.style.WARNING(f'Words that do not fit their grid: {len(layout_problems)}'))
+            for puzzle_id, problem in layout_problems:
+                self.stdout.write(self.style.WARNING(f'  {puzzle_id}: {problem}'))
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('Dry-run enabled: no DB changes.'))
+            return
+
+        checkpoint.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS('Normalization completed.'))
@@ -0,0 +1,97 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, router, transaction
+
+from hackathon.db_router import use_primary
+from hackathon.leaderboard import compute_rollups, results_high_water, rollups_rebuilt, rollups_with_later_results
+from hackathon.models import LeaderboardRollup
+
+
+def _key(row: LeaderboardRollup) -> tuple:
+    return (round(row.total_score, 6), row.rounds_played, row.last_played)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild leaderboard_rollup (overall and per-day) from crosswordpuzzleresults'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only report rows that drifted from the results table; do not write to DB',
+        )
+
+    def handle(self, *args, **options):
+        # Replicas may lag behind the results the rollups are rebuilt from
+        with use_primary():
+            # The slow aggregation runs outside any transaction over results up to
+            # high_water; each bucket then adds what was stored since under its row locks
+            high_water = results_high_water()
+            fresh = defaultdict(dict)
+            for row in compute_rollups(up_to_id=high_water):
+                fresh[row.bucket][row.email] = row
+            buckets = sorted(set(fresh) | set(LeaderboardRollup.objects.values_list('bucket', flat=True).distinct()))
+            self.stdout.write(f'Rollup rows computed: {sum(len(rows) for rows in fresh.values())}')
+
+            if options['verify']:
+                self._verify(buckets, fresh, high_water)
+                return
+
+            changed = 0
+            for bucket in buckets:
+                changed += self._rebuild_bucket(bucket, fresh.get(bucket, {}), high_water)
+
+        if changed:
+            rollups_rebuilt()
+        self.stdout.write(self.style.SUCCESS(f'Leaderboard rollups rebuilt ({changed} rows changed).'))
+
+    def _rebuild_bucket(self, bucket, rows, high_water) -> int:
+        while True:
+            try:
+                return self._apply_diff(bucket, rows, high_water)
+            except IntegrityError:
+                # A first result for a new player committed between the two reads
+                # (no gap locks under READ COMMITTED); both reads see it next time
+                continue
+
+    def _apply_diff(self, bucket, rows, high_water) -> int:
+        """Bring one bucket's rows in line; _upsert on them waits for the row locks meanwhile."""
+        with transaction.atomic(using=router.db_for_write(LeaderboardRollup)):
+            current = {row.email: row for row in LeaderboardRollup.objects.select_for_update().filter(bucket=bucket)}
+            expected = rollups_with_later_results(bucket, rows, high_water)
+
+            updated, created = [], []
+            for email, row in expected.items():
+                existing = current.pop(email, None)
+                if existing is None:
+                    created.append(row)
+                elif _key(existing) != _key(row):
+                    existing.total_score = row.total_score
+                    existing.rounds_played = row.rounds_played
+                    existing.last_played = row.last_played
+                    updated.append(existing)
+
+            LeaderboardRollup.objects.bulk_update(updated, ['total_score', 'rounds_played', 'last_played'], batch_size=1000)
+            LeaderboardRollup.objects.bulk_create(created, batch_size=1000)
+            # Rows left in current have no results any more
+            LeaderboardRollup.objects.filter(pk__in=[row.pk for row in current.values()]).delete()
+        return len(updated) + len(created) + len(current)
+
+    def _verify(self, buckets, fresh, high_water) -> None:
+        drifted = 0
+        for bucket in buckets:
+            current = {row.email: row for row in LeaderboardRollup.objects.filter(bucket=bucket)}
+            for email, row in rollups_with_later_results(bucket, fresh.get(bucket, {}), high_water).items():
+                existing = current.pop(email, None)
+                if existing is None or _key(existing) != _key(row):
+                    drifted += 1
+                    self.stdout.write(f'  {bucket} {email}: stored {existing and _key(existing)}, expected {_key(row)}')
+            for email in current:
+                drifted += 1
+                self.stdout.write(f'  {bucket} {email}: stored but has no results')
+
+        if drifted:
+            self.stdout.write(self.style.WARNING(f'Drifted rows: {drifted}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Rollups match the results table.'))
@@ -0,0 +1,59 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from hackathon.write_behind import DEAD_LETTER_NAME, SPOOL_PREFIX, read_spool, replay_dead_letters, replay_spool
+
+
+class Command(BaseCommand):
+    help = 'Insert unacknowledged write-behind submissions left in spool files by stopped processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--spool-dir',
+            default=str(settings.SUBMISSION_SPOOL_DIR),
+            help='Spool directory (default: SUBMISSION_SPOOL_DIR)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show pending record counts without writing to DB',
+        )
+        parser.add_argument(
+            '--dead-letters',
+            action='store_true',
+            help=f'Also retry records set aside in {DEAD_LETTER_NAME} once the cause is fixed',
+        )
+
+    def handle(self, *args, **options):
+        spool_dir = Path(options['spool_dir'])
+        total = 0
+
+        for path in sorted(spool_dir.glob(f'{SPOOL_PREFIX}*.jsonl')):
+            if options['dry_run']:
+                pending = len(read_spool(path))
+                self.stdout.write(f'{path.name}: {pending} pending')
+                total += pending
+                continue
+            try:
+                replayed = replay_spool(path)
+            except BlockingIOError:
+                self.stdout.write(self.style.WARNING(f'{path.name}: in use by a running process, skipped'))
+                continue
+            self.stdout.write(f'{path.name}: {replayed} replayed')
+            total += replayed
+
+        dead_letters = spool_dir / DEAD_LETTER_NAME
+        if options['dry_run']:
+            if options['dead_letters'] and dead_letters.exists():
+                with open(dead_letters, encoding='utf-8') as f:
+                    self.stdout.write(f'{DEAD_LETTER_NAME}: {sum(1 for line in f if line.strip())} dead-lettered')
+            self.stdout.write(self.style.WARNING(f'Dry-run enabled: {total} records pending, no DB changes.'))
+            return
+
+        if options['dead_letters']:
+            stored, failed = replay_dead_letters(spool_dir)
+            self.stdout.write(f'{DEAD_LETTER_NAME}: {stored} replayed, {failed} still failing')
+            total += stored
+        self.stdout.write(self.style.SUCCESS(f'Replay completed: {total} records inserted.'))
@@ -0,0 +1,171 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+
+from hackathon.models import Crosswordpuzzlebank, Crosswordpuzzleresults
+from hackathon.puzzle_cache import compile_puzzle
+from hackathon.result_columns import typed_values
+from hackathon.scoring import TIME_BONUS_MIN_WORDS, TIME_BONUS_PER_SECOND, init_rescore_worker, rescore_batch
+
+
+# The scoring inputs, then the stored outcome a rescore is compared against
+COLUMNS = ('id', 'puzzleid', 'submittedpuzzle', 'duration', 'gamescore', 'status', 'correct_words', 'total_words')
+
+
+def _split(rows: list, parts: int) -> list[list]:
+    size = max(1, -(-len(rows) // parts))
+    return [rows[i : i + size] for i in range(0, len(rows), size)]
+
+
+class Command(BaseCommand):
+    help = 'Recompute gameScore/status of stored crosswordpuzzleresults rows against the current answer keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Rows read, scored and written per chunk (default: 5000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Scoring processes (default: CPU count; 1 scores in-process)',
+        )
+        parser.add_argument(
+            '--puzzle',
+            dest='puzzle_ids',
+            action='append',
+            help='Only rescore results for this puzzleID (repeatable)',
+        )
+        parser.add_argument(
+            '--min-words-for-bonus',
+            type=int,
+            default=TIME_BONUS_MIN_WORDS,
+            help=f'Correct words needed for the time bonus (default: {TIME_BONUS_MIN_WORDS})',
+        )
+        parser.add_argument(
+            '--bonus-per-second',
+            type=float,
+            default=TIME_BONUS_PER_SECOND,
+            help=f'Time bonus per remaining second (default: {TIME_BONUS_PER_SECOND})',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            dest='checkpoint_path',
+            default='rescore_results.checkpoint',
+            help='File holding the last processed result id; the run resumes after it',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore an existing checkpoint and start from the first row',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print score changes without writing to DB',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        workers = max(1, options['workers'])
+        dry_run = options['dry_run']
+        checkpoint = Path(options['checkpoint_path'])
+
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        puzzles = Crosswordpuzzlebank.objects.all()
+        if options['puzzle_ids']:
+            puzzles = puzzles.filter(puzzleid__in=options['puzzle_ids'])
+        answer_keys = {}
+        for puzzle in puzzles.iterator():
+            compiled = compile_puzzle(puzzle)
+            geometry = compiled.answer_key.geometry
+            answer_keys[compiled.puzzle_id] = (
+                compiled.across_hints,
+                compiled.down_hints,
+                geometry.rows,
+                geometry.cols,
+                tuple(compiled.black_boxes),
+            )
+        if not answer_keys:
+            raise CommandError('No puzzles found to score against.')
+        rule = {'min_words': options['min_words_for_bonus'], 'per_second': options['bonus_per_second']}
+        typed = settings.RESULTS_TYPED_COLUMNS_WRITE
+        update_fields = ['gamescore', 'status', 'correct_words', 'total_words'] + (['score_value'] if typed else [])
+
+        last_id = 0
+        if checkpoint.exists() and not options['restart'] and not dry_run:
+            last_id = int(checkpoint.read_text(encoding='utf-8').strip() or 0)
+            if last_id:
+                self.stdout.write(f'Resuming after result id {last_id}')
+
+        base = Crosswordpuzzleresults.objects.filter(puzzleid__in=list(answer_keys)).order_by('id')
+        scanned = changed = 0
+
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=init_rescore_worker, initargs=(answer_keys, rule))
+        else:
+            init_rescore_worker(answer_keys, rule)
+
+        try:
+            while True:
+                rows = list(base.filter(id__gt=last_id).values_list(*COLUMNS)[:chunk_size])
+                if not rows:
+                    break
+
+                current = {row[0]: row[4:] for row in rows}
+                batch = [row[:4] for row in rows]
+                if executor is None:
+                    scored = rescore_batch(batch)
+                else:
+                    scored = [item for part in executor.map(rescore_batch, _split(batch, workers)) for item in part]
+
+                updates = []
+                for result_id, *rescored in scored:
+                    if current[result_id] == tuple(rescored):
+                        continue
+                    gamescore, result_status, correct_words, total_words = rescored
+                    old_score, old_status = current[result_id][:2]
+                    if dry_run:
+                        self.stdout.write(f'{result_id}: score {old_score} -> {gamescore}, status {old_status} -> {result_status}')
+                    update = Crosswordpuzzleresults(
+                        id=result_id,
+                        gamescore=gamescore,
+                        status=result_status,
+                        correct_words=correct_words,
+                        total_words=total_words,
+                    )
+                    if typed:
+                        update.score_value = typed_values(gamescore, None)['score_value']
+                    updates.append(update)
+
+                last_id = rows[-1][0]
+                if not dry_run:
+                    with transaction.atomic(using=router.db_for_write(Crosswordpuzzleresults)):
+                        Crosswordpuzzleresults.objects.bulk_update(updates, update_fields, batch_size=1000)
+                    checkpoint.write_text(str(last_id), encoding='utf-8')
+
+                scanned += len(rows)
+                changed += len(updates)
+                self.stdout.write(f'Scanned {scanned} rows, {changed} changed (last id {last_id})')
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('Dry-run enabled: no DB changes.'))
+            return
+
+        checkpoint.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(f'Rescoring completed: {changed} of {scanned} rows updated.'))
+        if changed:
+            self.stdout.write('Run rebuild_leaderboard to bring the leaderboard rollups up to date.')
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from .single_flight import Flights
+
+
+class MicroCache:
+    """
+    Short-lived cache of computed responses with stale-while-revalidate.
+
+    An entry is fresh for ``ttl`` seconds, or until ``bump()`` marks the data
+    changed; a bumped entry is still served until it is ``min_refresh`` seconds
+    old, so a burst of writes costs at most one recompute per ``min_refresh``.
+    A stale key is recomputed by a single caller while the others keep serving
+    the stale value; callers with nothing cached wait for that recompute.
+    """
+
+    def __init__(self, ttl: float = 2.0, min_refresh: float = 0.5):
+        self.ttl = float(ttl)
+        self.min_refresh = min(float(min_refresh), self.ttl)
+        self._version = 0
+        self._entries: dict = {}
+        self._inflight = Flights()
+        self._lock = threading.Lock()
+        self._metrics = {'hits': 0, 'staleHits': 0, 'misses': 0, 'refreshes': 0, 'coalesced': 0, 'errors': 0}
+
+    def get(self, key, compute):
+        if self.ttl <= 0:
+            return compute()
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry, now):
+                self._metrics['hits'] += 1
+                return entry[0]
+
+            flight, leader = self._inflight.join(key)
+            if leader:
+                self._metrics['misses' if entry is None else 'refreshes'] += 1
+            elif entry is not None:
+                self._metrics['staleHits'] += 1
+                return entry[0]
+            else:
+                self._metrics['coalesced'] += 1
+            version = self._version
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            return flight.run(compute)
+        finally:
+            with self._lock:
+                self._inflight.finish(key)
+                if flight.error is None:
+                    self._entries[key] = (flight.result, version, time.monotonic())
+                else:
+                    self._metrics['errors'] += 1
+            flight.land()
+
+    def bump(self) -> None:
+        """Mark every cached value as outdated by a write."""
+        with self._lock:
+            self._version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            data = dict(self._metrics)
+            data['entries'] = len(self._entries)
+        served = data['hits'] + data['staleHits'] + data['coalesced']
+        lookups = served + data['misses'] + data['refreshes']
+        data['hitRatio'] = round(served / lookups, 4) if lookups else 0.0
+        return data
+
+    def _is_fresh(self, entry, now: float) -> bool:
+        age = now - entry[2]
+        if entry[1] == self._version:
+            return age < self.ttl
+        return age < self.min_refresh
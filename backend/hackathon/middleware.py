@@ -1,7 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import math
+
+from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpRequest, HttpResponse
 
+from .db_router import replicas, use_primary
+
+STICKY_COOKIE = 'db_primary'
+
 
 class CorsMiddleware:
     def __init__(self, get_response):
@@ -22,3 +31,61 @@ class CorsMiddleware:
             response['Access-Control-Max-Age'] = '86400'
 
         return response
+
+
+def stick_to_primary(request, *clients: str | None) -> None:
+    """
+    Record that ``request`` stored data for ``clients`` (e.g. the player's email),
+    so ReadYourWritesMiddleware keeps them on the primary for a while.
+    """
+    request = getattr(request, '_request', request)
+    request.db_sticky_clients = [*getattr(request, 'db_sticky_clients', ()), *(c for c in clients if c)]
+
+
+def _client_keys(request: HttpRequest) -> list[str]:
+    keys = []
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer ') and authorization[7:].strip():
+        keys.append('db-primary:token:' + hashlib.sha256(authorization[7:].strip().encode()).hexdigest()[:32])
+    if request.GET.get('email', '').strip():
+        keys.append(_email_key(request.GET['email']))
+    return keys
+
+
+def _email_key(email: str) -> str:
+    return 'db-primary:email:' + hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+
+class ReadYourWritesMiddleware:
+    """
+    Keeps a client on the primary database for DATABASE_REPLICA_STICKY_SECONDS
+    after a view stored data for it (see stick_to_primary), so replica lag never
+    hides its own submission. Clients are recognised by their bearer token,
+    the ?email= they read, or a cookie set on the write; write requests also
+    read from the primary while they run.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = float(getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', 5))
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not replicas.weights:
+            return self.get_response(request)
+
+        keys = _client_keys(request)
+        if (
+            request.method not in ('GET', 'HEAD', 'OPTIONS')
+            or STICKY_COOKIE in request.COOKIES
+            or (keys and cache.get_many(keys))
+        ):
+            with use_primary():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+
+        clients = getattr(request, 'db_sticky_clients', None)
+        if clients is not None and response.status_code < 400 and self.sticky_seconds > 0:
+            cache.set_many(dict.fromkeys(keys + [_email_key(email) for email in clients], 1), self.sticky_seconds)
+            response.set_cookie(STICKY_COOKIE, '1', max_age=math.ceil(self.sticky_seconds), httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0003_crosswordpuzzlebank_gamesession_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(max_length=20)),
+                ('email', models.CharField(max_length=255)),
+                ('total_score', models.FloatField(default=0)),
+                ('rounds_played', models.IntegerField(default=0)),
+                ('last_played', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'leaderboard_rollup',
+                'constraints': [
+                    models.UniqueConstraint(fields=('bucket', 'email'), name='uniq_rollup_bucket_email'),
+                ],
+                'indexes': [
+                    models.Index(fields=['bucket', '-total_score', 'email'], name='idx_rollup_bucket_score'),
+                ],
+            },
+        ),
+    ]
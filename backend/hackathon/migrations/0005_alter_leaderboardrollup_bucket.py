@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hackathon', '0004_leaderboardrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='leaderboardrollup',
+            name='bucket',
+            field=models.CharField(max_length=64),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 
@@ -13,6 +14,10 @@ class Crosswordpuzzlebank(models.Model):
     status = models.IntegerField(blank=True, null=True)
     # Field name made lowercase.
     createddate = models.DateTimeField(db_column='createdDate', blank=True, null=True)
+    # Field name made lowercase. NULL means the original 9x9 layout.
+    gridrows = models.IntegerField(db_column='gridRows', blank=True, null=True)
+    # Field name made lowercase.
+    gridcols = models.IntegerField(db_column='gridCols', blank=True, null=True)
 
     class Meta:
         managed = False
@@ -29,7 +34,46 @@ class Crosswordpuzzleresults(models.Model):
     status = models.IntegerField(blank=True, null=True)
     createddate = models.DateTimeField(db_column='createdDate', blank=True, null=True)
     email = models.CharField(db_column='Email', max_length=255, blank=True, null=True)
+    # The submit's attemptID (one per attempt at a round), see hackathon.idempotency;
+    # the column kept its original sessionID name.
+    attemptid = models.CharField(db_column='sessionID', max_length=100, blank=True, null=True)
+    # Scored word counts, returned as-is when an attempt is submitted again
+    correct_words = models.IntegerField(db_column='correctWords', blank=True, null=True)
+    total_words = models.IntegerField(db_column='totalWords', blank=True, null=True)
+    if settings.RESULTS_TYPED_COLUMNS_WRITE:
+        # Typed copies of gamescore/duration, see hackathon.result_columns. Off the
+        # model until add_results_typed_columns.sql has run, so inserts skip them.
+        score_value = models.FloatField(db_column='scoreValue', blank=True, null=True)
+        duration_seconds = models.IntegerField(db_column='durationSeconds', blank=True, null=True)
 
     class Meta:
         managed = False
         db_table = 'crosswordpuzzleresults'
+        constraints = [
+            models.UniqueConstraint(fields=['attemptid', 'puzzleid'], name='uniq_results_session_puzzle'),
+        ]
+        indexes = [
+            models.Index(fields=['createddate', 'email'], name='idx_results_created_email'),
+            models.Index(fields=['email', 'createddate'], name='idx_results_email_created'),
+        ]
+        if settings.RESULTS_TYPED_COLUMNS_WRITE:
+            indexes.append(models.Index(fields=['email', 'score_value'], name='idx_results_email_score'))
+
+
+class LeaderboardRollup(models.Model):
+    # 'overall', 'day:YYYY-MM-DD', 'week:YYYY-MM-DD' (Monday) or 'event:<name>';
+    # maintained on every stored result, see hackathon.leaderboard
+    bucket = models.CharField(max_length=64)
+    email = models.CharField(max_length=255)
+    total_score = models.FloatField(default=0)
+    rounds_played = models.IntegerField(default=0)
+    last_played = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        db_table = 'leaderboard_rollup'
+        constraints = [
+            models.UniqueConstraint(fields=['bucket', 'email'], name='uniq_rollup_bucket_email'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket', '-total_score', 'email'], name='idx_rollup_bucket_score'),
+        ]
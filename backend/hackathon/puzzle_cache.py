@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.renderers import JSONRenderer
+
+from .models import Crosswordpuzzlebank
+from .scoring import AnswerKey, GridGeometry, compile_answer_key
+from .serializers import CrosswordPuzzleSerializer
+from .single_flight import Flight, Flights
+
+
+DEFAULT_MAX_SIZE = 256
+DEFAULT_REVALIDATE_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class CompiledPuzzle:
+    """Parsed, read-only view of one Crosswordpuzzlebank row."""
+
+    puzzle_id: str
+    version: tuple
+    across_hints: tuple
+    down_hints: tuple
+    black_boxes: frozenset
+    answer_key: AnswerKey
+    payload: dict = field(repr=False)
+    body: bytes = field(repr=False)
+    etag: str = ''
+    # Same payload with every hint's answer removed, for clients that check words server-side
+    public_payload: dict = field(default=None, repr=False)
+    public_body: bytes = field(default=b'', repr=False)
+    public_etag: str = ''
+
+    def response_parts(self, with_answers: bool = True) -> tuple[dict, bytes, str]:
+        if with_answers:
+            return self.payload, self.body, self.etag
+        return self.public_payload, self.public_body, self.public_etag
+
+
+def _as_cell(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _strip_answer(hint):
+    if not isinstance(hint, dict):
+        return hint
+    return {key: value for key, value in hint.items() if key != 'answer'}
+
+
+def _etag(body: bytes) -> str:
+    return '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+def puzzle_version(puzzle: Crosswordpuzzlebank) -> tuple:
+    # The content checksum catches in-place rewrites (e.g. normalize_puzzles) that
+    # leave status/createddate untouched.
+    content = '\x00'.join(x or '' for x in (puzzle.blackboxarray, puzzle.accrosshintarray, puzzle.downhintarray))
+    return (
+        puzzle.status,
+        puzzle.createddate.isoformat() if puzzle.createddate else None,
+        puzzle.gridrows,
+        puzzle.gridcols,
+        zlib.crc32(content.encode('utf-8')),
+    )
+
+
+def compile_puzzle(puzzle: Crosswordpuzzlebank) -> CompiledPuzzle:
+    payload = dict(CrosswordPuzzleSerializer(puzzle).data)
+    across_hints = tuple(payload.get('acrossHints') or ())
+    down_hints = tuple(payload.get('downHints') or ())
+
+    black_boxes = frozenset(
+        cell for cell in (_as_cell(x) for x in payload.get('blackBoxArray') or ()) if cell is not None
+    )
+
+    # Byte-identical to what get_puzzle renders, so both views share one strong ETag
+    body = JSONRenderer().render(payload)
+    public_payload = dict(
+        payload,
+        acrossHints=[_strip_answer(hint) for hint in across_hints],
+        downHints=[_strip_answer(hint) for hint in down_hints],
+    )
+    public_body = JSONRenderer().render(public_payload)
+
+    return CompiledPuzzle(
+        puzzle_id=puzzle.puzzleid,
+        version=puzzle_version(puzzle),
+        across_hints=across_hints,
+        down_hints=down_hints,
+        black_boxes=black_boxes,
+        answer_key=compile_answer_key(
+            across_hints,
+            down_hints,
+            geometry=GridGeometry(rows=payload['rows'], cols=payload['cols']),
+            black_boxes=black_boxes,
+        ),
+        payload=payload,
+        body=body,
+        etag=_etag(body),
+        public_payload=public_payload,
+        public_body=public_body,
+        public_etag=_etag(public_body),
+    )
+
+
+class PuzzleCache:
+    """
+    Bounded LRU of compiled puzzles keyed by puzzleid.
+
+    Concurrent misses for the same puzzle share a single loader (single-flight),
+    so a cold puzzle costs one DB query regardless of how many requests arrive.
+    Entries older than ``revalidate_seconds`` are reloaded; the compiled object
+    is only replaced when the row's status/createddate changed; while one
+    request reloads a stale entry, the others keep serving the old one.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, revalidate_seconds: float = DEFAULT_REVALIDATE_SECONDS):
+        self.max_size = max(1, int(max_size))
+        self.revalidate_seconds = float(revalidate_seconds)
+        self._entries: OrderedDict[str, tuple[CompiledPuzzle, float]] = OrderedDict()
+        self._inflight = Flights()
+        self._lock = threading.Lock()
+
+    def get(self, puzzle_id: str) -> CompiledPuzzle | None:
+        """Return the compiled puzzle, or None if the row does not exist."""
+        key = str(puzzle_id)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < self.revalidate_seconds:
+                self._entries.move_to_end(key)
+                return entry[0]
+
+            flight, leader = self._inflight.join(key)
+
+        if not leader:
+            if entry is not None:
+                return entry[0]
+            return flight.wait()
+
+        try:
+            return flight.run(lambda: self._load(key, entry[0] if entry else None))
+        finally:
+            with self._lock:
+                self._complete(key, flight)
+            flight.land()
+
+    def get_many(self, puzzle_ids) -> dict[str, CompiledPuzzle]:
+        """
+        Return compiled puzzles for the given ids, skipping ids that do not exist.
+
+        All misses are loaded with a single ``in_bulk`` query; ids another request
+        is already loading are awaited instead of queried again.
+        """
+        keys = list(dict.fromkeys(str(puzzle_id) for puzzle_id in puzzle_ids))
+        found: dict[str, CompiledPuzzle] = {}
+        leading: dict[str, tuple[Flight, CompiledPuzzle | None]] = {}
+        waiting: dict[str, Flight] = {}
+        now = time.monotonic()
+
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[1] < self.revalidate_seconds:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[0]
+                    continue
+
+                flight, leader = self._inflight.join(key)
+                if leader:
+                    leading[key] = (flight, entry[0] if entry else None)
+                elif entry is not None:
+                    found[key] = entry[0]
+                else:
+                    waiting[key] = flight
+
+        if leading:
+            try:
+                rows = Crosswordpuzzlebank.objects.in_bulk(list(leading))
+                for key, (flight, previous) in leading.items():
+                    flight.result = self._compile_row(rows.get(key), previous)
+            except BaseException as exc:
+                for flight, _ in leading.values():
+                    flight.fail(exc)
+                raise
+            finally:
+                with self._lock:
+                    for key, (flight, _) in leading.items():
+                        self._complete(key, flight)
+                for flight, _ in leading.values():
+                    flight.land()
+
+            found.update((key, flight.result) for key, (flight, _) in leading.items() if flight.result is not None)
+
+        for key, flight in waiting.items():
+            result = flight.wait()
+            if result is not None:
+                found[key] = result
+
+        return {key: found[key] for key in keys if key in found}
+
+    def _complete(self, key: str, flight: Flight) -> None:
+        self._inflight.finish(key)
+        if flight.error is not None:
+            return
+        if flight.result is None:
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = (flight.result, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _compile_row(puzzle: Crosswordpuzzlebank | None, previous: CompiledPuzzle | None) -> CompiledPuzzle | None:
+        if puzzle is None:
+            return None
+        if previous is not None and previous.version == puzzle_version(puzzle):
+            return previous
+        return compile_puzzle(puzzle)
+
+    def _load(self, key: str, previous: CompiledPuzzle | None) -> CompiledPuzzle | None:
+        return self._compile_row(Crosswordpuzzlebank.objects.filter(puzzleid=key).first(), previous)
+
+    def invalidate(self, puzzle_id: str | None = None) -> None:
+        with self._lock:
+            if puzzle_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(puzzle_id), None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+puzzle_cache = PuzzleCache(
+    max_size=getattr(settings, 'PUZZLE_CACHE_MAX_SIZE', DEFAULT_MAX_SIZE),
+    revalidate_seconds=getattr(settings, 'PUZZLE_CACHE_REVALIDATE_SECONDS', DEFAULT_REVALIDATE_SECONDS),
+)
+
+
+def get_compiled_puzzle(puzzle_id: str) -> CompiledPuzzle | None:
+    return puzzle_cache.get(puzzle_id)
+
+
+def get_compiled_puzzles(puzzle_ids) -> dict[str, CompiledPuzzle]:
+    return puzzle_cache.get_many(puzzle_ids)
+
+
+@receiver(post_save, sender=Crosswordpuzzlebank)
+@receiver(post_delete, sender=Crosswordpuzzlebank)
+def _invalidate_on_change(sender, instance, **kwargs):
+    puzzle_cache.invalidate(instance.puzzleid)
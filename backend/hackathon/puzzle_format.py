@@ -0,0 +1,75 @@
+import ast
+import json
+
+
+def dump_canonical(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def _parse_legacy(raw: str):
+    # Legacy rows were written with str(list_of_dicts), i.e. Python literals with
+    # single quotes. literal_eval reads those without mangling apostrophes in answers.
+    try:
+        return ast.literal_eval(raw.strip())
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+def parse_hint_array(raw) -> list | None:
+    """Parse a stored hint array; returns None when the value cannot be read."""
+    if not raw:
+        return []
+    if not isinstance(raw, str):
+        return raw if isinstance(raw, list) else None
+
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        data = _parse_legacy(raw)
+    if isinstance(data, tuple):
+        data = list(data)
+    if not isinstance(data, list) or not all(isinstance(hint, dict) for hint in data):
+        return None
+    return data
+
+
+def parse_black_boxes(raw) -> list | None:
+    """Parse a stored black box array ("[1, 2]" or "1,2"); returns None when unreadable."""
+    if not raw:
+        return []
+    if not isinstance(raw, str):
+        return raw if isinstance(raw, list) else None
+
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        data = _parse_legacy(raw)
+        if data is None:
+            parts = [x.strip() for x in raw.split(',') if x.strip()]
+            if not all(x.isdigit() for x in parts):
+                return None
+            data = [int(x) for x in parts]
+    if isinstance(data, int):
+        data = [data]
+    if isinstance(data, tuple):
+        data = list(data)
+    if not isinstance(data, list):
+        return None
+    return data
+
+
+def canonical_black_boxes(raw) -> str | None:
+    data = parse_black_boxes(raw)
+    if data is None:
+        return None
+    try:
+        return dump_canonical([int(x) for x in data])
+    except (TypeError, ValueError):
+        return None
+
+
+def canonical_hint_array(raw) -> str | None:
+    data = parse_hint_array(raw)
+    if data is None:
+        return None
+    return dump_canonical(data)
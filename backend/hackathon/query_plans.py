@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Callable
+
+from django.db.models import Count, Max, Q, Sum
+
+from .leaderboard import OVERALL, bucket_results, this_week_bucket, today_bucket
+from .models import Crosswordpuzzlebank, Crosswordpuzzleresults, LeaderboardRollup
+from .result_columns import score_expression
+
+SAMPLE_EMAIL = 'player@example.com'
+SAMPLE_PUZZLE = '101'
+SAMPLE_TIME = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+WATCHED_TABLES = {
+    Crosswordpuzzleresults._meta.db_table,
+    Crosswordpuzzlebank._meta.db_table,
+    LeaderboardRollup._meta.db_table,
+}
+
+
+@dataclass(frozen=True)
+class PlanCheck:
+    name: str
+    queryset: Callable
+    # Reads every row by design (e.g. the overall aggregate without rollups)
+    allow_scan: bool = False
+
+
+def _leaderboard(bucket: str):
+    return _aggregate(bucket_results(bucket))
+
+
+def _aggregate(results):
+    return results.values('email').annotate(totalScore=Sum(score_expression()), roundsPlayed=Count('id')).order_by('-totalScore')
+
+
+def _event_leaderboard():
+    # Same filter bucket_results applies to an event window, without needing one configured
+    results = bucket_results(OVERALL).filter(createddate__gte=SAMPLE_TIME, createddate__lt=SAMPLE_TIME + timedelta(hours=8))
+    return _aggregate(results)
+
+
+def _rollups():
+    return LeaderboardRollup.objects.filter(bucket=OVERALL)
+
+
+# One entry per query shape issued by hackathon/views.py (and the helpers it
+# calls); keep in step when a view gains or changes a query.
+PLAN_CHECKS = (
+    PlanCheck('puzzle by id', lambda: Crosswordpuzzlebank.objects.filter(puzzleid=SAMPLE_PUZZLE)),
+    PlanCheck('puzzle pack', lambda: Crosswordpuzzlebank.objects.filter(puzzleid__in=[SAMPLE_PUZZLE, '102'])),
+    PlanCheck(
+        'submission by session',
+        lambda: Crosswordpuzzleresults.objects.filter(attemptid='attempt', puzzleid=SAMPLE_PUZZLE),
+    ),
+    PlanCheck('leaderboard overall', lambda: _leaderboard(OVERALL), allow_scan=True),
+    PlanCheck('leaderboard today', lambda: _leaderboard(today_bucket())),
+    PlanCheck('leaderboard week', lambda: _leaderboard(this_week_bucket())),
+    PlanCheck('leaderboard event', _event_leaderboard),
+    PlanCheck(
+        'rollup top',
+        lambda: LeaderboardRollup.objects.filter(bucket=OVERALL).order_by('-total_score', 'email')[:10],
+    ),
+    PlanCheck(
+        'rollup page ties',
+        lambda: LeaderboardRollup.objects.filter(bucket=OVERALL, total_score=10.0, email__gt=SAMPLE_EMAIL).order_by('email')[:20],
+    ),
+    PlanCheck(
+        'rollup page after',
+        lambda: LeaderboardRollup.objects.filter(bucket=OVERALL, total_score__lt=10.0).order_by('-total_score', 'email')[:20],
+    ),
+    PlanCheck(
+        'rollup page ties before',
+        lambda: _rollups().filter(total_score=10.0, email__lt=SAMPLE_EMAIL).order_by('-email')[:5],
+    ),
+    PlanCheck(
+        'rollup page before',
+        lambda: _rollups().filter(total_score__gt=10.0).order_by('total_score', '-email')[:5],
+    ),
+    PlanCheck('rollup rank above', lambda: _rollups().filter(total_score__gt=10.0).values('id')),
+    PlanCheck('rollup rank ties', lambda: _rollups().filter(total_score=10.0, email__lt=SAMPLE_EMAIL).values('id')),
+    PlanCheck('rollup player', lambda: LeaderboardRollup.objects.filter(bucket=OVERALL, email=SAMPLE_EMAIL)),
+    PlanCheck(
+        'analytics',
+        lambda: Crosswordpuzzleresults.objects.filter(email=SAMPLE_EMAIL).values('email').annotate(
+            games=Count('id'), wins=Count('id', filter=Q(status=1)), best=Max(score_expression())
+        ),
+    ),
+    PlanCheck(
+        'dashboard history',
+        lambda: Crosswordpuzzleresults.objects.filter(email=SAMPLE_EMAIL).order_by('-createddate', '-id')[:101],
+    ),
+    PlanCheck(
+        'game history page',
+        lambda: Crosswordpuzzleresults.objects.filter(
+            Q(createddate=SAMPLE_TIME, id__gt=1) | Q(createddate__gt=SAMPLE_TIME), email=SAMPLE_EMAIL
+        )
+        .order_by('createddate', 'id')
+        .values('id', 'createddate')[:51],
+    ),
+)
+
+
+def explain(queryset, vendor: str) -> str:
+    if vendor == 'mysql':
+        return queryset.explain(format='json')
+    return queryset.explain()
+
+
+def full_scans(plan: str, vendor: str) -> set[str]:
+    """Watched tables the plan reads in full."""
+    if vendor == 'mysql':
+        return {table for table, access in _mysql_access(json.loads(plan)) if access == 'ALL' and table in WATCHED_TABLES}
+    if vendor == 'sqlite':
+        scans = set()
+        for line in plan.splitlines():
+            match = re.search(r'\bSCAN (?:TABLE )?(\w+)(.*)', line)
+            if match and match.group(1) in WATCHED_TABLES and 'INDEX' not in match.group(2):
+                scans.add(match.group(1))
+        return scans
+    raise ValueError(f'Query plans are not checked on {vendor}')
+
+
+def _mysql_access(node):
+    if isinstance(node, dict):
+        if 'table_name' in node and 'access_type' in node:
+            yield node['table_name'], node['access_type']
+        for value in node.values():
+            yield from _mysql_access(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _mysql_access(value)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+
+MAX_LEVEL = 24
+NGRAM_SIZE = 3
+
+
+@dataclass(frozen=True)
+class RankedPlayer:
+    rank: int
+    email: str
+    total_score: float
+    rounds_played: int
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+class EmailSearchIndex:
+    """
+    Case-insensitive substring search over emails through n-gram posting lists
+    (n = 1..3). A query is answered from the posting lists of its own n-grams
+    (trigrams once it is long enough), so the work follows the number of
+    candidate matches rather than the number of players.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, set[str]] = {}
+        self._normalized: dict[str, str] = {}
+
+    def add(self, email: str) -> None:
+        if email in self._normalized:
+            return
+        normalized = normalize_email(email)
+        self._normalized[email] = normalized
+        for size in range(1, NGRAM_SIZE + 1):
+            for gram in _ngrams(normalized, size):
+                self._postings.setdefault(gram, set()).add(email)
+
+    def search(self, query: str) -> set[str]:
+        query = normalize_email(query)
+        if not query:
+            return set()
+        grams = _ngrams(query, min(len(query), NGRAM_SIZE))
+        postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+        if not postings[0]:
+            return set()
+        candidates = postings[0].intersection(*postings[1:])
+        if len(query) <= NGRAM_SIZE:
+            return candidates
+        return {email for email in candidates if query in self._normalized[email]}
+
+
+def _ngrams(text: str, size: int) -> set[str]:
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, height: int):
+        self.key = key
+        self.next: list[_Node | None] = [None] * height
+        self.width = [1] * height
+
+
+class RankIndex:
+    """
+    Players ordered by (-total score, email), kept in an indexable skip list so
+    rank-of-player, top-k and neighbourhood lookups are O(log n). Not thread
+    safe; callers serialize access.
+    """
+
+    def __init__(self, rows=()):
+        self._head = _Node(None, MAX_LEVEL)
+        self._size = 0
+        self._players: dict[str, tuple[float, int]] = {}
+        self._search = EmailSearchIndex()
+        for email, total_score, rounds_played in rows:
+            self.add(email, total_score, rounds_played)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, email: str) -> bool:
+        return email in self._players
+
+    def add(self, email: str, score: float, rounds: int) -> None:
+        """Add score and rounds to a player's totals, inserting the player if new."""
+        old = self._players.get(email)
+        if old is not None:
+            self._remove((-old[0], email))
+            score += old[0]
+            rounds += old[1]
+        else:
+            self._search.add(email)
+        self._players[email] = (score, rounds)
+        self._insert((-score, email))
+
+    def rank(self, email: str) -> RankedPlayer | None:
+        totals = self._players.get(email)
+        if totals is None:
+            return None
+        position, _ = self._find((-totals[0], email))
+        return RankedPlayer(position + 1, email, totals[0], totals[1])
+
+    def search(self, query: str, start: int = 0, count: int | None = None) -> tuple[int, list[RankedPlayer]]:
+        """
+        Number of players whose email matches ``query`` (see EmailSearchIndex)
+        and ``count`` of them from position ``start``, in rank order.
+        """
+        emails = sorted(self._search.search(query), key=lambda email: (-self._players[email][0], email))
+        end = len(emails) if count is None else start + count
+        return len(emails), [self.rank(email) for email in emails[start:end]]
+
+    def top(self, limit: int) -> list[RankedPlayer]:
+        return self.slice(0, limit)
+
+    def around(self, email: str, radius: int) -> list[RankedPlayer]:
+        """The player plus up to ``radius`` players ranked directly above and below."""
+        player = self.rank(email)
+        if player is None:
+            return []
+        start = max(0, player.rank - 1 - radius)
+        return self.slice(start, player.rank + radius - start)
+
+    def slice(self, start: int, count: int) -> list[RankedPlayer]:
+        """``count`` players starting at 0-based position ``start``."""
+        if start < 0 or start >= self._size or count <= 0:
+            return []
+        node = self._at(start)
+        players = []
+        while node is not None and len(players) < count:
+            email = node.key[1]
+            score, rounds = self._players[email]
+            players.append(RankedPlayer(start + len(players) + 1, email, score, rounds))
+            node = node.next[0]
+        return players
+
+    def __iter__(self):
+        node = self._head.next[0]
+        position = 0
+        while node is not None:
+            position += 1
+            email = node.key[1]
+            score, rounds = self._players[email]
+            yield RankedPlayer(position, email, score, rounds)
+            node = node.next[0]
+
+    def _find(self, key) -> tuple[int, list[tuple[_Node, int]]]:
+        """Position of the last node before ``key`` and the predecessor at every level."""
+        node = self._head
+        position = 0
+        path = [None] * MAX_LEVEL
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            path[level] = (node, position)
+        return position, path
+
+    def _at(self, index: int) -> _Node:
+        node = self._head
+        position = 0
+        target = index + 1
+        for level in reversed(range(MAX_LEVEL)):
+            while node.next[level] is not None and position + node.width[level] <= target:
+                position += node.width[level]
+                node = node.next[level]
+        return node
+
+    def _insert(self, key) -> None:
+        position, path = self._find(key)
+        height = 1
+        while height < MAX_LEVEL and random.random() < 0.5:
+            height += 1
+
+        new = _Node(key, height)
+        for level in range(height):
+            prev, prev_position = path[level]
+            new.next[level] = prev.next[level]
+            prev.next[level] = new
+            new.width[level] = prev.width[level] - (position - prev_position)
+            prev.width[level] = position - prev_position + 1
+        for level in range(height, MAX_LEVEL):
+            path[level][0].width[level] += 1
+        self._size += 1
+
+    def _remove(self, key) -> None:
+        _, path = self._find(key)
+        target = path[0][0].next[0]
+        for level in range(MAX_LEVEL):
+            prev = path[level][0]
+            if prev.next[level] is target:
+                prev.width[level] += target.width[level] - 1
+                prev.next[level] = target.next[level]
+            else:
+                prev.width[level] -= 1
+        self._size -= 1
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from .scoring import parse_number
+
+# Model fields of the typed columns, present only with RESULTS_TYPED_COLUMNS_WRITE
+TYPED_FIELDS = ('score_value', 'duration_seconds')
+
+
+def typed_values(gamescore, duration) -> dict:
+    """
+    scoreValue/durationSeconds shadow columns for a result's gameScore/duration
+    strings; empty while RESULTS_TYPED_COLUMNS leaves the columns off the model.
+    """
+    if not settings.RESULTS_TYPED_COLUMNS_WRITE:
+        return {}
+    return {
+        'score_value': None if gamescore in (None, '') else float(parse_number(gamescore)),
+        'duration_seconds': None if duration in (None, '') else round(parse_number(duration)),
+    }
+
+
+def score_expression():
+    """gameScore as a number: the typed column once backfilled, else a per-row cast."""
+    if settings.RESULTS_TYPED_COLUMNS:
+        return F('score_value')
+    return Cast('gamescore', FloatField())
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from operator import itemgetter
+
+
+DEFAULT_GRID_SIZE = 9
+TIME_BONUS_MIN_WORDS = 6
+TIME_BONUS_PER_SECOND = 0.1
+
+
+@dataclass(frozen=True)
+class GridGeometry:
+    """Row-major grid with cells numbered 1..rows*cols."""
+
+    rows: int = DEFAULT_GRID_SIZE
+    cols: int = DEFAULT_GRID_SIZE
+
+    @property
+    def cell_count(self) -> int:
+        return self.rows * self.cols
+
+    def step(self, direction: str) -> int:
+        return 1 if direction == 'across' else self.cols
+
+    def word_cells(self, start_cell: int, length: int, direction: str) -> tuple[int, ...]:
+        step = self.step(direction)
+        return tuple(start_cell + (i * step) for i in range(length))
+
+    def fits(self, start_cell: int, length: int, direction: str) -> bool:
+        if length < 1 or not 1 <= start_cell <= self.cell_count:
+            return False
+        row, col = divmod(start_cell - 1, self.cols)
+        if direction == 'across':
+            return col + length <= self.cols
+        return row + length <= self.rows
+
+
+@dataclass(frozen=True)
+class ScoreResult:
+    correct_words: int
+    total_words: int
+    across: tuple[bool, ...]
+    down: tuple[bool, ...]
+
+    @property
+    def all_words_correct(self) -> bool:
+        return self.correct_words == self.total_words
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """
+    Flat, precompiled answer key for one puzzle.
+
+    ``cell_keys`` lists every cell any word covers (as the grid's string keys);
+    ``slot_cells``/``expected`` describe each word letter in order, and ``spans``
+    gives the [start, end) slice of each word in those arrays, across words first.
+    A span of None marks a word that can never be scored correct. ``problems``
+    lists words that do not fit the puzzle geometry or cross a black box, and
+    ``word_starts`` maps (direction, start cell) to the word's index.
+    """
+
+    geometry: GridGeometry
+    cell_keys: tuple[str, ...]
+    slot_cells: tuple[int, ...]
+    expected: tuple[str, ...]
+    spans: tuple[tuple[int, int] | None, ...]
+    across_count: int
+    problems: tuple[str, ...] = ()
+    word_starts: dict = field(default_factory=dict, repr=False, compare=False)
+    _gather: object = field(init=False, repr=False, compare=False)
+    _word_slices: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if len(self.slot_cells) == 1:
+            index = self.slot_cells[0]
+            gather = lambda letters: (letters[index],)  # noqa: E731
+        elif not self.slot_cells:
+            gather = lambda letters: ()  # noqa: E731
+        else:
+            gather = itemgetter(*self.slot_cells)
+        object.__setattr__(self, '_gather', gather)
+        object.__setattr__(
+            self,
+            '_word_slices',
+            tuple(slice(*span) if span is not None else None for span in self.spans),
+        )
+
+    @property
+    def total_words(self) -> int:
+        return len(self.spans)
+
+    def word_cells(self, index: int) -> tuple[str, ...]:
+        span = self.spans[index]
+        if span is None:
+            return ()
+        return tuple(self.cell_keys[self.slot_cells[i]] for i in range(*span))
+
+    def check_word(self, direction: str, start_cell: int, answer: str) -> bool | None:
+        """Check one entry in O(word length); None if no such word exists."""
+        index = self.word_starts.get((direction, start_cell))
+        if index is None:
+            return None
+        word = self._word_slices[index]
+        expected = self.expected[word]
+        answer = answer.upper()
+        return len(answer) == len(expected) and tuple(answer) == expected
+
+    def score(self, submitted_grid) -> ScoreResult:
+        if not isinstance(submitted_grid, dict):
+            submitted_grid = {}
+
+        letters = [value.upper() if isinstance(value, str) else '' for value in map(submitted_grid.get, self.cell_keys)]
+        got = self._gather(letters)
+        expected = self.expected
+
+        if got == expected:
+            results = tuple(word is not None for word in self._word_slices)
+        else:
+            results = tuple(word is not None and got[word] == expected[word] for word in self._word_slices)
+
+        return ScoreResult(
+            correct_words=sum(results),
+            total_words=len(results),
+            across=results[: self.across_count],
+            down=results[self.across_count :],
+        )
+
+
+def compile_answer_key(across_hints, down_hints, geometry: GridGeometry | None = None, black_boxes=()) -> AnswerKey:
+    geometry = geometry or GridGeometry()
+    black_boxes = frozenset(black_boxes)
+    cell_index: dict[str, int] = {}
+    slot_cells: list[int] = []
+    expected: list[str] = []
+    spans: list[tuple[int, int] | None] = []
+    problems: list[str] = []
+    word_starts: dict[tuple[str, int], int] = {}
+
+    for direction, hints in (('across', across_hints), ('down', down_hints)):
+        aborted = False
+        for number, hint in enumerate(hints, start=1):
+            # A malformed hint used to abort checking the rest of its direction;
+            # keep that so historical scores stay identical.
+            if aborted or not isinstance(hint, dict) or 'answer' not in hint or 'cellID' not in hint:
+                spans.append(None)
+                continue
+            try:
+                start_cell = int(hint['cellID'])
+                answer_text = hint['answer'].upper()
+            except (TypeError, ValueError, AttributeError):
+                aborted = True
+                spans.append(None)
+                problems.append(f'{direction} {number}: unreadable cellID or answer')
+                continue
+
+            cells = geometry.word_cells(start_cell, len(answer_text), direction)
+            if not geometry.fits(start_cell, len(answer_text), direction):
+                problems.append(f'{direction} {number}: does not fit a {geometry.rows}x{geometry.cols} grid')
+            elif black_boxes.intersection(cells):
+                problems.append(f'{direction} {number}: crosses a black box')
+
+            start = len(expected)
+            for cell, char in zip(cells, answer_text):
+                key = str(cell)
+                if key not in cell_index:
+                    cell_index[key] = len(cell_index)
+                slot_cells.append(cell_index[key])
+                expected.append(char)
+            word_starts.setdefault((direction, start_cell), len(spans))
+            spans.append((start, len(expected)))
+
+    return AnswerKey(
+        geometry=geometry,
+        cell_keys=tuple(cell_index),
+        slot_cells=tuple(slot_cells),
+        expected=tuple(expected),
+        spans=tuple(spans),
+        across_count=len(across_hints),
+        problems=tuple(problems),
+        word_starts=word_starts,
+    )
+
+
+def parse_number(raw):
+    """Read a stored gameScore/duration string back as the int or float it was written from."""
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return float(raw)
+    except (TypeError, ValueError):
+        return 0
+
+
+def compute_score(
+    correct_words: int,
+    time_remaining,
+    *,
+    min_words: int = TIME_BONUS_MIN_WORDS,
+    per_second: float = TIME_BONUS_PER_SECOND,
+):
+    # Score: 1 point per correct word + time bonus only if 6 or more words are correct
+    if correct_words >= min_words:
+        return correct_words + (time_remaining * per_second)
+    return correct_words
+
+
+# Offline rescoring (see the rescore_results command). These run inside worker
+# processes, so they only depend on this module and never touch Django.
+_worker_keys: dict[str, AnswerKey] = {}
+_worker_rule: dict = {}
+
+
+def init_rescore_worker(puzzles: dict, rule: dict) -> None:
+    """Compile answer keys once per worker from {puzzle_id: (across, down, rows, cols, black_boxes)}."""
+    _worker_keys.clear()
+    for puzzle_id, (across, down, rows, cols, black_boxes) in puzzles.items():
+        _worker_keys[puzzle_id] = compile_answer_key(
+            across, down, geometry=GridGeometry(rows=rows, cols=cols), black_boxes=black_boxes
+        )
+    _worker_rule.clear()
+    _worker_rule.update(rule)
+
+
+def rescore_batch(rows) -> list[tuple[int, str, int, int, int]]:
+    """
+    Score (id, puzzle_id, submitted_json, duration) rows; returns
+    (id, gamescore, status, correct_words, total_words).
+    """
+    results = []
+    for result_id, puzzle_id, submitted, duration in rows:
+        key = _worker_keys.get(puzzle_id)
+        if key is None:
+            continue
+        try:
+            grid = json.loads(submitted) if submitted else {}
+        except json.JSONDecodeError:
+            grid = {}
+        scored = key.score(grid)
+        score = compute_score(scored.correct_words, parse_number(duration), **_worker_rule)
+        results.append(
+            (result_id, str(score), 1 if scored.all_words_correct else 0, scored.correct_words, scored.total_words)
+        )
+    return results
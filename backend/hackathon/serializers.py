@@ -1,57 +1,33 @@
 from rest_framework import serializers
 from .models import Crosswordpuzzlebank
-import json
+from .puzzle_format import parse_black_boxes, parse_hint_array
+from .scoring import DEFAULT_GRID_SIZE
 
 class CrosswordPuzzleSerializer(serializers.ModelSerializer):
     acrossHints = serializers.SerializerMethodField()
     downHints = serializers.SerializerMethodField()
     blackBoxArray = serializers.SerializerMethodField()
     puzzleID = serializers.CharField(source='puzzleid')
+    rows = serializers.SerializerMethodField()
+    cols = serializers.SerializerMethodField()
 
     class Meta:
         model = Crosswordpuzzlebank
-        fields = ['puzzleID', 'acrossHints', 'downHints', 'blackBoxArray', 'status']
+        fields = ['puzzleID', 'acrossHints', 'downHints', 'blackBoxArray', 'status', 'rows', 'cols']
 
+    # Canonical JSON rows take the plain json.loads path; only legacy single-quoted
+    # rows (see the normalize_puzzles command) fall through to the repair parser.
     def get_acrossHints(self, obj):
-        if obj.accrosshintarray:
-            try:
-                # Replace single quotes with double quotes if necessary, distinct possibility in legacy data
-                data = obj.accrosshintarray
-                if isinstance(data, str):
-                    # Basic cleanup for potential single-quoted JSON
-                    if data.startswith("'") or '{\'' in data:
-                        data = data.replace("'", '"')
-                    return json.loads(data)
-                return data
-            except json.JSONDecodeError:
-                return []
-        return []
+        return parse_hint_array(obj.accrosshintarray) or []
 
     def get_downHints(self, obj):
-        if obj.downhintarray:
-            try:
-                data = obj.downhintarray
-                if isinstance(data, str):
-                    if data.startswith("'") or '{\'' in data:
-                        data = data.replace("'", '"')
-                    return json.loads(data)
-                return data
-            except json.JSONDecodeError:
-                return []
-        return []
+        return parse_hint_array(obj.downhintarray) or []
 
     def get_blackBoxArray(self, obj):
-        if obj.blackboxarray:
-            try:
-                data = obj.blackboxarray
-                if isinstance(data, str):
-                    # Check if it's a simple list like "[1, 2, 3]"
-                    return json.loads(data)
-                return data
-            except json.JSONDecodeError:
-                # Fallback implementation if it's comma separated string
-                try:
-                    return [int(x) for x in obj.blackboxarray.split(',') if x.strip().isdigit()]
-                except:
-                    return []
-        return []
+        return parse_black_boxes(obj.blackboxarray) or []
+
+    def get_rows(self, obj):
+        return obj.gridrows or DEFAULT_GRID_SIZE
+
+    def get_cols(self, obj):
+        return obj.gridcols or DEFAULT_GRID_SIZE
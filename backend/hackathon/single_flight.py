@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+
+
+class Flight:
+    """One in-progress computation; callers that find it wait for its outcome instead of repeating it."""
+
+    def __init__(self):
+        self.result = None
+        self.error: BaseException | None = None
+        self._done = threading.Event()
+
+    def run(self, compute):
+        """Record compute()'s result, or its error, which is re-raised."""
+        try:
+            self.result = compute()
+        except BaseException as exc:
+            self.error = exc
+            raise
+        return self.result
+
+    def fail(self, error: BaseException) -> None:
+        self.error = error
+
+    def land(self) -> None:
+        """Release the waiters; call after the owner has stored or dropped the result."""
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class Flights:
+    """
+    Flights in progress by key. Not locked itself: callers hold the lock that
+    guards their cache entries, so a key is looked up and joined atomically.
+    """
+
+    def __init__(self):
+        self._flights: dict = {}
+
+    def join(self, key) -> tuple[Flight, bool]:
+        """The key's flight and whether the caller leads it (it was just started)."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = self._flights[key] = Flight()
+        return flight, True
+
+    def finish(self, key) -> None:
+        self._flights.pop(key, None)
+
+    def __contains__(self, key) -> bool:
+        return key in self._flights
@@ -0,0 +1,88 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase
+
+from hackathon.db_router import hackathon_database
+from hackathon.query_plans import PLAN_CHECKS, full_scans
+
+from .utils import create_unmanaged_tables
+
+
+class FullScansTests(SimpleTestCase):
+    def test_sqlite_plans(self):
+        plan = '\n'.join([
+            '2 0 0 SCAN crosswordpuzzleresults',
+            '3 0 0 SCAN leaderboard_rollup USING INDEX idx_rollup_bucket_score',
+            '4 0 0 SEARCH crosswordpuzzlebank USING INDEX sqlite_autoindex_crosswordpuzzlebank_1 (puzzleID=?)',
+            '5 0 0 SCAN some_other_table',
+        ])
+        self.assertEqual(full_scans(plan, 'sqlite'), {'crosswordpuzzleresults'})
+
+    def test_mysql_plans(self):
+        plan = json.dumps({'query_block': {'nested_loop': [
+            {'table': {'table_name': 'crosswordpuzzleresults', 'access_type': 'ref'}},
+            {'table': {'table_name': 'leaderboard_rollup', 'access_type': 'ALL'}},
+            {'table': {'table_name': 'derived', 'access_type': 'ALL'}},
+        ]}})
+        self.assertEqual(full_scans(plan, 'mysql'), {'leaderboard_rollup'})
+
+
+class CheckIndexesTests(TransactionTestCase):
+    # Schema changes need autocommit on SQLite
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables()
+        super().setUpClass()
+
+    def setUp(self):
+        self.connection = connections[hackathon_database()]
+        # create_model leaves the indexes of unmanaged models out
+        self.check_indexes('--create', '--skip-plans')
+
+    def check_indexes(self, *args):
+        out = StringIO()
+        call_command('check_indexes', *args, stdout=out)
+        return out.getvalue()
+
+    def drop_index(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP INDEX {name}')
+
+    def test_declared_indexes_and_plans_pass(self):
+        out = self.check_indexes()
+        self.assertIn('ok       crosswordpuzzleresults.idx_results_email_created', out)
+        self.assertIn('indexed  dashboard history', out)
+        self.assertIn('Indexes and query plans OK.', out)
+
+    def test_missing_index_fails_until_created(self):
+        self.drop_index('idx_results_email_created')
+
+        with self.assertRaisesMessage(CommandError, '1 missing index(es)'):
+            self.check_indexes('--skip-plans')
+
+        out = self.check_indexes('--create', '--skip-plans')
+        self.assertIn('created  crosswordpuzzleresults.idx_results_email_created', out)
+        self.check_indexes('--skip-plans')
+
+    def test_plan_regression_fails(self):
+        self.drop_index('idx_results_email_created')
+        self.drop_index('idx_results_created_email')
+
+        with self.assertRaises(CommandError) as raised:
+            self.check_indexes('--database', hackathon_database())
+        self.assertIn('full table scans in:', str(raised.exception))
+        self.assertIn('dashboard history', str(raised.exception))
+
+    def test_plans_are_saved(self):
+        path = Path(self.enterContext(tempfile.TemporaryDirectory())) / 'plans.json'
+        self.check_indexes('--save-plans', str(path))
+        plans = json.loads(path.read_text())
+        self.assertEqual(list(plans), [check.name for check in PLAN_CHECKS])
+        self.assertIn('idx_results_email_created', plans['dashboard history'])
@@ -0,0 +1,182 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from hackathon import db_pool
+from hackathon.db_pool import ConnectionPool, PooledDatabaseWrapperMixin, PoolTimeout
+
+from .utils import wait_until
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.closed = False
+
+    def ping(self):
+        if not self.alive:
+            raise OSError('server has gone away')
+
+    def close(self):
+        self.closed = True
+
+
+class PoolTestCase(SimpleTestCase):
+    def setUp(self):
+        self.opened = []
+
+    def connect(self):
+        connection = FakeConnection(len(self.opened) + 1)
+        self.opened.append(connection)
+        return connection
+
+    @staticmethod
+    def ping(connection):
+        connection.ping()
+
+    def pool(self, **options):
+        pool = ConnectionPool(self.connect, self.ping, **options)
+        # Reaping is exercised through reap() directly
+        pool._reaper = threading.current_thread()
+        return pool
+
+
+class ConnectionPoolTests(PoolTestCase):
+    def test_released_connections_are_reused(self):
+        pool = self.pool(max_size=2)
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual(pool.metrics()['inUse'], 1)
+
+    def test_waits_for_a_release_up_to_the_timeout(self):
+        pool = self.pool(max_size=1, timeout=2)
+        held = pool.acquire()
+        threading.Timer(0.05, pool.release, args=(held,)).start()
+
+        self.assertIs(pool.acquire(), held)
+        metrics = pool.metrics()
+        self.assertEqual(metrics['waits'], 1)
+        self.assertGreater(metrics['waitMsMax'], 0)
+
+        pool.timeout = 0.01
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        self.assertEqual(pool.metrics()['timeouts'], 1)
+
+    def test_dead_connections_are_replaced_after_a_failed_ping(self):
+        pool = self.pool()
+        dead = pool.acquire()
+        pool.release(dead)
+        dead.alive = False
+
+        fresh = pool.acquire()
+        self.assertIsNot(fresh, dead)
+        self.assertTrue(dead.closed)
+        self.assertEqual(pool.metrics()['pingFailures'], 1)
+        self.assertEqual(pool.metrics()['size'], 1)
+
+    def test_connections_are_closed_after_max_lifetime(self):
+        pool = self.pool(max_lifetime=0.02)
+        old = pool.acquire()
+        time.sleep(0.03)
+        pool.release(old)
+        self.assertTrue(old.closed)
+        self.assertIsNot(pool.acquire(), old)
+
+    def test_unreusable_connections_are_discarded(self):
+        pool = self.pool()
+        connection = pool.acquire()
+        pool.release(connection, reusable=False)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.metrics()['size'], 0)
+
+    def test_failed_connect_frees_its_slot(self):
+        pool = ConnectionPool(mock.Mock(side_effect=OSError('refused')), self.ping, max_size=1, timeout=0.01)
+        pool._reaper = threading.current_thread()
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                pool.acquire()
+        self.assertEqual(pool.metrics()['size'], 0)
+
+    def test_reap_closes_idle_connections_down_to_min_size(self):
+        pool = self.pool(min_size=1, idle_timeout=0.01)
+        connections = [pool.acquire() for _ in range(3)]
+        for connection in connections:
+            pool.release(connection)
+        time.sleep(0.02)
+
+        pool.reap()
+        self.assertEqual(pool.metrics()['size'], 1)
+        self.assertEqual(sum(connection.closed for connection in connections), 2)
+
+    def test_reap_opens_min_size(self):
+        pool = self.pool(min_size=2)
+        pool.reap()
+        self.assertEqual((pool.metrics()['size'], pool.metrics()['idle']), (2, 2))
+
+    def test_reaper_thread_keeps_min_size(self):
+        pool = ConnectionPool(self.connect, self.ping, min_size=2)
+        pool.release(pool.acquire())
+        wait_until(lambda: pool.metrics()['idle'] == 2)
+
+    def test_forked_child_forgets_the_parents_connections(self):
+        pool = self.pool()
+        inherited = pool.acquire()
+        pool.release(pool.acquire())
+
+        with mock.patch.object(db_pool.os, 'getpid', return_value=-1):
+            pool.release(inherited)
+            connection = pool.acquire()
+
+        self.assertNotIn(connection, self.opened[:2])
+        self.assertFalse(any(connection.closed for connection in self.opened))
+        self.assertEqual(pool.metrics()['size'], 1)
+
+
+class _FakeWrapper:
+    def __init__(self, connect):
+        self.connect = connect
+
+    def get_new_connection(self, conn_params):
+        return self.connect()
+
+
+class _PooledWrapper(PooledDatabaseWrapperMixin, _FakeWrapper):
+    def __init__(self, connect):
+        super().__init__(connect)
+        self.alias = 'pooled-test'
+        self.settings_dict = {'AUTOCOMMIT': True, 'POOL': {'max_size': 2}}
+        self.connection = None
+        self.in_atomic_block = False
+        self.autocommit = True
+
+    def connect_and_close(self, in_atomic_block=False):
+        self.connection = self.get_new_connection({})
+        self.in_atomic_block = in_atomic_block
+        connection = self.connection
+        self._close()
+        self.connection = None
+        return connection
+
+
+class PooledDatabaseWrapperTests(PoolTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(db_pool._pools.pop, 'pooled-test', None)
+
+    def test_close_returns_the_connection_to_the_alias_pool(self):
+        wrapper = _PooledWrapper(self.connect)
+        first = wrapper.connect_and_close()
+        self.assertIs(wrapper.connect_and_close(), first)
+        self.assertEqual(db_pool.pool_metrics()['pooled-test']['maxSize'], 2)
+
+    def test_connection_closed_mid_transaction_is_discarded(self):
+        wrapper = _PooledWrapper(self.connect)
+        first = wrapper.connect_and_close(in_atomic_block=True)
+        self.assertTrue(first.closed)
+        self.assertIsNot(wrapper.connect_and_close(), first)
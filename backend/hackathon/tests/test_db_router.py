@@ -0,0 +1,140 @@
+import random
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import SimpleTestCase, TransactionTestCase
+
+from hackathon.db_router import HackathonDbRouter, ReplicaSet, replicas, use_primary
+from hackathon.idempotency import recent_submissions
+from hackathon.middleware import STICKY_COOKIE
+from hackathon.models import Crosswordpuzzlebank, Crosswordpuzzleresults, LeaderboardRollup
+from hackathon.puzzle_cache import puzzle_cache
+
+from .utils import SOLVED, create_puzzle, create_unmanaged_tables
+
+
+class ReplicaSetTests(SimpleTestCase):
+    databases = {'default'}
+
+    def replica_set(self, weights, healthy=()):
+        replica_set = ReplicaSet(weights, check_seconds=60)
+        self.enterContext(mock.patch.object(replica_set, '_probe', side_effect=lambda alias: alias in healthy))
+        return replica_set
+
+    def test_without_replicas_reads_go_to_the_primary(self):
+        self.assertEqual(ReplicaSet({}).choose('default'), 'default')
+        self.assertEqual(ReplicaSet({'replica1': 0}).choose('default'), 'default')
+
+    def test_weighted_choice_among_healthy_replicas(self):
+        replica_set = self.replica_set({'replica1': 3, 'replica2': 1, 'replica3': 5}, healthy={'replica1', 'replica2'})
+        random.seed(7)
+        chosen = [replica_set.choose('default') for _ in range(400)]
+
+        self.assertEqual(set(chosen), {'replica1', 'replica2'})
+        self.assertGreater(chosen.count('replica1'), 2 * chosen.count('replica2'))
+        self.assertFalse(replica_set.metrics()['replicas']['replica3']['healthy'])
+        self.assertEqual(replica_set._probe.call_count, 3)
+
+    def test_health_is_probed_once_per_interval(self):
+        replica_set = self.replica_set({'replica1': 1}, healthy={'replica1'})
+        for _ in range(5):
+            replica_set.choose('default')
+        self.assertEqual(replica_set._probe.call_count, 1)
+
+    def test_falls_back_to_the_primary_when_no_replica_is_healthy(self):
+        replica_set = self.replica_set({'replica1': 1})
+        self.assertEqual(replica_set.choose('default'), 'default')
+        self.assertEqual(replica_set.metrics()['fallbacks'], 1)
+
+    def test_primary_inside_use_primary_and_transactions(self):
+        replica_set = self.replica_set({'replica1': 1}, healthy={'replica1'})
+        with use_primary():
+            self.assertEqual(replica_set.choose('default'), 'default')
+        with transaction.atomic():
+            self.assertEqual(replica_set.choose('default'), 'default')
+        self.assertEqual(replica_set.choose('default'), 'replica1')
+
+
+class HackathonDbRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = HackathonDbRouter()
+        self.enterContext(mock.patch.object(replicas, 'choose', side_effect=lambda primary: 'replica1'))
+
+    def test_leaderboard_and_history_reads_go_to_replicas(self):
+        self.assertEqual(self.router.db_for_read(Crosswordpuzzleresults), 'replica1')
+        self.assertEqual(self.router.db_for_read(LeaderboardRollup), 'replica1')
+        self.assertEqual(self.router.db_for_read(Crosswordpuzzlebank), 'default')
+
+    def test_writes_go_to_the_primary(self):
+        self.assertEqual(self.router.db_for_write(Crosswordpuzzleresults), 'default')
+
+    def test_nothing_is_migrated_on_replicas(self):
+        with mock.patch.object(replicas, 'weights', {'replica1': 1}):
+            self.assertFalse(self.router.allow_migrate('replica1', 'hackathon', model_name='leaderboardrollup'))
+            self.assertTrue(self.router.allow_migrate('default', 'hackathon', model_name='leaderboardrollup'))
+
+
+class ReadYourWritesTests(TransactionTestCase):
+    """
+    Requests through ReadYourWritesMiddleware with one (never queried) replica
+    configured; outside a test transaction, which would pin reads to the primary.
+    """
+
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables()
+        super().setUpClass()
+
+    def setUp(self):
+        # Unmanaged tables are not flushed between tests
+        self.addCleanup(Crosswordpuzzleresults.objects.all().delete)
+        self.addCleanup(Crosswordpuzzlebank.objects.all().delete)
+        self.enterContext(mock.patch('builtins.print'))
+        self.enterContext(mock.patch.object(replicas, 'weights', {'replica1': 1}))
+        self.enterContext(mock.patch.object(replicas, '_reads', {'replica1': 0}))
+        self.enterContext(mock.patch.object(replicas, '_healthy', return_value=True))
+        self.stream = self.enterContext(mock.patch('hackathon.views._stream_history', side_effect=lambda email, using: iter(['[]'])))
+        cache.clear()
+        self.addCleanup(cache.clear)
+        puzzle_cache.invalidate()
+        recent_submissions.clear()
+        create_puzzle('101')
+
+    def submit(self):
+        return self.client.post(
+            '/api/crossword/submit',
+            {'puzzleID': '101', 'submittedPuzzle': SOLVED, 'timeRemaining': 30, 'attemptID': 'attempt-1', 'email': 'a@example.com'},
+            content_type='application/json',
+        )
+
+    def history_alias(self, email='a@example.com'):
+        self.stream.reset_mock()
+        response = self.client.get('/api/crossword/game-history', {'email': email})
+        self.assertEqual(b''.join(response.streaming_content), b'[]')
+        return self.stream.call_args.args[1]
+
+    def test_other_clients_read_history_from_a_replica(self):
+        self.assertEqual(self.history_alias(), 'replica1')
+
+    def test_history_stream_of_a_client_that_just_submitted_reads_the_primary(self):
+        response = self.submit()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+        # Sticky by its email even without the cookie, e.g. from another device
+        self.client.cookies.pop(STICKY_COOKIE)
+        self.assertEqual(self.history_alias(), 'default')
+        self.assertEqual(self.history_alias('b@example.com'), 'replica1')
+
+    def test_sticky_cookie_keeps_the_client_on_the_primary(self):
+        self.submit()
+        self.assertEqual(self.history_alias('b@example.com'), 'default')
+
+    def test_failed_writes_do_not_stick(self):
+        response = self.client.post('/api/crossword/submit', {'puzzleID': '999', 'email': 'a@example.com'}, content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.history_alias(), 'replica1')
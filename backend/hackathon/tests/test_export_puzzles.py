@@ -0,0 +1,59 @@
+import gzip
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+
+from hackathon.models import Crosswordpuzzlebank
+from hackathon.puzzle_cache import compile_puzzle
+
+from .utils import HackathonTestCase, create_puzzle
+
+
+class ExportPuzzlesTests(HackathonTestCase):
+    def setUp(self):
+        self.output = Path(self.enterContext(tempfile.TemporaryDirectory()))
+
+    def export(self, *args):
+        out = StringIO()
+        call_command('export_puzzles', '--output', str(self.output), *args, stdout=out)
+        return json.loads((self.output / 'manifest.json').read_text())['puzzles'], out.getvalue()
+
+    def test_exports_active_puzzles_with_content_hashed_names(self):
+        puzzle = create_puzzle('101')
+        create_puzzle('102', status=0)
+        puzzles, _ = self.export()
+
+        self.assertEqual(list(puzzles), ['101'])
+        entry = puzzles['101']
+        body = compile_puzzle(puzzle).body
+        self.assertEqual(entry['json'], f'101.{entry["hash"]}.json')
+        self.assertEqual((self.output / entry['json']).read_bytes(), body)
+        self.assertEqual(gzip.decompress((self.output / entry['gz']).read_bytes()), body)
+
+        puzzles, _ = self.export('--all-statuses')
+        self.assertEqual(sorted(puzzles), ['101', '102'])
+
+    def test_incremental_export_rewrites_only_changed_puzzles(self):
+        create_puzzle('101')
+        create_puzzle('102')
+        first, _ = self.export()
+
+        _, out = self.export()
+        self.assertIn('Puzzles exported: 0', out)
+        self.assertIn('Puzzles unchanged: 2', out)
+
+        Crosswordpuzzlebank.objects.filter(puzzleid='102').update(accrosshintarray='[]')
+        second, out = self.export()
+        self.assertIn('Puzzles exported: 1', out)
+        self.assertEqual(second['101'], first['101'])
+        self.assertNotEqual(second['102']['hash'], first['102']['hash'])
+        self.assertFalse((self.output / first['102']['json']).exists())
+        self.assertTrue((self.output / second['102']['json']).exists())
+
+        Crosswordpuzzlebank.objects.filter(puzzleid='101').delete()
+        third, _ = self.export()
+        self.assertEqual(list(third), ['102'])
+        self.assertFalse((self.output / first['101']['gz']).exists())
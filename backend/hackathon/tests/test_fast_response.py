@@ -0,0 +1,36 @@
+from django.test import RequestFactory
+
+from hackathon.puzzle_cache import puzzle_cache
+from hackathon.views import get_puzzle, get_puzzle_fast
+
+from .utils import ACROSS, DOWN, HackathonTestCase, create_puzzle
+
+
+class FastPuzzleResponseTests(HackathonTestCase):
+    def setUp(self):
+        puzzle_cache.invalidate()
+        create_puzzle('101', across=[dict(ACROSS[0], hint='café – “pet”'), ACROSS[1]], down=DOWN)
+        self.factory = RequestFactory()
+
+    def both(self, **params):
+        request = self.factory.get('/api/crossword/puzzle/101', params)
+        drf = get_puzzle(request, '101')
+        drf.render()
+        return drf, get_puzzle_fast(self.factory.get('/api/crossword/puzzle/101', params), '101')
+
+    def test_same_body_and_headers_as_drf_view(self):
+        for params in ({}, {'answers': '0'}):
+            with self.subTest(params=params):
+                drf, fast = self.both(**params)
+                self.assertEqual(fast.status_code, 200)
+                self.assertEqual(fast['Content-Type'], 'application/json')
+                self.assertEqual(fast.content, drf.content)
+                self.assertEqual(fast['ETag'], drf['ETag'])
+                self.assertEqual(fast['Cache-Control'], drf['Cache-Control'])
+
+    def test_not_modified_and_missing(self):
+        _, fast = self.both()
+        request = self.factory.get('/api/crossword/puzzle/101', HTTP_IF_NONE_MATCH=fast['ETag'])
+        self.assertEqual(get_puzzle_fast(request, '101').status_code, 304)
+        self.assertEqual(get_puzzle_fast(self.factory.get('/x'), '999').status_code, 404)
+        self.assertEqual(get_puzzle_fast(self.factory.post('/x'), '101').status_code, 405)
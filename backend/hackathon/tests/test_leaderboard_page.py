@@ -0,0 +1,95 @@
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from hackathon.leaderboard import OVERALL, rank_indexes
+from hackathon.models import LeaderboardRollup
+
+from .utils import HackathonTestCase
+
+
+# Ties on the score are ordered by email
+SCORES = [
+    ('a@example.com', 9.0),
+    ('b@example.com', 7.0),
+    ('c@example.com', 7.0),
+    ('d@example.com', 7.0),
+    ('e@example.com', 4.0),
+    ('f@example.com', 2.0),
+    ('g@example.com', 0.0),
+]
+ORDER = [email for email, _ in SCORES]
+
+
+@override_settings(LEADERBOARD_USE_ROLLUPS=True, LEADERBOARD_RANK_INDEX=False, LEADERBOARD_EVENT_WINDOWS={})
+class LeaderboardPageTests(HackathonTestCase):
+    def setUp(self):
+        LeaderboardRollup.objects.bulk_create(
+            LeaderboardRollup(bucket=OVERALL, email=email, total_score=score, rounds_played=1) for email, score in SCORES
+        )
+        LeaderboardRollup.objects.create(bucket='day:2000-01-01', email='z@example.com', total_score=99, rounds_played=1)
+        rank_indexes.invalidate()
+        self.addCleanup(rank_indexes.invalidate)
+
+    def get(self, **params):
+        return self.client.get('/api/crossword/leaderboard/page', params)
+
+    def test_pages_follow_the_cursor_to_the_end(self):
+        seen, cursor = [], None
+        while True:
+            data = self.get(pageSize=3, **({'cursor': cursor} if cursor else {})).json()
+            seen += [(row['rank'], row['email']) for row in data['results']]
+            cursor = data['nextCursor']
+            if cursor is None:
+                break
+        self.assertEqual(seen, list(enumerate(ORDER, 1)))
+
+    def test_page_is_a_bounded_query_without_offset(self):
+        first = self.get(pageSize=2).json()
+        with CaptureQueriesContext(connections['default']) as queries:
+            data = self.get(pageSize=2, cursor=first['nextCursor']).json()
+
+        self.assertEqual([row['email'] for row in data['results']], ['c@example.com', 'd@example.com'])
+        sql = [query['sql'] for query in queries if 'leaderboard_rollup' in query['sql']]
+        self.assertTrue(sql)
+        self.assertTrue(all('LIMIT' in statement and 'OFFSET' not in statement for statement in sql), sql)
+
+    def test_around_without_rank_index_leaves_ranks_out(self):
+        data = self.get(around='c@example.com', radius=1, pageSize=2).json()
+
+        self.assertIsNone(data['rank'])
+        self.assertEqual([(row['rank'], row['email']) for row in data['results']], [
+            (None, 'b@example.com'), (None, 'c@example.com'), (None, 'd@example.com'),
+        ])
+        following = self.get(pageSize=2, cursor=data['nextCursor']).json()
+        self.assertEqual([(row['rank'], row['email']) for row in following['results']], [
+            (None, 'e@example.com'), (None, 'f@example.com'),
+        ])
+
+    def test_around_with_rank_requested(self):
+        data = self.get(around='c@example.com', radius=1, withRank='1').json()
+
+        self.assertEqual(data['rank'], 3)
+        self.assertEqual([(row['rank'], row['email']) for row in data['results']], [
+            (2, 'b@example.com'), (3, 'c@example.com'), (4, 'd@example.com'),
+        ])
+        following = self.get(pageSize=1, cursor=data['nextCursor']).json()
+        self.assertEqual(following['results'][0]['rank'], 5)
+
+    @override_settings(LEADERBOARD_RANK_INDEX=True)
+    def test_around_takes_the_rank_from_the_rank_index(self):
+        rank_indexes.top(OVERALL, 1)
+        with CaptureQueriesContext(connections['default']) as queries:
+            data = self.get(around='f@example.com', radius=2).json()
+
+        self.assertEqual(data['rank'], 6)
+        self.assertEqual([row['email'] for row in data['results']], ORDER[3:])
+        self.assertIsNone(data['nextCursor'])
+        self.assertFalse([query for query in queries if 'COUNT' in query['sql']])
+
+    def test_errors(self):
+        self.assertEqual(self.get(around='nobody@example.com').status_code, 404)
+        self.assertEqual(self.get(cursor='not-a-cursor').status_code, 400)
+        self.assertEqual(self.get(pageSize='x').status_code, 400)
+        with self.settings(LEADERBOARD_USE_ROLLUPS=False):
+            self.assertEqual(self.get().status_code, 501)
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
+
+from hackathon import leaderboard
+from hackathon.leaderboard import (
+    OVERALL,
+    apply_results,
+    check_rebuilt,
+    day_bucket,
+    leaderboard_cache,
+    local_date,
+    rank_indexes,
+    week_bucket,
+)
+from hackathon.models import LeaderboardRollup
+
+from .utils import HackathonTestCase, create_result
+
+
+def rollups(bucket=OVERALL):
+    return {
+        row.email: (row.total_score, row.rounds_played, row.last_played)
+        for row in LeaderboardRollup.objects.filter(bucket=bucket)
+    }
+
+
+def store(**fields):
+    with transaction.atomic():
+        result = create_result(**fields)
+        apply_results([result])
+    return result
+
+
+@override_settings(LEADERBOARD_EVENT_WINDOWS={}, LEADERBOARD_TIME_ZONE='UTC')
+class ApplyResultsTests(HackathonTestCase):
+    def test_adds_to_overall_day_and_week_buckets(self):
+        first = store(gamescore='4')
+        second = store(gamescore='2.5')
+        store(email='b@example.com', gamescore='1')
+
+        today = local_date(first.createddate)
+        for bucket in (OVERALL, day_bucket(today), week_bucket(today)):
+            self.assertEqual(
+                rollups(bucket),
+                {
+                    'a@example.com': (6.5, 2, second.createddate),
+                    'b@example.com': (1.0, 1, rollups(bucket)['b@example.com'][2]),
+                },
+            )
+
+    def test_last_played_keeps_the_latest_and_fills_in_null(self):
+        late = datetime(2026, 3, 14, 12, tzinfo=dt_timezone.utc)
+        LeaderboardRollup.objects.create(bucket=OVERALL, email='a@example.com', total_score=1, rounds_played=1)
+
+        store(createddate=late)
+        store(createddate=late - timedelta(hours=1))
+
+        self.assertEqual(rollups()['a@example.com'], (9.0, 3, late))
+
+    def test_skips_results_without_email(self):
+        store(email='')
+        self.assertEqual(LeaderboardRollup.objects.count(), 0)
+
+
+@override_settings(LEADERBOARD_EVENT_WINDOWS={}, LEADERBOARD_TIME_ZONE='UTC')
+class RebuildLeaderboardTests(HackathonTestCase):
+    def setUp(self):
+        self.first = store(gamescore='4')
+        store(email='b@example.com', gamescore='2')
+        self.addCleanup(cache.delete, leaderboard.REBUILT_KEY)
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('rebuild_leaderboard', *args, stdout=out)
+        return out.getvalue()
+
+    def test_verify_reports_drift_without_writing(self):
+        LeaderboardRollup.objects.filter(bucket=OVERALL, email='a@example.com').update(total_score=99)
+        LeaderboardRollup.objects.create(bucket=OVERALL, email='gone@example.com', total_score=1, rounds_played=1)
+
+        out = self.run_command('--verify')
+
+        self.assertIn('Drifted rows: 2', out)
+        self.assertIn('gone@example.com: stored but has no results', out)
+        self.assertEqual(rollups()['a@example.com'][0], 99)
+
+    def test_verify_passes_on_maintained_rollups(self):
+        self.assertIn('Rollups match the results table.', self.run_command('--verify'))
+
+    def test_rebuild_fixes_only_drifted_rows(self):
+        LeaderboardRollup.objects.filter(bucket=OVERALL, email='a@example.com').update(total_score=99)
+        LeaderboardRollup.objects.create(bucket=OVERALL, email='gone@example.com', total_score=1, rounds_played=1)
+        untouched = LeaderboardRollup.objects.get(bucket=OVERALL, email='b@example.com').pk
+
+        out = self.run_command()
+
+        self.assertIn('Leaderboard rollups rebuilt (2 rows changed).', out)
+        self.assertEqual(rollups()['a@example.com'][:2], (4.0, 1))
+        self.assertNotIn('gone@example.com', rollups())
+        self.assertEqual(LeaderboardRollup.objects.get(bucket=OVERALL, email='b@example.com').pk, untouched)
+        self.assertIn('Rollups match the results table.', self.run_command('--verify'))
+
+    def test_results_stored_during_the_rebuild_are_kept(self):
+        # Stored (and applied to the rollups) after the high-water mark was read
+        high_water = self.first.id
+        store(gamescore='3')
+        store(email='c@example.com', gamescore='1')
+
+        with mock.patch(
+            'hackathon.management.commands.rebuild_leaderboard.results_high_water', return_value=high_water
+        ):
+            self.run_command()
+
+        overall = rollups()
+        self.assertEqual(overall['a@example.com'][:2], (7.0, 2))
+        self.assertEqual(overall['b@example.com'][:2], (2.0, 1))
+        self.assertEqual(overall['c@example.com'][:2], (1.0, 1))
+
+    def test_rebuild_drops_leaderboard_state(self):
+        LeaderboardRollup.objects.filter(bucket=OVERALL, email='a@example.com').update(total_score=99)
+        leaderboard_cache.get(OVERALL, lambda: 'stale')
+        self.addCleanup(leaderboard_cache.clear)
+
+        with mock.patch.object(rank_indexes, 'invalidate') as invalidate:
+            self.run_command()
+
+        invalidate.assert_called_once_with()
+        self.assertEqual(leaderboard_cache.get(OVERALL, lambda: 'fresh'), 'fresh')
+
+    def test_other_processes_drop_their_state_after_a_rebuild(self):
+        self.addCleanup(leaderboard_cache.clear)
+        with mock.patch.dict(leaderboard._rebuilt, {'seen': None, 'checked_at': float('-inf')}):
+            check_rebuilt()
+            leaderboard_cache.get(OVERALL, lambda: 'stale')
+
+            # What a rebuild in another process leaves behind
+            cache.set(leaderboard.REBUILT_KEY, 'elsewhere', None)
+            leaderboard._rebuilt['checked_at'] = float('-inf')
+            check_rebuilt()
+
+            self.assertEqual(leaderboard_cache.get(OVERALL, lambda: 'fresh'), 'fresh')
+            self.assertEqual(leaderboard._rebuilt['seen'], 'elsewhere')
@@ -0,0 +1,102 @@
+import asyncio
+
+from django.test import SimpleTestCase
+
+from hackathon.live import SUBSCRIBER_QUEUE_SIZE, DatabaseBackend, LeaderboardHub, LocalBackend
+
+from .utils import HackathonTestCase, create_result
+
+
+class LeaderboardHubTests(SimpleTestCase):
+    def setUp(self):
+        self.backend = LocalBackend()
+        self.scores = {'a@example.com': 3}
+
+    def compute(self, board):
+        return [{'email': email, 'score': score} for email, score in sorted(self.scores.items())]
+
+    def test_snapshot_then_delta_after_publish(self):
+        async def scenario():
+            hub = LeaderboardHub(self.backend, self.compute, tick=0.01)
+            queue = await hub.subscribe('overall')
+            snapshot = queue.get_nowait()
+
+            await asyncio.sleep(0.05)
+            self.assertTrue(queue.empty())
+
+            self.scores['b@example.com'] = 5
+            self.backend.publish()
+            delta = await asyncio.wait_for(queue.get(), 1)
+
+            hub.unsubscribe('overall', queue)
+            await asyncio.sleep(0.05)
+            return snapshot, delta, hub
+
+        snapshot, delta, hub = asyncio.run(scenario())
+        self.assertEqual(self.backend.version(), 1)
+        self.assertEqual(snapshot, {'type': 'snapshot', 'board': 'overall', 'rows': [{'email': 'a@example.com', 'score': 3}]})
+        self.assertEqual(
+            delta,
+            {'type': 'delta', 'board': 'overall', 'changed': [{'email': 'b@example.com', 'score': 5}], 'removed': []},
+        )
+        self.assertEqual(hub.metrics()['computes'], 2)
+        self.assertEqual(hub.metrics()['subscribers'], 0)
+        self.assertIsNone(hub._ticker)
+
+    def test_boards_are_computed_once_per_change_for_all_subscribers(self):
+        async def scenario():
+            hub = LeaderboardHub(self.backend, self.compute, tick=0.01)
+            queues = [await hub.subscribe('overall') for _ in range(3)]
+            for queue in queues:
+                queue.get_nowait()
+
+            del self.scores['a@example.com']
+            self.backend.publish()
+            deltas = [await asyncio.wait_for(queue.get(), 1) for queue in queues]
+            for queue in queues:
+                hub.unsubscribe('overall', queue)
+            return hub, deltas
+
+        hub, deltas = asyncio.run(scenario())
+        self.assertEqual([delta['removed'] for delta in deltas], [['a@example.com']] * 3)
+        self.assertEqual(hub.metrics()['computes'], 2)
+        self.assertEqual(hub.metrics()['broadcasts'], 1)
+
+    def test_slow_subscriber_is_resynced_with_a_snapshot(self):
+        async def scenario():
+            hub = LeaderboardHub(self.backend, self.compute, tick=0.01)
+            queue = await hub.subscribe('overall')
+            for score in range(SUBSCRIBER_QUEUE_SIZE + 1):
+                self.scores['a@example.com'] = score
+                self.backend.publish()
+                await asyncio.wait_for(self._until(lambda: hub.metrics()['broadcasts'] == score + 1), 1)
+            messages = [queue.get_nowait() for _ in range(queue.qsize())]
+            hub.unsubscribe('overall', queue)
+            return hub, messages
+
+        hub, messages = asyncio.run(scenario())
+        self.assertEqual(hub.metrics()['resyncs'], 1)
+        self.assertEqual(
+            messages[0],
+            {'type': 'snapshot', 'board': 'overall', 'rows': [{'email': 'a@example.com', 'score': SUBSCRIBER_QUEUE_SIZE - 1}]},
+        )
+        self.assertEqual(messages[-1]['changed'], [{'email': 'a@example.com', 'score': SUBSCRIBER_QUEUE_SIZE}])
+
+    @staticmethod
+    async def _until(condition):
+        while not condition():
+            await asyncio.sleep(0.001)
+
+
+class DatabaseBackendTests(HackathonTestCase):
+    def test_version_is_the_newest_result_id(self):
+        backend = DatabaseBackend()
+        self.assertEqual(backend.version(), 0)
+        result = create_result()
+        self.assertEqual(backend.version(), result.id)
+
+
+class LiveLeaderboardViewTests(SimpleTestCase):
+    def test_requires_asgi(self):
+        response = self.client.get('/api/crossword/leaderboard/live')
+        self.assertEqual(response.status_code, 501)
@@ -0,0 +1,122 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from hackathon.micro_cache import MicroCache
+from hackathon.single_flight import Flights
+
+from .utils import run_threads, wait_until
+
+
+class FlightsTests(SimpleTestCase):
+    def test_first_caller_leads_and_the_rest_wait_for_its_result(self):
+        flights = Flights()
+        flight, leader = flights.join('k')
+        joined, follower_leads = flights.join('k')
+        self.assertTrue(leader)
+        self.assertFalse(follower_leads)
+        self.assertIs(joined, flight)
+
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(joined.wait()))
+        waiter.start()
+        self.assertEqual(flight.run(lambda: 'value'), 'value')
+        flights.finish('k')
+        flight.land()
+        waiter.join()
+
+        self.assertEqual(results, ['value'])
+        self.assertNotIn('k', flights)
+        self.assertTrue(flights.join('k')[1])
+
+    def test_waiters_get_the_leaders_error(self):
+        flight, _ = Flights().join('k')
+        with self.assertRaises(KeyError):
+            flight.run(lambda: {}['missing'])
+        flight.land()
+        with self.assertRaises(KeyError):
+            flight.wait()
+
+
+class MicroCacheTests(SimpleTestCase):
+    def test_concurrent_misses_are_coalesced(self):
+        cache = MicroCache(ttl=60)
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(2)
+            return 'rows'
+
+        threads, results = run_threads(lambda: cache.get('board', compute), 6)
+        wait_until(lambda: cache.metrics()['coalesced'] == 5)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['rows'] * 6)
+        self.assertEqual(cache.get('board', compute), 'rows')
+        self.assertEqual(cache.metrics()['hits'], 1)
+
+    def test_stale_value_served_while_one_caller_refreshes(self):
+        cache = MicroCache(ttl=60, min_refresh=0)
+        cache.get('board', lambda: 'old')
+        cache.bump()
+        release = threading.Event()
+
+        def compute():
+            release.wait(2)
+            return 'new'
+
+        refresher = threading.Thread(target=cache.get, args=('board', compute))
+        refresher.start()
+        wait_until(lambda: cache.metrics()['refreshes'] == 1)
+        self.assertEqual(cache.get('board', compute), 'old')
+        release.set()
+        refresher.join()
+        self.assertEqual(cache.get('board', compute), 'new')
+        self.assertEqual(cache.metrics()['staleHits'], 1)
+
+    def test_errors_reach_every_waiter_and_are_not_cached(self):
+        cache = MicroCache(ttl=60)
+        release = threading.Event()
+
+        def compute():
+            release.wait(2)
+            raise RuntimeError('db down')
+
+        def get():
+            try:
+                return cache.get('board', compute)
+            except RuntimeError as exc:
+                return str(exc)
+
+        threads, results = run_threads(get, 3)
+        wait_until(lambda: cache.metrics()['coalesced'] == 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['db down'] * 3)
+        self.assertEqual(cache.metrics()['errors'], 1)
+        self.assertEqual(cache.get('board', lambda: 'rows'), 'rows')
+
+    def test_bump_waits_for_min_refresh(self):
+        values = iter(range(10))
+        compute = lambda: next(values)  # noqa: E731
+
+        cache = MicroCache(ttl=60, min_refresh=60)
+        self.assertEqual(cache.get('board', compute), 0)
+        cache.bump()
+        self.assertEqual(cache.get('board', compute), 0)
+
+        cache = MicroCache(ttl=60, min_refresh=0)
+        self.assertEqual(cache.get('board', compute), 1)
+        cache.bump()
+        self.assertEqual(cache.get('board', compute), 2)
+        self.assertEqual(cache.get('board', compute), 2)
+
+    def test_zero_ttl_always_computes(self):
+        values = iter(range(10))
+        cache = MicroCache(ttl=0)
+        self.assertEqual([cache.get('board', lambda: next(values)) for _ in range(3)], [0, 1, 2])
@@ -0,0 +1,55 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+
+from hackathon.models import Crosswordpuzzlebank
+from hackathon.puzzle_format import parse_hint_array
+
+from .utils import ACROSS, DOWN, HackathonTestCase, create_puzzle
+
+LEGACY_ACROSS = [dict(ACROSS[0], hint="it's a pet"), ACROSS[1]]
+
+
+class NormalizePuzzlesTests(HackathonTestCase):
+    def setUp(self):
+        self.checkpoint = Path(self.enterContext(tempfile.TemporaryDirectory())) / 'normalize.checkpoint'
+        create_puzzle('101')
+        legacy = create_puzzle('102', blackboxarray='5,6')
+        Crosswordpuzzlebank.objects.filter(puzzleid=legacy.puzzleid).update(
+            accrosshintarray=str(LEGACY_ACROSS), downhintarray=str(DOWN)
+        )
+        create_puzzle('103', blackboxarray='five')
+
+    def normalize(self, *args):
+        out = StringIO()
+        call_command('normalize_puzzles', '--checkpoint', str(self.checkpoint), '--chunk-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_rewrites_legacy_rows_as_canonical_json(self):
+        out = self.normalize()
+        self.assertIn('102: accrosshintarray, blackboxarray, downhintarray', out)
+        self.assertIn('Rows rewritten: 1', out)
+        self.assertIn('Fields that could not be normalized: 1\n  103: blackboxarray', out)
+        self.assertFalse(self.checkpoint.exists())
+
+        row = Crosswordpuzzlebank.objects.get(puzzleid='102')
+        self.assertEqual(row.blackboxarray, '[5,6]')
+        self.assertTrue(row.accrosshintarray.startswith('[{"cellID":"1"'))
+        self.assertEqual(parse_hint_array(row.accrosshintarray), LEGACY_ACROSS)
+        self.assertEqual(Crosswordpuzzlebank.objects.get(puzzleid='103').blackboxarray, 'five')
+
+        self.assertIn('Rows rewritten: 0', self.normalize())
+
+    def test_dry_run_writes_nothing(self):
+        out = self.normalize('--dry-run')
+        self.assertIn('Rows to rewrite: 1', out)
+        self.assertEqual(Crosswordpuzzlebank.objects.get(puzzleid='102').blackboxarray, '5,6')
+
+    def test_resumes_after_checkpoint(self):
+        self.checkpoint.write_text('102', encoding='utf-8')
+        out = self.normalize()
+        self.assertIn("Resuming after puzzleID '102'", out)
+        self.assertIn('Rows scanned: 1', out)
+        self.assertEqual(Crosswordpuzzlebank.objects.get(puzzleid='102').blackboxarray, '5,6')
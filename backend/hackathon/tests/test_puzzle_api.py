@@ -0,0 +1,39 @@
+from hackathon.puzzle_cache import puzzle_cache
+
+from .utils import HackathonTestCase, create_puzzle
+
+PUZZLE_URL = '/api/crossword/puzzle/101'
+
+
+class PuzzleConditionalGetTests(HackathonTestCase):
+    def setUp(self):
+        puzzle_cache.invalidate()
+        create_puzzle('101')
+
+    def test_etag_and_not_modified(self):
+        response = self.client.get(PUZZLE_URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Cache-Control'].startswith('public, max-age='))
+        etag = response['ETag']
+
+        response = self.client.get(PUZZLE_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_answer_free_payload_has_its_own_etag(self):
+        full = self.client.get(PUZZLE_URL)
+        public = self.client.get(PUZZLE_URL, {'answers': '0'})
+        self.assertNotEqual(full['ETag'], public['ETag'])
+        self.assertNotIn('answer', public.json()['acrossHints'][0])
+        self.assertEqual(self.client.get(PUZZLE_URL, {'answers': '0'}, HTTP_IF_NONE_MATCH=full['ETag']).status_code, 200)
+
+    def test_browser_accept_header_still_gets_json(self):
+        json_response = self.client.get(PUZZLE_URL)
+        html_response = self.client.get(PUZZLE_URL, HTTP_ACCEPT='text/html,application/xhtml+xml,*/*;q=0.8')
+        self.assertEqual(html_response['Content-Type'], 'application/json')
+        self.assertEqual(html_response.content, json_response.content)
+        self.assertEqual(html_response['ETag'], json_response['ETag'])
+
+    def test_missing_puzzle(self):
+        self.assertEqual(self.client.get('/api/crossword/puzzle/999').status_code, 404)
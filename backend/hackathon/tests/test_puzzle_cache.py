@@ -0,0 +1,100 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from hackathon.puzzle_cache import PuzzleCache, get_compiled_puzzle, puzzle_cache
+
+from .utils import SOLVED, HackathonTestCase, create_puzzle, run_threads, wait_until
+
+
+class _BlockingPuzzleCache(PuzzleCache):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.loads = 0
+        self.release = threading.Event()
+        self.error = None
+
+    def _load(self, key, previous):
+        self.loads += 1
+        self.release.wait(2)
+        if self.error is not None:
+            raise self.error
+        return (key, self.loads)
+
+
+class PuzzleCacheTests(SimpleTestCase):
+    def test_concurrent_misses_share_one_load(self):
+        cache = _BlockingPuzzleCache()
+        threads, results = run_threads(lambda: cache.get('p1'), 8)
+        wait_until(lambda: cache.loads == 1)
+        cache.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(cache.loads, 1)
+        self.assertEqual(results, [('p1', 1)] * 8)
+
+    def test_stale_entry_served_while_reloading(self):
+        cache = _BlockingPuzzleCache(revalidate_seconds=0)
+        cache.release.set()
+        self.assertEqual(cache.get('p1'), ('p1', 1))
+
+        cache.release.clear()
+        threads, results = run_threads(lambda: cache.get('p1'), 1)
+        wait_until(lambda: cache.loads == 2)
+        self.assertEqual(cache.get('p1'), ('p1', 1))
+        cache.release.set()
+        threads[0].join()
+        self.assertEqual(results, [('p1', 2)])
+        self.assertEqual(cache.loads, 2)
+
+    def test_load_error_reaches_waiters_and_is_not_cached(self):
+        cache = _BlockingPuzzleCache()
+        cache.error = RuntimeError('db down')
+        errors = []
+
+        def get():
+            try:
+                return cache.get('p1')
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        threads, _ = run_threads(get, 4)
+        wait_until(lambda: cache.loads == 1)
+        cache.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(errors), 4)
+
+        cache.error = None
+        self.assertEqual(cache.get('p1'), ('p1', 2))
+
+
+class PuzzleCacheDatabaseTests(HackathonTestCase):
+    def setUp(self):
+        puzzle_cache.invalidate()
+
+    def test_compiled_puzzle_is_cached(self):
+        create_puzzle('101')
+        with self.assertNumQueries(1):
+            compiled = get_compiled_puzzle('101')
+            self.assertIs(get_compiled_puzzle(101), compiled)
+        self.assertEqual(compiled.answer_key.score(SOLVED).correct_words, 4)
+        self.assertEqual(compiled.black_boxes, {5, 6})
+        self.assertIsNone(get_compiled_puzzle('999'))
+
+    def test_get_many_loads_misses_in_one_query(self):
+        create_puzzle('101')
+        create_puzzle('102')
+        get_compiled_puzzle('101')
+        with self.assertNumQueries(1):
+            found = puzzle_cache.get_many(['102', '101', '999', '102'])
+        self.assertEqual(list(found), ['102', '101'])
+
+    def test_saving_a_puzzle_invalidates_it(self):
+        puzzle = create_puzzle('101')
+        before = get_compiled_puzzle('101')
+        puzzle.accrosshintarray = '[]'
+        puzzle.save()
+        after = get_compiled_puzzle('101')
+        self.assertIsNot(after, before)
+        self.assertEqual(after.answer_key.total_words, 2)
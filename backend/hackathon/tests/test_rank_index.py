@@ -0,0 +1,160 @@
+import random
+import threading
+from unittest import mock
+
+from django.db import transaction
+from django.test import SimpleTestCase
+
+from hackathon import db_router, leaderboard
+from hackathon.leaderboard import OVERALL, RankIndexes, apply_results
+from hackathon.models import Crosswordpuzzleresults
+from hackathon.rank_index import RankIndex
+
+from .utils import HackathonTestCase, create_result, wait_until
+
+
+class RankIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.index = RankIndex()
+        self.totals = {}
+        for _ in range(600):
+            email = f'player{rng.randrange(150)}@example.com'
+            score = float(rng.choice([0, 1, 2, 5, 8]))
+            self.index.add(email, score, 1)
+            total, rounds = self.totals.get(email, (0.0, 0))
+            self.totals[email] = (total + score, rounds + 1)
+        self.order = sorted(self.totals, key=lambda email: (-self.totals[email][0], email))
+
+    def rows(self, players):
+        return [(player.rank, player.email, player.total_score, player.rounds_played) for player in players]
+
+    def expected(self, start, end):
+        start = max(start, 0)
+        return [(i + 1, email, *self.totals[email]) for i, email in enumerate(self.order[start:end], start=start)]
+
+    def test_rank_matches_sorted_order(self):
+        self.assertEqual(len(self.index), len(self.order))
+        for position, email in enumerate(self.order):
+            self.assertEqual(self.rows([self.index.rank(email)]), self.expected(position, position + 1))
+        self.assertIsNone(self.index.rank('nobody@example.com'))
+
+    def test_top_and_slice(self):
+        self.assertEqual(self.rows(self.index.top(10)), self.expected(0, 10))
+        self.assertEqual(self.rows(self.index.top(1000)), self.expected(0, len(self.order)))
+        for start in (0, 1, 57, len(self.order) - 3):
+            self.assertEqual(self.rows(self.index.slice(start, 7)), self.expected(start, start + 7))
+        self.assertEqual(self.index.slice(len(self.order), 5), [])
+        self.assertEqual(self.index.slice(-1, 5), [])
+
+    def test_around(self):
+        for position in (0, 2, 70, len(self.order) - 1):
+            email = self.order[position]
+            self.assertEqual(self.rows(self.index.around(email, 3)), self.expected(position - 3, position + 4))
+        self.assertEqual(self.index.around('nobody@example.com', 3), [])
+
+
+class RankIndexesTests(SimpleTestCase):
+    """Reload and delta bookkeeping, with the database reads replaced."""
+
+    def setUp(self):
+        self.high_water = 10
+        self.totals = [('a@example.com', 10.0, 1), ('b@example.com', 5.0, 1)]
+        self.enterContext(mock.patch.object(leaderboard, '_load_index', side_effect=self.load))
+        self.enterContext(mock.patch.object(leaderboard, 'check_rebuilt'))
+        self.indexes = RankIndexes(reload_seconds=60)
+
+    def load(self, bucket):
+        return RankIndex(self.totals), self.high_water
+
+    def scores(self):
+        return {player.email: player.total_score for player in self.indexes.top(OVERALL, 10)}
+
+    def test_applies_only_writes_above_the_high_water_mark(self):
+        self.scores()
+        self.indexes.apply({(OVERALL, 'a@example.com'): [1.0, 1, None]}, 10)
+        self.indexes.apply({(OVERALL, 'b@example.com'): [2.0, 1, None]}, 11)
+        self.assertEqual(self.scores(), {'a@example.com': 10.0, 'b@example.com': 7.0})
+
+    def test_writes_committed_during_a_reload(self):
+        release = threading.Event()
+
+        def slow_load(bucket):
+            release.wait(5)
+            # The reload saw the write with id 11, not the one with id 12
+            return RankIndex([('a@example.com', 11.0, 2), ('b@example.com', 5.0, 1)]), 11
+
+        leaderboard._load_index.side_effect = slow_load
+        reader = threading.Thread(target=self.scores)
+        reader.start()
+        wait_until(lambda: OVERALL in self.indexes._loading)
+
+        self.indexes.apply({(OVERALL, 'a@example.com'): [1.0, 1, None]}, 11)
+        self.indexes.apply({(OVERALL, 'b@example.com'): [2.0, 1, None]}, 12)
+        release.set()
+        reader.join()
+
+        self.assertEqual(self.scores(), {'a@example.com': 11.0, 'b@example.com': 7.0})
+
+    def test_readers_keep_the_stale_index_during_a_reload(self):
+        self.scores()
+        self.indexes.reload_seconds = 0
+        release = threading.Event()
+
+        def slow_load(bucket):
+            release.wait(5)
+            return self.load(bucket)
+
+        leaderboard._load_index.side_effect = slow_load
+
+        reader = threading.Thread(target=self.scores)
+        reader.start()
+        wait_until(lambda: OVERALL in self.indexes._loading)
+        self.assertEqual(self.indexes.rank(OVERALL, 'b@example.com').rank, 2)
+        release.set()
+        reader.join()
+
+    def test_invalidate_reloads(self):
+        self.scores()
+        self.totals = [('c@example.com', 1.0, 1)]
+        self.indexes.invalidate()
+        self.assertEqual(self.scores(), {'c@example.com': 1.0})
+
+
+class LoadIndexTests(HackathonTestCase):
+    def test_reads_the_primary_and_records_the_newest_result_id(self):
+        create_result(gamescore='4')
+        newest = create_result(email='b@example.com', gamescore='2')
+        seen = []
+        real_totals = leaderboard.bucket_totals
+
+        def bucket_totals(bucket):
+            seen.append(db_router._use_primary.get())
+            return real_totals(bucket)
+
+        with mock.patch.object(leaderboard, 'bucket_totals', side_effect=bucket_totals):
+            index, high_water = leaderboard._load_index(OVERALL)
+
+        self.assertEqual(seen, [True])
+        self.assertEqual(high_water, newest.id)
+        self.assertEqual(index.rank('a@example.com').total_score, 4.0)
+
+    def test_apply_results_passes_the_newest_result_id(self):
+        with mock.patch.object(leaderboard.rank_indexes, 'apply') as apply:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    result = create_result(gamescore='4')
+                    apply_results([result])
+
+        apply.assert_called_once()
+        self.assertEqual(apply.call_args.args[1], result.id)
+
+    def test_apply_results_reads_the_newest_id_when_pks_are_unset(self):
+        stored = create_result(gamescore='4')
+        unsaved = Crosswordpuzzleresults(email='b@example.com', gamescore='1', puzzleid='101')
+        with mock.patch.object(leaderboard.rank_indexes, 'apply') as apply:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    apply_results([unsaved])
+
+        self.assertEqual(apply.call_args.args[1], stored.id)
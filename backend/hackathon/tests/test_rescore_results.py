@@ -0,0 +1,71 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+
+from hackathon.models import Crosswordpuzzleresults
+
+from .utils import SOLVED, HackathonTestCase, create_puzzle, create_result
+
+
+class RescoreResultsTests(HackathonTestCase):
+    def setUp(self):
+        self.checkpoint = Path(self.enterContext(tempfile.TemporaryDirectory())) / 'rescore.checkpoint'
+        create_puzzle('101')
+        self.solved = create_result(grid=SOLVED, gamescore='1', status=0)
+        self.partial = create_result(grid={'1': 'c', '2': 'a', '3': 't'}, gamescore='4')
+        self.unchanged = create_result(grid={}, gamescore='0', status=0, correct_words=0, total_words=4)
+        self.other_puzzle = create_result(puzzle_id='999', grid={}, gamescore='7', status=0)
+
+    def rescore(self, *args):
+        out = StringIO()
+        call_command('rescore_results', '--checkpoint', str(self.checkpoint), '--chunk-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def scores(self):
+        return dict(Crosswordpuzzleresults.objects.values_list('id', 'gamescore'))
+
+    def test_rescores_changed_rows(self):
+        out = self.rescore('--workers', '1')
+        self.assertIn('Rescoring completed: 2 of 3 rows updated.', out)
+        self.assertEqual(
+            self.scores(),
+            {self.solved.id: '4', self.partial.id: '1', self.unchanged.id: '0', self.other_puzzle.id: '7'},
+        )
+        self.assertEqual(Crosswordpuzzleresults.objects.get(id=self.solved.id).status, 1)
+        self.assertFalse(self.checkpoint.exists())
+
+    def test_worker_processes_score_like_in_process(self):
+        self.rescore('--workers', '1')
+        expected = self.scores()
+        Crosswordpuzzleresults.objects.filter(id=self.solved.id).update(gamescore='1', status=0)
+        Crosswordpuzzleresults.objects.filter(id=self.partial.id).update(gamescore='4')
+        self.assertIn('2 of 3 rows updated', self.rescore('--workers', '3'))
+        self.assertEqual(self.scores(), expected)
+
+    def test_scoring_rule_options(self):
+        Crosswordpuzzleresults.objects.filter(id=self.solved.id).update(duration='30')
+        self.rescore('--workers', '1', '--min-words-for-bonus', '4', '--bonus-per-second', '0.5')
+        self.assertEqual(self.scores()[self.solved.id], '19.0')
+
+    def test_dry_run_and_checkpoint(self):
+        out = self.rescore('--workers', '1', '--dry-run')
+        self.assertIn(f'{self.solved.id}: score 1 -> 4, status 0 -> 1', out)
+        self.assertEqual(self.scores()[self.solved.id], '1')
+
+        self.checkpoint.write_text(str(self.solved.id), encoding='utf-8')
+        out = self.rescore('--workers', '1')
+        self.assertIn(f'Resuming after result id {self.solved.id}', out)
+        self.assertEqual(self.scores()[self.solved.id], '1')
+        self.assertEqual(self.scores()[self.partial.id], '1')
+
+    def test_unknown_puzzle(self):
+        with self.assertRaises(CommandError):
+            self.rescore('--puzzle', 'nope')
+
+    def test_word_counts_are_kept_in_step(self):
+        self.rescore('--workers', '1')
+        counts = dict(Crosswordpuzzleresults.objects.values_list('id', 'correct_words'))
+        self.assertEqual(counts, {self.solved.id: 4, self.partial.id: 1, self.unchanged.id: 0, self.other_puzzle.id: None})
+        self.assertEqual(Crosswordpuzzleresults.objects.get(id=self.partial.id).total_words, 4)
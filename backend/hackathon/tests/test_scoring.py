@@ -0,0 +1,103 @@
+import random
+import string
+
+from django.test import SimpleTestCase
+
+from hackathon.scoring import GridGeometry, compile_answer_key
+
+
+def legacy_count(across_hints, down_hints, submitted_grid, stride=9):
+    """The per-request scoring loop the compiled answer key replaced."""
+    correct_words_count = 0
+    total_words_count = 0
+    for hints, step in ((across_hints, 1), (down_hints, stride)):
+        try:
+            total_words_count += len(hints)
+            for hint in hints:
+                if 'answer' in hint and 'cellID' in hint:
+                    start_cell = int(hint['cellID'])
+                    answer_text = hint['answer'].upper()
+                    word_correct = True
+                    for i, char in enumerate(answer_text):
+                        if submitted_grid.get(str(start_cell + (i * step)), '').upper() != char:
+                            word_correct = False
+                            break
+                    if word_correct:
+                        correct_words_count += 1
+        except Exception:
+            pass
+    return correct_words_count, total_words_count
+
+
+def make_puzzle(rng, size=9):
+    letters = {cell: rng.choice(string.ascii_uppercase) for cell in range(1, size * size + 1)}
+    across, down = [], []
+    for row in range(size):
+        start = row * size + 1
+        across.append({'cellID': str(start), 'answer': ''.join(letters[start + i] for i in range(size)).lower()})
+    for col in range(1, size + 1):
+        down.append({'cellID': str(col), 'answer': ''.join(letters[col + i * size] for i in range(size))})
+    return across, down, letters
+
+
+def make_submission(rng, letters, error_rate):
+    grid = {}
+    for cell, letter in letters.items():
+        roll = rng.random()
+        if roll < error_rate / 2:
+            continue
+        grid[str(cell)] = rng.choice(string.ascii_letters) if roll < error_rate else rng.choice([letter, letter.lower()])
+    return grid
+
+
+class CompiledAnswerKeyTests(SimpleTestCase):
+    def assertMatchesLegacy(self, across, down, grid, size=9):
+        key = compile_answer_key(across, down, geometry=GridGeometry(rows=size, cols=size))
+        scored = key.score(grid)
+        self.assertEqual((scored.correct_words, scored.total_words), legacy_count(across, down, grid, stride=size))
+
+    def test_random_submissions(self):
+        rng = random.Random(7)
+        for size in (5, 9, 15):
+            across, down, letters = make_puzzle(rng, size)
+            for error_rate in (0.0, 0.02, 0.2, 1.0):
+                for _ in range(50):
+                    self.assertMatchesLegacy(across, down, make_submission(rng, letters, error_rate), size)
+
+    def test_malformed_hints(self):
+        grid = {'1': 'a', '2': 'b', '10': 'c', '19': 'd'}
+        cases = [
+            ([{'answer': 'ab'}, {'cellID': '1'}, {'cellID': '1', 'answer': 'ab'}], []),
+            ([{'cellID': 'x', 'answer': 'ab'}, {'cellID': '1', 'answer': 'ab'}], []),
+            ([{'cellID': None, 'answer': 'ab'}, {'cellID': '1', 'answer': 'ab'}], []),
+            ([{'cellID': '1', 'answer': 12}, {'cellID': '1', 'answer': 'ab'}], []),
+            ([{'cellID': '1', 'answer': 'ab'}], [{'cellID': '1', 'answer': None}, {'cellID': '1', 'answer': 'acd'}]),
+            ([], [{'cellID': 1, 'answer': 'ACD'}, {'cellID': 1.0, 'answer': 'acd'}]),
+        ]
+        for across, down in cases:
+            with self.subTest(across=across, down=down):
+                self.assertMatchesLegacy(across, down, grid)
+
+    def test_empty_answers(self):
+        across = [{'cellID': '1', 'answer': ''}, {'cellID': '1', 'answer': 'ab'}, {'cellID': '40', 'answer': ''}]
+        down = [{'cellID': '2', 'answer': ''}]
+        for grid in ({}, {'1': 'A', '2': 'b'}, {'1': 'x'}):
+            with self.subTest(grid=grid):
+                self.assertMatchesLegacy(across, down, grid)
+        self.assertEqual(compile_answer_key(across, down).score({}).correct_words, 3)
+
+    def test_non_dict_grid_scores_as_empty(self):
+        across = [{'cellID': '1', 'answer': ''}, {'cellID': '1', 'answer': 'ab'}]
+        down = [{'cellID': '1', 'answer': 'ac'}]
+        key = compile_answer_key(across, down)
+        expected = legacy_count(across, down, {})
+        for grid in (None, [], ['A', 'B'], 'AB', 3):
+            with self.subTest(grid=grid):
+                scored = key.score(grid)
+                self.assertEqual((scored.correct_words, scored.total_words), expected)
+                self.assertEqual(scored, key.score({}))
+
+    def test_non_string_cells_are_wrong(self):
+        key = compile_answer_key([{'cellID': '1', 'answer': 'ab'}, {'cellID': '10', 'answer': 'c'}], [])
+        scored = key.score({'1': 1, '2': 'b', '10': 'C'})
+        self.assertEqual(scored.across, (False, True))
@@ -0,0 +1,97 @@
+import random
+
+from django.test import SimpleTestCase, override_settings
+
+from hackathon.leaderboard import rank_indexes
+from hackathon.rank_index import EmailSearchIndex, RankIndex
+
+from .utils import HackathonTestCase, create_result
+
+
+class EmailSearchIndexTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        self.emails = [f"{rng.choice(['Ann', 'bob', 'CARL'])}.{i}@Example.com" for i in range(300)]
+        self.index = EmailSearchIndex()
+        for email in self.emails:
+            self.index.add(email)
+
+    def test_matches_case_insensitive_substrings(self):
+        for query in ('a', 'ob', 'ann.1', 'CARL.2', ' 7@example ', '.com', 'zz', 'bob.299@example.com'):
+            expected = {email for email in self.emails if query.strip().lower() in email.lower()}
+            self.assertEqual(self.index.search(query), expected, query)
+
+    def test_blank_query_matches_nothing(self):
+        self.assertEqual(self.index.search('  '), set())
+
+    def test_adding_twice_is_harmless(self):
+        self.index.add(self.emails[0])
+        self.assertEqual(self.index.search(self.emails[0]), {self.emails[0]})
+
+
+class RankIndexSearchTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        self.index = RankIndex()
+        self.totals = {}
+        for _ in range(600):
+            email = f'player{rng.randrange(150)}@example.com'
+            score = float(rng.choice([0, 1, 2, 5, 8]))
+            self.index.add(email, score, 1)
+            self.totals[email] = self.totals.get(email, 0.0) + score
+        self.order = sorted(self.totals, key=lambda email: (-self.totals[email], email))
+
+    def test_pages_through_matches_in_rank_order(self):
+        for query in ('player1', 'ER12', '7@', 'zz'):
+            matches = [email for email in self.order if query.lower() in email]
+            count, players = self.index.search(query, start=1, count=5)
+            self.assertEqual(count, len(matches))
+            self.assertEqual([player.email for player in players], matches[1:6])
+            self.assertEqual(players, [self.index.rank(email) for email in matches[1:6]])
+
+
+@override_settings(LEADERBOARD_RANK_INDEX=True, LEADERBOARD_USE_ROLLUPS=False, LEADERBOARD_EVENT_WINDOWS={})
+class SearchLeaderboardTests(HackathonTestCase):
+    def setUp(self):
+        rank_indexes.invalidate()
+        self.addCleanup(rank_indexes.invalidate)
+        for email, score in [
+            ('ann@example.com', '9'),
+            ('anna@example.com', '7'),
+            ('joanne@example.com', '5'),
+            ('bob@example.com', '3'),
+            ('annie@example.com', '1'),
+        ]:
+            create_result(email=email, gamescore=score)
+
+    def search(self, **params):
+        return self.client.get('/api/crossword/leaderboard/search', params)
+
+    def test_exact_email(self):
+        data = self.search(email='anna@example.com').json()
+
+        self.assertEqual((data['rank'], data['email'], data['totalScore']), (2, 'anna@example.com', 7.0))
+        self.assertEqual((data['totalMatches'], len(data['matches'])), (1, 1))
+
+    def test_pages_through_substring_matches(self):
+        data = self.search(email='ANN', pageSize=2, page=2).json()
+
+        # The top-level player is the best ranked match, not the first on this page
+        self.assertEqual((data['rank'], data['email']), (1, 'ann@example.com'))
+        self.assertEqual(data['totalMatches'], 4)
+        self.assertEqual([m['email'] for m in data['matches']], ['joanne@example.com', 'annie@example.com'])
+        self.assertEqual([m['rank'] for m in data['matches']], [3, 5])
+
+    def test_around(self):
+        data = self.search(email='joanne@example.com', around=1).json()
+        self.assertEqual([p['email'] for p in data['around']], ['anna@example.com', 'joanne@example.com', 'bob@example.com'])
+
+    def test_errors(self):
+        self.assertEqual(self.search().status_code, 400)
+        self.assertEqual(self.search(email='ann', page='x').status_code, 400)
+        self.assertEqual(self.search(email='nobody').status_code, 404)
+
+    @override_settings(LEADERBOARD_RANK_INDEX=False)
+    def test_without_the_rank_index_returns_the_first_match(self):
+        data = self.search(email='ANN').json()
+        self.assertEqual(data, {'rank': 1, 'email': 'ann@example.com', 'totalScore': 9.0, 'roundsPlayed': 1})
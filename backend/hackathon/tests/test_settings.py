@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from backend.settings import _parse_event_window
+
+
+class EventWindowSettingTests(SimpleTestCase):
+    def test_parses_naive_and_aware_bounds(self):
+        self.assertEqual(
+            _parse_event_window('2026-03-14T09:00/2026-03-14T18:00Z', 'UTC'),
+            (datetime(2026, 3, 14, 9), datetime(2026, 3, 14, 18, tzinfo=timezone.utc)),
+        )
+
+    def test_naive_bounds_are_compared_in_the_event_time_zone(self):
+        # 09:00 in New York is 13:00 UTC
+        with self.assertRaises(ImproperlyConfigured):
+            _parse_event_window('2026-03-14T09:00/2026-03-14T12:00Z', 'America/New_York')
+        _parse_event_window('2026-03-14T09:00/2026-03-14T14:00Z', 'America/New_York')
+
+    def test_rejects_malformed_windows(self):
+        for value in (
+            '2026-03-14T09:00',
+            '2026-03-14T09:00/2026-03-14T18:00/2026-03-15T00:00',
+            'soon/later',
+            '2026-02-30T09:00/2026-03-14T18:00',
+            '2026-03-14T18:00/2026-03-14T09:00',
+            '2026-03-14T09:00/2026-03-14T09:00',
+        ):
+            with self.subTest(value=value), self.assertRaises(ImproperlyConfigured):
+                _parse_event_window(value, 'UTC')
@@ -0,0 +1,79 @@
+from unittest import mock
+
+from hackathon.idempotency import recent_submissions, stored_submission_response
+from hackathon.models import Crosswordpuzzleresults
+from hackathon.puzzle_cache import puzzle_cache
+
+from .utils import SOLVED, HackathonTestCase, create_puzzle
+
+SUBMIT_URL = '/api/crossword/submit'
+
+
+class SubmitIdempotencyTests(HackathonTestCase):
+    def setUp(self):
+        self.enterContext(mock.patch('builtins.print'))
+        puzzle_cache.invalidate()
+        recent_submissions.clear()
+        create_puzzle('101')
+
+    def submit(self, grid=SOLVED, attempt='attempt-1', time_remaining=30):
+        return self.client.post(
+            SUBMIT_URL,
+            {
+                'puzzleID': '101',
+                'submittedPuzzle': grid,
+                'timeRemaining': time_remaining,
+                'teamName': 'team',
+                'attemptID': attempt,
+                'email': 'a@example.com',
+            },
+            content_type='application/json',
+        )
+
+    def test_stores_the_scored_result(self):
+        response = self.submit(grid={'1': 'c', '2': 'a', '3': 't'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {'score': 1, 'correctWords': 1, 'totalWords': 4, 'allWordsCorrect': False, 'message': 'Submission successful'},
+        )
+        row = Crosswordpuzzleresults.objects.get()
+        self.assertEqual((row.attemptid, row.gamescore, row.correct_words, row.total_words, row.status), ('attempt-1', '1', 1, 4, 0))
+
+    def test_resend_of_an_attempt_returns_the_stored_result(self):
+        first = self.submit().json()
+        self.assertEqual(self.submit(grid={}).json(), first)
+
+        # Without the in-memory copy the row is returned as stored, not scored again
+        recent_submissions.clear()
+        Crosswordpuzzleresults.objects.update(gamescore='7.5', correct_words=3)
+        self.assertEqual(self.submit(grid={}).json(), dict(first, score=7.5, correctWords=3))
+        self.assertEqual(Crosswordpuzzleresults.objects.count(), 1)
+
+    def test_new_attempts_and_anonymous_submits_are_stored(self):
+        self.submit(attempt='attempt-1')
+        self.submit(attempt='attempt-2')
+        self.submit(attempt=None)
+        self.submit(attempt=None)
+        self.assertEqual(Crosswordpuzzleresults.objects.count(), 4)
+        self.assertEqual(Crosswordpuzzleresults.objects.filter(attemptid__isnull=True).count(), 2)
+
+    def test_concurrent_resend_gets_the_winning_result(self):
+        self.submit(grid={})
+        recent_submissions.clear()
+        # The first lookup misses, as if the other request had not committed yet;
+        # the insert then hits the unique index and the stored result is returned
+        lookups = iter([None])
+
+        def lookup(key):
+            return next(lookups, None) or stored_submission_response(key)
+
+        with mock.patch('hackathon.views.stored_submission_response', side_effect=lookup):
+            response = self.submit()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['correctWords'], 0)
+        self.assertEqual(Crosswordpuzzleresults.objects.count(), 1)
+
+    def test_unknown_puzzle(self):
+        response = self.client.post(SUBMIT_URL, {'puzzleID': '999'}, content_type='application/json')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, IntegrityError, connections
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from hackathon.idempotency import recent_submissions
+from hackathon.models import Crosswordpuzzleresults
+from hackathon.puzzle_cache import puzzle_cache
+from hackathon.result_columns import typed_values
+from hackathon.write_behind import _to_model
+
+from .utils import SOLVED, HackathonTestCase, create_puzzle
+
+
+class TypedValuesTests(SimpleTestCase):
+    @override_settings(RESULTS_TYPED_COLUMNS_WRITE=False)
+    def test_nothing_to_write_while_the_columns_are_off(self):
+        self.assertEqual(typed_values('4.5', '30'), {})
+
+    @override_settings(RESULTS_TYPED_COLUMNS_WRITE=True)
+    def test_parsed_values_once_written(self):
+        self.assertEqual(typed_values('4.5', '29.6'), {'score_value': 4.5, 'duration_seconds': 30})
+        self.assertEqual(typed_values('', None), {'score_value': None, 'duration_seconds': None})
+
+
+# The test settings leave RESULTS_TYPED_COLUMNS unset: the model, and so the test
+# table, has no typed columns, like the schema before add_results_typed_columns.sql.
+class SubmitWithoutTypedColumnsTests(HackathonTestCase):
+    def setUp(self):
+        self.enterContext(mock.patch('builtins.print'))
+        self.enterContext(mock.patch('traceback.print_exc'))
+        puzzle_cache.invalidate()
+        recent_submissions.clear()
+        create_puzzle('101')
+
+    def submit(self):
+        return self.client.post(
+            '/api/crossword/submit',
+            {'puzzleID': '101', 'submittedPuzzle': SOLVED, 'timeRemaining': 30, 'attemptID': 'attempt-1', 'email': 'a@example.com'},
+            content_type='application/json',
+        )
+
+    def test_insert_leaves_the_typed_columns_out(self):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.submit()
+
+        self.assertEqual(response.status_code, 200)
+        inserts = [query['sql'] for query in queries if query['sql'].startswith('INSERT INTO "crosswordpuzzleresults"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertNotIn('scoreValue', inserts[0])
+        self.assertEqual(Crosswordpuzzleresults.objects.get().gamescore, '4')
+
+    def test_failed_insert_is_a_server_error_and_can_be_resent(self):
+        with mock.patch.object(Crosswordpuzzleresults.objects, 'create', side_effect=DatabaseError('Unknown column')):
+            response = self.submit()
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('error', response.json())
+        self.assertFalse(Crosswordpuzzleresults.objects.exists())
+
+        # Nothing was remembered for the attempt, so a resend is stored
+        self.assertEqual(self.submit().status_code, 200)
+        self.assertEqual(Crosswordpuzzleresults.objects.count(), 1)
+
+    def test_integrity_error_without_a_stored_result_is_a_server_error(self):
+        with mock.patch.object(Crosswordpuzzleresults.objects, 'create', side_effect=IntegrityError('other constraint')):
+            response = self.submit()
+        self.assertEqual(response.status_code, 500)
+
+    def test_backfill_needs_the_columns(self):
+        with self.assertRaisesMessage(CommandError, 'RESULTS_TYPED_COLUMNS=write'):
+            call_command('backfill_typed_columns')
+
+    def test_spooled_typed_values_are_dropped(self):
+        row = _to_model({'seq': '1', 'fields': {'puzzleid': '101', 'gamescore': '4', 'score_value': 4.0, 'duration_seconds': 30}})
+        self.assertEqual(row.gamescore, '4')
+        self.assertFalse(hasattr(row, 'score_value'))
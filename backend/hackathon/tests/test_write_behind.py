@@ -0,0 +1,190 @@
+import fcntl
+import json
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from hackathon.leaderboard import OVERALL
+from hackathon.models import Crosswordpuzzleresults, LeaderboardRollup
+from hackathon.write_behind import DEAD_LETTER_NAME, SPOOL_PREFIX, SubmissionWriter, read_spool, replay_spool
+
+from .utils import HackathonTestCase, create_result, wait_until
+
+
+def _fields(email='a@example.com', score='4', attempt=None, **extra):
+    return {
+        'puzzleid': '101',
+        'riderid': 'team',
+        'submittedpuzzle': '{}',
+        'gamescore': score,
+        'duration': '0',
+        'status': 1,
+        'createddate': timezone.now().isoformat(),
+        'email': email,
+        'attemptid': attempt,
+        **extra,
+    }
+
+
+def _write_spool(path, records, acked=()):
+    with open(path, 'w', encoding='utf-8') as f:
+        for seq, fields in records:
+            f.write(json.dumps({'record': {'seq': seq, 'fields': fields}}) + '\n')
+        f.write(json.dumps({'ack': list(acked)}) + '\n')
+        f.write('{"record": {"seq": "torn"')
+
+
+class SubmissionWriterTests(SimpleTestCase):
+    def setUp(self):
+        self.spool_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.writer = SubmissionWriter(self.spool_dir, batch_size=10, flush_interval=0.05)
+        self.addCleanup(self.writer.stop)
+        self.stored = []
+
+    def store(self, records):
+        bad = [record for record in records if record['fields']['email'] == 'bad']
+        if bad:
+            raise OperationalError(1054, "Unknown column 'scoreValue' in 'field list'")
+        self.stored.extend(record['fields']['email'] for record in records)
+        return len(records)
+
+    def test_retries_transient_errors_until_stored(self):
+        errors = [OperationalError(2013, 'Lost connection to MySQL server during query'), OperationalError(1213, 'Deadlock')]
+
+        def flaky(records):
+            if errors:
+                raise errors.pop(0)
+            return self.store(records)
+
+        with mock.patch('hackathon.write_behind._store', side_effect=flaky), mock.patch('builtins.print'):
+            self.assertTrue(self.writer.enqueue(_fields('a@example.com')))
+            wait_until(lambda: self.writer.metrics()['flushed'] == 1, timeout=5)
+
+        metrics = self.writer.metrics()
+        self.assertEqual(self.stored, ['a@example.com'])
+        self.assertEqual((metrics['flushErrors'], metrics['deadLettered'], metrics['unflushed']), (2, 0, 0))
+
+    def test_non_transient_error_dead_letters_only_the_bad_record(self):
+        with mock.patch('hackathon.write_behind._store', side_effect=self.store), mock.patch('builtins.print'):
+            for email in ('a@example.com', 'bad', 'b@example.com'):
+                self.writer.enqueue(_fields(email))
+            wait_until(lambda: self.writer.metrics()['unflushed'] == 0)
+            self.writer.enqueue(_fields('c@example.com'))
+            wait_until(lambda: self.writer.metrics()['flushed'] == 3)
+
+        self.assertEqual(sorted(self.stored), ['a@example.com', 'b@example.com', 'c@example.com'])
+        self.assertEqual(self.writer.metrics()['deadLettered'], 1)
+        dead = [json.loads(line) for line in (self.spool_dir / DEAD_LETTER_NAME).read_text().splitlines()]
+        self.assertEqual([entry['record']['fields']['email'] for entry in dead], ['bad'])
+        self.assertIn('1054', dead[0]['error'])
+        self.assertEqual(read_spool(Path(self.writer._spool.name)), [])
+
+    def test_forked_child_starts_its_own_writer(self):
+        with mock.patch('hackathon.write_behind._store', side_effect=self.store):
+            self.writer.start()
+        parent_spool = Path(self.writer._spool.name)
+
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover - child
+            ok = False
+            try:
+                with mock.patch('hackathon.write_behind._store', side_effect=self.store):
+                    self.writer.enqueue(_fields('child@example.com'))
+                    wait_until(lambda: self.writer.metrics()['flushed'] == 1)
+                child_spool = Path(self.writer._spool.name)
+                ok = (
+                    self.writer._thread.is_alive()
+                    and child_spool != parent_spool
+                    and child_spool.name.startswith(f'{SPOOL_PREFIX}{os.getpid()}-')
+                    and self.stored == ['child@example.com']
+                )
+                self.writer.stop()
+            finally:
+                os.write(write_end, b'1' if ok else b'0')
+                os._exit(0)
+
+        os.close(write_end)
+        result = os.read(read_end, 1)
+        os.close(read_end)
+        os.waitpid(pid, 0)
+        self.assertEqual(result, b'1')
+        self.assertTrue(self.writer._thread.is_alive())
+        self.assertTrue(parent_spool.exists())
+        self.assertEqual([path.name for path in self.spool_dir.glob(f'{SPOOL_PREFIX}*')], [parent_spool.name])
+
+    def test_stop_removes_an_empty_spool(self):
+        self.writer.start()
+        spool = Path(self.writer._spool.name)
+        self.writer.stop()
+        self.assertFalse(spool.exists())
+
+
+class SpoolReplayTests(HackathonTestCase):
+    def setUp(self):
+        self.spool_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.path = self.spool_dir / f'{SPOOL_PREFIX}1-dead.jsonl'
+
+    def test_replays_unacknowledged_records_once(self):
+        create_result(email='b@example.com', attemptid='attempt-b')
+        _write_spool(
+            self.path,
+            [
+                ('1', _fields('a@example.com', '4')),
+                ('2', _fields('a@example.com', '2')),
+                ('3', _fields('b@example.com', attempt='attempt-b')),
+                ('4', _fields('acked@example.com')),
+            ],
+            acked=['4'],
+        )
+        self.assertEqual(len(read_spool(self.path)), 3)
+        replay_spool(self.path)
+
+        self.assertFalse(self.path.exists())
+        self.assertEqual(Crosswordpuzzleresults.objects.filter(email='a@example.com').count(), 2)
+        self.assertEqual(Crosswordpuzzleresults.objects.filter(email='b@example.com').count(), 1)
+        self.assertFalse(Crosswordpuzzleresults.objects.filter(email='acked@example.com').exists())
+        rollup = LeaderboardRollup.objects.get(bucket=OVERALL, email='a@example.com')
+        self.assertEqual((rollup.total_score, rollup.rounds_played), (6.0, 2))
+
+    def test_bad_record_is_dead_lettered_and_replayed_later(self):
+        _write_spool(self.path, [('1', _fields('a@example.com')), ('2', _fields('bad@example.com', nosuchfield=1))])
+        with mock.patch('builtins.print'):
+            self.assertEqual(replay_spool(self.path), 1)
+        self.assertTrue(Crosswordpuzzleresults.objects.filter(email='a@example.com').exists())
+        self.assertFalse(self.path.exists())
+
+        out = StringIO()
+        with mock.patch('builtins.print'):
+            call_command('replay_submission_spool', '--spool-dir', str(self.spool_dir), '--dead-letters', stdout=out)
+        self.assertIn(f'{DEAD_LETTER_NAME}: 0 replayed, 1 still failing', out.getvalue())
+
+        dead_letters = self.spool_dir / DEAD_LETTER_NAME
+        entry = json.loads(dead_letters.read_text())
+        del entry['record']['fields']['nosuchfield']
+        dead_letters.write_text(json.dumps(entry) + '\n')
+        out = StringIO()
+        call_command('replay_submission_spool', '--spool-dir', str(self.spool_dir), '--dead-letters', stdout=out)
+        self.assertIn('Replay completed: 1 records inserted.', out.getvalue())
+        self.assertTrue(Crosswordpuzzleresults.objects.filter(email='bad@example.com').exists())
+        self.assertFalse(dead_letters.exists())
+
+    def test_command_skips_spools_of_live_writers(self):
+        live = self.enterContext(open(self.spool_dir / f'{SPOOL_PREFIX}2-live.jsonl', 'a+'))
+        fcntl.flock(live.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        _write_spool(self.path, [('1', _fields('a@example.com'))])
+
+        out = StringIO()
+        call_command('replay_submission_spool', '--spool-dir', str(self.spool_dir), '--dry-run', stdout=out)
+        self.assertIn(f'{self.path.name}: 1 pending', out.getvalue())
+        out = StringIO()
+        call_command('replay_submission_spool', '--spool-dir', str(self.spool_dir), stdout=out)
+        self.assertIn('in use by a running process, skipped', out.getvalue())
+        self.assertIn(f'{self.path.name}: 1 replayed', out.getvalue())
@@ -0,0 +1,82 @@
+import json
+import threading
+import time
+
+from django.db import connections
+from django.test import TestCase
+from django.utils import timezone
+
+from hackathon.db_router import hackathon_database
+from hackathon.models import Crosswordpuzzlebank, Crosswordpuzzleresults
+from hackathon.puzzle_format import dump_canonical
+
+ACROSS = [{'cellID': '1', 'hint': 'pet', 'answer': 'cat', 'answerlength': '3'}, {'cellID': '10', 'hint': 'pet', 'answer': 'dog', 'answerlength': '3'}]
+DOWN = [{'cellID': '1', 'hint': 'c, d', 'answer': 'cd', 'answerlength': '2'}, {'cellID': '3', 'hint': 't, g', 'answer': 'tg', 'answerlength': '2'}]
+SOLVED = {'1': 'C', '2': 'A', '3': 'T', '10': 'D', '11': 'O', '12': 'G'}
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not reached in time')
+        time.sleep(0.001)
+
+
+def run_threads(target, count):
+    """Start ``count`` threads calling ``target``; their return values fill the returned list."""
+    results = [None] * count
+
+    def run(i):
+        results[i] = target()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def create_puzzle(puzzle_id='101', across=ACROSS, down=DOWN, **fields):
+    fields.setdefault('blackboxarray', '[5,6]')
+    fields.setdefault('status', 1)
+    fields.setdefault('createddate', timezone.now())
+    return Crosswordpuzzlebank.objects.create(
+        puzzleid=puzzle_id,
+        accrosshintarray=dump_canonical(across),
+        downhintarray=dump_canonical(down),
+        **fields,
+    )
+
+
+def create_unmanaged_tables():
+    """Create the puzzle bank and results tables, which the migrations leave to the SQL scripts."""
+    connection = connections[hackathon_database()]
+    existing = set(connection.introspection.table_names())
+    with connection.schema_editor() as editor:
+        for model in (Crosswordpuzzlebank, Crosswordpuzzleresults):
+            if model._meta.db_table not in existing:
+                editor.create_model(model)
+
+
+class HackathonTestCase(TestCase):
+    """TestCase with the unmanaged puzzle bank and results tables in the test database."""
+
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        create_unmanaged_tables()
+        super().setUpClass()
+
+
+def create_result(puzzle_id='101', email='a@example.com', grid=SOLVED, gamescore='4', duration='0', **fields):
+    fields.setdefault('status', 1 if grid == SOLVED else 0)
+    fields.setdefault('createddate', timezone.now())
+    return Crosswordpuzzleresults.objects.create(
+        puzzleid=puzzle_id,
+        email=email,
+        submittedpuzzle=json.dumps(grid),
+        gamescore=gamescore,
+        duration=duration,
+        **fields,
+    )
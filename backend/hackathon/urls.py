@@ -1,12 +1,23 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 urlpatterns = [
     path('hello', views.HealthView.as_view(), name='health'),
-    path('api/crossword/puzzle/<str:puzzle_id>', views.get_puzzle, name='get_puzzle'),
+    path('metrics', views.MetricsView.as_view(), name='metrics'),
+    path(
+        'api/crossword/puzzle/<str:puzzle_id>',
+        views.get_puzzle_fast if settings.PUZZLE_FAST_RESPONSE else views.get_puzzle,
+        name='get_puzzle',
+    ),
+    path('api/crossword/puzzles', views.get_puzzle_pack, name='get_puzzle_pack'),
+    path('api/crossword/check-word', views.ApiCheckWordView.as_view(), name='check_word'),
     path('api/crossword/submit', views.submit_puzzle, name='submit_puzzle'),
     path('api/crossword/leaderboard', views.get_leaderboard, name='get_leaderboard'),
     path('api/crossword/leaderboard/search', views.search_leaderboard, name='search_leaderboard'),
+    path('api/crossword/leaderboard/page', views.get_leaderboard_page, name='get_leaderboard_page'),
+    path('api/crossword/leaderboard/live', views.live_leaderboard, name='live_leaderboard'),
+    path('api/crossword/dashboard', views.get_dashboard, name='get_dashboard'),
     path('api/crossword/analytics', views.get_analytics, name='get_analytics'),
     path('api/crossword/game-history', views.get_game_history, name='get_game_history'),
 ]
@@ -1,15 +1,46 @@
+import asyncio
+import base64
+import binascii
 import json
 import re
 
-from django.http import HttpRequest, JsonResponse
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
 from django.views import View
+from django.views.decorators.http import require_safe
 from django.shortcuts import render, get_object_or_404
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, renderer_classes
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
 
-from .models import Crosswordpuzzlebank, Crosswordpuzzleresults
-from .serializers import CrosswordPuzzleSerializer
+from .models import Crosswordpuzzleresults, LeaderboardRollup
+from .leaderboard import (
+    OVERALL,
+    apply_results,
+    bucket_results,
+    check_rebuilt,
+    leaderboard_cache,
+    players_after,
+    players_before,
+    rank_indexes,
+    rank_of,
+    resolve_bucket,
+)
+from .db_pool import pool_metrics
+from .db_router import replicas
+from .live import LeaderboardHub, live_backend
+from .middleware import stick_to_primary
+from .result_columns import score_expression, typed_values
+from .puzzle_cache import get_compiled_puzzle, get_compiled_puzzles
+from .idempotency import recent_submissions, stored_submission_response, submission_key
+from .scoring import compute_score
+from .write_behind import submission_writer, write_behind_metrics
 from .auth import (
     ExternalAuthError,
     create_signed_otp_challenge,
@@ -99,6 +130,17 @@ class HealthView(View):
         return JsonResponse({'status': 'ok'})
 
 
+class MetricsView(View):
+    def get(self, request: HttpRequest) -> JsonResponse:
+        return JsonResponse({
+            'writeBehind': write_behind_metrics(),
+            'leaderboardCache': leaderboard_cache.metrics(),
+            'liveLeaderboard': leaderboard_hub.metrics(),
+            'databaseReplicas': replicas.metrics(),
+            'databasePools': pool_metrics(),
+        })
+
+
 class ApiLoginView(View):
     def post(self, request: HttpRequest) -> JsonResponse:
         payload = _json_body(request)
@@ -295,18 +337,113 @@ class ApiOtpVerifyView(View):
         )
 
 
-from .serializers import CrosswordPuzzleSerializer
+def _with_puzzle_cache_headers(response, etag):
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={settings.PUZZLE_HTTP_MAX_AGE}'
+    return response
+
+
+def _wants_answers(request) -> bool:
+    # ?answers=0 returns hints without answers; words are then checked via check-word
+    return request.GET.get('answers', '1').strip().lower() not in {'0', 'false', 'no'}
+
 
 @api_view(['GET'])
+@renderer_classes([JSONRenderer])
 def get_puzzle(request, puzzle_id):
-    try:
-        # User requested flexible ID, models has CharField
-        puzzle = Crosswordpuzzlebank.objects.get(puzzleid=puzzle_id)
-        serializer = CrosswordPuzzleSerializer(puzzle)
-        return Response(serializer.data)
-    except Crosswordpuzzlebank.DoesNotExist:
+    # JSON only: the ETag and Cache-Control describe one representation
+    # User requested flexible ID, models has CharField
+    compiled = get_compiled_puzzle(puzzle_id)
+    if compiled is None:
         return Response({'error': 'Puzzle not found'}, status=status.HTTP_404_NOT_FOUND)
 
+    payload, _, etag = compiled.response_parts(_wants_answers(request))
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return _with_puzzle_cache_headers(not_modified, etag)
+    return _with_puzzle_cache_headers(Response(payload), etag)
+
+@require_safe
+def get_puzzle_fast(request, puzzle_id):
+    """
+    Same contract as get_puzzle, but writes the compiled puzzle's pre-encoded body
+    straight into an HttpResponse, skipping DRF negotiation and rendering.
+    Enabled with the PUZZLE_FAST_RESPONSE setting.
+    """
+    compiled = get_compiled_puzzle(puzzle_id)
+    if compiled is None:
+        return JsonResponse({'error': 'Puzzle not found'}, status=404)
+
+    _, body, etag = compiled.response_parts(_wants_answers(request))
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return _with_puzzle_cache_headers(not_modified, etag)
+    return _with_puzzle_cache_headers(HttpResponse(body, content_type='application/json'), etag)
+
+
+class ApiCheckWordView(View):
+    def post(self, request: HttpRequest) -> JsonResponse:
+        payload = _json_body(request)
+        puzzle_id = str(payload.get('puzzleID') or '').strip()
+        direction = (payload.get('direction') or '').strip().lower()
+        answer = payload.get('answer')
+
+        if not puzzle_id or direction not in {'across', 'down'} or not isinstance(answer, str):
+            return JsonResponse({'error': 'puzzleID, direction (across/down) and answer are required.'}, status=400)
+        try:
+            cell_id = int(payload.get('cellID'))
+        except (TypeError, ValueError):
+            return JsonResponse({'error': 'cellID must be a number.'}, status=400)
+
+        compiled = get_compiled_puzzle(puzzle_id)
+        if compiled is None:
+            return JsonResponse({'error': 'Puzzle not found'}, status=404)
+
+        correct = compiled.answer_key.check_word(direction, cell_id, answer)
+        if correct is None:
+            return JsonResponse({'error': 'Word not found'}, status=404)
+        return JsonResponse({'correct': correct})
+
+
+@api_view(['GET'])
+def get_puzzle_pack(request):
+    """
+    Get several puzzles in one response so the client can prefetch upcoming rounds.
+    Accepts ?ids=101,102,103 or ?event=<name> (see PUZZLE_EVENT_ROUNDS).
+    Missing puzzles are returned as per-puzzle error entries in request order.
+    """
+    event = request.GET.get('event', '').strip()
+    if event:
+        puzzle_ids = settings.PUZZLE_EVENT_ROUNDS.get(event)
+        if puzzle_ids is None:
+            return Response({'error': 'Event not found'}, status=status.HTTP_404_NOT_FOUND)
+    else:
+        puzzle_ids = [x.strip() for x in request.GET.get('ids', '').split(',') if x.strip()]
+
+    if not puzzle_ids:
+        return Response({'error': 'ids or event parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(puzzle_ids) > settings.PUZZLE_PACK_MAX_SIZE:
+        return Response(
+            {'error': f'At most {settings.PUZZLE_PACK_MAX_SIZE} puzzles can be requested at once'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    compiled = get_compiled_puzzles(puzzle_ids)
+    with_answers = _wants_answers(request)
+    puzzles = []
+    for puzzle_id in puzzle_ids:
+        entry = compiled.get(str(puzzle_id))
+        if entry is None:
+            puzzles.append({'puzzleID': str(puzzle_id), 'error': 'Puzzle not found'})
+        else:
+            puzzles.append(entry.response_parts(with_answers)[0])
+
+    return Response({'puzzles': puzzles})
+
+
+SUBMISSION_NOT_SAVED = {'error': 'Could not save the result, please submit again'}
+
+
 @api_view(['POST'])
 def submit_puzzle(request):
     """
@@ -319,123 +456,142 @@ def submit_puzzle(request):
     submitted_grid = data.get('submittedPuzzle', {})
     time_remaining = data.get('timeRemaining', 0)
     team_name = data.get('teamName', 'Anonymous')
-    session_id = data.get('sessionID', None)
+    attempt_id = data.get('attemptID', None)
     user_email = data.get('email', None)
     
-    try:
-        puzzle = Crosswordpuzzlebank.objects.get(puzzleid=puzzle_id)
-    except Crosswordpuzzlebank.DoesNotExist:
+    compiled = get_compiled_puzzle(puzzle_id)
+    if compiled is None:
         return Response({'error': 'Puzzle not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    correct_answers = {}
-    
-    # Extract answers from across hints
-    if puzzle.accrosshintarray:
-        try:
-            across_hints = json.loads(puzzle.accrosshintarray.replace("'", '"')) if isinstance(puzzle.accrosshintarray, str) else puzzle.accrosshintarray
-            for hint in across_hints:
-                if 'answer' in hint and 'cellID' in hint:
-                   start_cell = int(hint['cellID'])
-                   answer_text = hint['answer'].upper()
-                   for i, char in enumerate(answer_text):
-                       cell_num = start_cell + i
-                       correct_answers[str(cell_num)] = char
-        except Exception as e:
-            print(f"Error parsing across hints: {e}")
-
-    # Extract answers from down hints
-    if puzzle.downhintarray:
-        try:
-            down_hints = json.loads(puzzle.downhintarray.replace("'", '"')) if isinstance(puzzle.downhintarray, str) else puzzle.downhintarray
-            for hint in down_hints:
-                if 'answer' in hint and 'cellID' in hint:
-                   start_cell = int(hint['cellID'])
-                   answer_text = hint['answer'].upper()
-                   for i, char in enumerate(answer_text):
-                       cell_num = start_cell + (i * 9) 
-                       correct_answers[str(cell_num)] = char
-        except Exception as e:
-             print(f"Error parsing down hints: {e}")
-
-    # Check which words are completely correct
-    correct_words_count = 0
-    total_words_count = 0
+    # Resends of one attempt (retries, double-clicks) get the stored result back
+    key = submission_key(attempt_id, puzzle_id)
+    if key is not None:
+        stored = stored_submission_response(key)
+        if stored is not None:
+            return Response(stored)
+
+    scored = compiled.answer_key.score(submitted_grid)
+    correct_words_count = scored.correct_words
+    total_words_count = scored.total_words
+    score = compute_score(correct_words_count, time_remaining)
+    all_words_correct = scored.all_words_correct
     
-    # Check across words
-    if puzzle.accrosshintarray:
-        try:
-            across_hints = json.loads(puzzle.accrosshintarray.replace("'", '"')) if isinstance(puzzle.accrosshintarray, str) else puzzle.accrosshintarray
-            total_words_count += len(across_hints)
-            for hint in across_hints:
-                if 'answer' in hint and 'cellID' in hint:
-                    start_cell = int(hint['cellID'])
-                    answer_text = hint['answer'].upper()
-                    word_correct = True
-                    for i, char in enumerate(answer_text):
-                        cell_num = str(start_cell + i)
-                        if submitted_grid.get(cell_num, '').upper() != char:
-                            word_correct = False
-                            break
-                    if word_correct:
-                        correct_words_count += 1
-        except Exception as e:
-            print(f"Error checking across words: {e}")
-    
-    # Check down words
-    if puzzle.downhintarray:
+    # Store result in database
+    from django.utils import timezone
+    fields = {
+        'puzzleid': puzzle_id,
+        'riderid': team_name,
+        'submittedpuzzle': json.dumps(submitted_grid),
+        'gamescore': str(score),
+        'duration': str(time_remaining),
+        'status': 1 if all_words_correct else 0,
+        'createddate': timezone.now(),
+        'email': user_email,
+        'attemptid': key[0] if key else None,
+        'correct_words': correct_words_count,
+        'total_words': total_words_count,
+        **typed_values(str(score), str(time_remaining)),
+    }
+    queued = settings.SUBMISSION_WRITE_BEHIND and submission_writer().enqueue(
+        dict(fields, createddate=fields['createddate'].isoformat())
+    )
+    if queued:
+        stick_to_primary(request, user_email)
+    else:
         try:
-            down_hints = json.loads(puzzle.downhintarray.replace("'", '"')) if isinstance(puzzle.downhintarray, str) else puzzle.downhintarray
-            total_words_count += len(down_hints)
-            for hint in down_hints:
-                if 'answer' in hint and 'cellID' in hint:
-                    start_cell = int(hint['cellID'])
-                    answer_text = hint['answer'].upper()
-                    word_correct = True
-                    for i, char in enumerate(answer_text):
-                        cell_num = str(start_cell + (i * 9))
-                        if submitted_grid.get(cell_num, '').upper() != char:
-                            word_correct = False
-                            break
-                    if word_correct:
-                        correct_words_count += 1
+            with transaction.atomic(using=router.db_for_write(Crosswordpuzzleresults)):
+                result = Crosswordpuzzleresults.objects.create(**fields)
+                apply_results([result])
+            stick_to_primary(request, user_email)
+            print(f"✅ Result saved successfully! Team: {team_name}, Score: {score}")
+        except IntegrityError as e:
+            # A concurrent request with the same (attemptID, puzzleID) won the insert
+            stored = stored_submission_response(key) if key else None
+            if stored is not None:
+                return Response(stored)
+            print(f"❌ Error saving result: {e}")
+            return Response(SUBMISSION_NOT_SAVED, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         except Exception as e:
-            print(f"Error checking down words: {e}")
-    
-    # Score: 1 point per correct word + time bonus only if 6 or more words are correct
-    if correct_words_count >= 6:
-        score = correct_words_count + (time_remaining * 0.1)
-    else:
-        score = correct_words_count
-    
-    # Check if all words are correct
-    all_words_correct = (correct_words_count == total_words_count)
+            print(f"❌ Error saving result: {e}")
+            import traceback
+            traceback.print_exc()
+            return Response(SUBMISSION_NOT_SAVED, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    # Store result in database
-    try:
-        from django.utils import timezone
-        result = Crosswordpuzzleresults.objects.create(
-            puzzleid=puzzle_id,
-            riderid=team_name,
-            submittedpuzzle=json.dumps(submitted_grid),
-            gamescore=str(score),
-            duration=str(time_remaining),
-            status=1 if all_words_correct else 0,
-            createddate=timezone.now(),
-            email=user_email
-        )
-        print(f"✅ Result saved successfully! Team: {team_name}, Score: {score}")
-    except Exception as e:
-        print(f"❌ Error saving result: {e}")
-        import traceback
-        traceback.print_exc()
-    
-    return Response({
+    response = {
         'score': score,
         'correctWords': correct_words_count,
         'totalWords': total_words_count,
         'allWordsCorrect': all_words_correct,
         'message': 'Submission successful'
-    })
+    }
+    if key is not None:
+        recent_submissions.put(key, response)
+    return Response(response)
+
+
+def _ranked_players(bucket):
+    """
+    Players ordered by total score as dicts with email, totalScore and roundsPlayed.
+    Read from the leaderboard rollups when LEADERBOARD_USE_ROLLUPS is on, otherwise
+    aggregated from the results in the bucket's createdDate range.
+    """
+    from django.db.models import Sum, Count
+
+    if settings.LEADERBOARD_USE_ROLLUPS:
+        return (
+            LeaderboardRollup.objects.filter(bucket=bucket)
+            .order_by('-total_score', 'email')
+            .values('email', totalScore=F('total_score'), roundsPlayed=F('rounds_played'))
+        )
+
+    # Aggregate results by email
+    return bucket_results(bucket).values('email').annotate(
+        totalScore=Sum(score_expression()),
+        roundsPlayed=Count('id')
+    ).order_by('-totalScore')
+
+
+def _leaderboard_bucket(params):
+    return resolve_bucket(params.get('filter', 'overall'), params.get('event'))
+
+
+UNKNOWN_EVENT = {'error': 'Unknown event'}
+
+
+def _ranked_player_entry(player):
+    return {
+        'rank': player.rank,
+        'email': player.email,
+        'totalScore': round(player.total_score, 1),
+        'roundsPlayed': player.rounds_played,
+    }
+
+
+def _search_rank_index(bucket, search_email, params):
+    # Top-level fields describe the exact email if it exists, else the best ranked
+    # match; ``matches`` pages through every match in rank order.
+    try:
+        page = max(int(params.get('page', 1)), 1)
+        page_size = min(max(int(params.get('pageSize', 20)), 1), 100)
+        radius = min(max(int(params.get('around', 0)), 0), 50)
+    except ValueError:
+        return Response({'error': 'page, pageSize and around must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    total, matches = rank_indexes.search(bucket, search_email, (page - 1) * page_size, page_size)
+    player = rank_indexes.rank(bucket, search_email)
+    if player is None and total:
+        player = matches[0] if page == 1 else rank_indexes.search(bucket, search_email, 0, 1)[1][0]
+    if player is None:
+        return Response({'error': 'Player not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    player_data = _ranked_player_entry(player)
+    player_data['matches'] = [_ranked_player_entry(p) for p in matches]
+    player_data['totalMatches'] = total
+    player_data['page'] = page
+    player_data['pageSize'] = page_size
+    if radius:
+        player_data['around'] = [_ranked_player_entry(p) for p in rank_indexes.around(bucket, player.email, radius)]
+    return Response(player_data)
 
 
 @api_view(['GET'])
@@ -443,32 +599,21 @@ def get_leaderboard(request):
     """
     Get leaderboard data aggregated by email.
     Returns top players with total score and rounds played.
-    Supports filter query parameter: ?filter=today
+    Supports filter query parameter: ?filter=today, ?filter=week, ?filter=event&event=<name>
     """
-    from django.db.models import Sum, Count, FloatField
-    from django.db.models.functions import Cast
-    from datetime import date
-    
     # Get filter parameter
-    filter_type = request.GET.get('filter', 'overall')
-    
-    # Base queryset
-    queryset = Crosswordpuzzleresults.objects
-    
-    # Apply date filter if 'today' is selected
-    if filter_type == 'today':
-        today = date.today()
-        queryset = queryset.filter(createddate__date=today)
-    
-    # Aggregate results by email
-    leaderboard = queryset.values('email').annotate(
-        totalScore=Sum(Cast('gamescore', FloatField())),
-        roundsPlayed=Count('id')
-    ).filter(
-        email__isnull=False
-    ).exclude(
-        email=''
-    ).order_by('-totalScore')[:10]
+    bucket = _leaderboard_bucket(request.GET)
+    if bucket is None:
+        return Response(UNKNOWN_EVENT, status=status.HTTP_404_NOT_FOUND)
+    check_rebuilt()
+    return Response(leaderboard_cache.get(bucket, lambda: _top_players(bucket)))
+
+
+def _top_players(bucket):
+    if settings.LEADERBOARD_RANK_INDEX:
+        return [_ranked_player_entry(player) for player in rank_indexes.top(bucket, 10)]
+
+    leaderboard = _ranked_players(bucket)[:10]
     
     # Format the response
     results = []
@@ -480,7 +625,49 @@ def get_leaderboard(request):
             'roundsPlayed': entry['roundsPlayed']
         })
     
-    return Response(results)
+    return results
+
+
+def _live_board(board):
+    # Bypasses leaderboard_cache: the hub only recomputes after a change and must
+    # not pick up a payload cached before it.
+    return _top_players(resolve_bucket(board))
+
+
+leaderboard_hub = LeaderboardHub(live_backend, _live_board, tick=settings.LEADERBOARD_LIVE_TICK_SECONDS)
+
+LIVE_KEEPALIVE_SECONDS = 15
+
+
+async def live_leaderboard(request):
+    """
+    Server-Sent Events stream of the top 10 (?filter=today or ?filter=week):
+    a ``snapshot`` event on connect, then ``delta`` events with the rows that
+    changed and the emails that dropped out, at most one per hub tick.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'The live leaderboard requires the ASGI application.'}, status=501)
+
+    board = request.GET.get('filter') if request.GET.get('filter') in ('today', 'week') else 'overall'
+    queue = await leaderboard_hub.subscribe(board)
+
+    async def events():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=LIVE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield f"event: {message['type']}\ndata: {json.dumps(message, separators=(',', ':'))}\n\n"
+        finally:
+            leaderboard_hub.unsubscribe(board, queue)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @api_view(['GET'])
@@ -488,36 +675,24 @@ def search_leaderboard(request):
     """
     Search for a specific player in the leaderboard by email.
     Returns player's rank, score, and rounds played even if not in top 10.
-    Supports filter query parameter: ?filter=today
+    Supports filter query parameter: ?filter=today, ?filter=week, ?filter=event&event=<name>
+    With the rank index enabled the response also pages through all matches
+    (?page=, ?pageSize=) and ?around=N adds the N players above and below.
     """
-    from django.db.models import Sum, Count, FloatField
-    from django.db.models.functions import Cast
-    from datetime import date
-    
     # Get search email and filter parameter
     search_email = request.GET.get('email', '').strip()
-    filter_type = request.GET.get('filter', 'overall')
+    bucket = _leaderboard_bucket(request.GET)
     
     if not search_email:
         return Response({'error': 'Email parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    # Base queryset
-    queryset = Crosswordpuzzleresults.objects
-    
-    # Apply date filter if 'today' is selected
-    if filter_type == 'today':
-        today = date.today()
-        queryset = queryset.filter(createddate__date=today)
+    if bucket is None:
+        return Response(UNKNOWN_EVENT, status=status.HTTP_404_NOT_FOUND)
+
+    if settings.LEADERBOARD_RANK_INDEX:
+        return _search_rank_index(bucket, search_email, request.GET)
     
     # Get all players ranked by score
-    all_players = queryset.values('email').annotate(
-        totalScore=Sum(Cast('gamescore', FloatField())),
-        roundsPlayed=Count('id')
-    ).filter(
-        email__isnull=False
-    ).exclude(
-        email=''
-    ).order_by('-totalScore')
+    all_players = _ranked_players(bucket)
     
     # Find the player and their rank
     player_found = False
@@ -542,90 +717,316 @@ def search_leaderboard(request):
     return Response(player_data)
 
 
+def _encode_cursor(*values):
+    raw = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    """The list of values in a cursor, or None if it was not made by _encode_cursor."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _leaderboard_cursor(row, rank):
+    return _encode_cursor(row.total_score, row.email, rank)
+
+
+def _around_rank(bucket, key, params):
+    """
+    Rank of the around= player: from the rank index when enabled, else only with
+    ?withRank=1, since counting the players ahead scans rank rows.
+    """
+    if settings.LEADERBOARD_RANK_INDEX:
+        player = rank_indexes.rank(bucket, key[1])
+        # The index matches the rollups read here unless it is mid-reload
+        if player is not None and (player.total_score, player.email) == key:
+            return player.rank
+    if params.get('withRank', '').strip().lower() in {'1', 'true', 'yes'}:
+        return rank_of(bucket, key)
+    return None
+
+
+def _rollup_entry(row, rank):
+    return {
+        'rank': rank,
+        'email': row.email,
+        'totalScore': round(row.total_score, 1),
+        'roundsPlayed': row.rounds_played,
+    }
+
+
+@api_view(['GET'])
+def get_leaderboard_page(request):
+    """
+    Keyset-paginated leaderboard read from the leaderboard rollups, ordered by
+    (totalScore desc, email). Only served with LEADERBOARD_USE_ROLLUPS, i.e. once
+    rebuild_leaderboard has filled the rollups; ranks come from the same rows.
+    ?filter= as for /leaderboard, ?pageSize= (default 20, max 100), ?cursor= from
+    nextCursor. ?around=<email>&radius=N returns the player with N rows above and below;
+    without the rank index its ranks (and those of pages after it) are null unless
+    ?withRank=1 asks for the O(rank) count.
+    """
+    if not settings.LEADERBOARD_USE_ROLLUPS:
+        return Response(
+            {'error': 'Leaderboard pages require LEADERBOARD_USE_ROLLUPS (run rebuild_leaderboard first).'},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+    bucket = _leaderboard_bucket(request.GET)
+    if bucket is None:
+        return Response(UNKNOWN_EVENT, status=status.HTTP_404_NOT_FOUND)
+    try:
+        page_size = min(max(int(request.GET.get('pageSize', 20)), 1), 100)
+        radius = min(max(int(request.GET.get('radius', 5)), 0), 50)
+    except ValueError:
+        return Response({'error': 'pageSize and radius must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    around = request.GET.get('around', '').strip()
+    if around:
+        player = LeaderboardRollup.objects.filter(bucket=bucket, email=around).first()
+        if player is None:
+            return Response({'error': 'Player not found'}, status=status.HTTP_404_NOT_FOUND)
+        key = (player.total_score, player.email)
+        rank = _around_rank(bucket, key, request.GET)
+        above = players_before(bucket, key, radius)
+        below = players_after(bucket, key, radius + 1)
+        rows = above + [player] + below[:radius]
+        first_rank = None if rank is None else rank - len(above)
+        results = [_rollup_entry(row, None if rank is None else first_rank + i) for i, row in enumerate(rows)]
+        return Response({
+            'results': results,
+            'rank': rank,
+            'nextCursor': _leaderboard_cursor(rows[-1], results[-1]['rank']) if len(below) > radius else None,
+        })
+
+    cursor = request.GET.get('cursor')
+    key, last_rank = None, 0
+    if cursor:
+        try:
+            score, email, last_rank = _decode_cursor(cursor)
+            key, last_rank = (float(score), str(email)), None if last_rank is None else int(last_rank)
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = players_after(bucket, key, page_size + 1)
+    page = rows[:page_size]
+    results = [_rollup_entry(row, None if last_rank is None else last_rank + i) for i, row in enumerate(page, 1)]
+    return Response({
+        'results': results,
+        'nextCursor': _leaderboard_cursor(page[-1], results[-1]['rank']) if len(rows) > page_size else None,
+    })
+
+
+def _player_stats(email):
+    """Analytics stats for one player from a single conditional-aggregation query."""
+    from django.db.models import Avg, Max, Count, Q
+
+    stats = Crosswordpuzzleresults.objects.filter(email=email).aggregate(
+        totalGames=Count('id'),
+        # Wins are games where status = 1 (all words correct), losses status = 0
+        totalWins=Count('id', filter=Q(status=1)),
+        totalLosses=Count('id', filter=Q(status=0)),
+        best=Max(score_expression()),
+        average=Avg(score_expression()),
+    )
+    total_games = stats['totalGames']
+
+    # Calculate win rate
+    win_rate = round((stats['totalWins'] / total_games * 100) if total_games > 0 else 0)
+
+    return {
+        'totalGames': total_games,
+        'totalWins': stats['totalWins'],
+        'totalLosses': stats['totalLosses'],
+        'bestScore': round(stats['best'] or 0, 2),
+        'averageScore': round(stats['average'] or 0, 2),
+        'winRate': win_rate
+    }
+
+
+# Everything game-history needs; submittedPuzzle is never loaded
+HISTORY_FIELDS = ('id', 'puzzleid', 'gamescore', 'duration', 'status', 'createddate')
+HISTORY_CHUNK_SIZE = 2000
+
+
+def _history_entry(row):
+    try:
+        score = float(row['gamescore']) if row['gamescore'] else 0
+    except:
+        score = 0
+
+    return {
+        'puzzleId': row['puzzleid'],
+        'score': round(score, 2),
+        'duration': row['duration'] or '0',
+        'status': row['status'],
+        'date': row['createddate'].isoformat() if row['createddate'] else None
+    }
+
+
+def _history_page(email, after, limit, using=None):
+    """
+    Up to ``limit`` projected result rows of a player ordered by (createddate, id),
+    after the (createddate, id) key ``after``. Rows without a date sort first, as
+    NULLs do in MySQL and SQLite.
+    """
+    from django.db.models import Q
+
+    rows = Crosswordpuzzleresults.objects.using(using).filter(email=email)
+    if after is not None:
+        created, last_id = after
+        if created is None:
+            rows = rows.filter(Q(createddate__isnull=True, id__gt=last_id) | Q(createddate__isnull=False))
+        else:
+            rows = rows.filter(Q(createddate=created, id__gt=last_id) | Q(createddate__gt=created))
+    return list(rows.order_by('createddate', 'id').values(*HISTORY_FIELDS)[:limit])
+
+
+def _history_key(row):
+    return row['createddate'], row['id']
+
+
+def _history_chunk(email, after, using):
+    """
+    One keyset chunk of a player's history as comma-joined JSON items, and the
+    key to continue after (None after the last chunk).
+    """
+    rows = _history_page(email, after, HISTORY_CHUNK_SIZE, using)
+    text = ','.join(json.dumps(_history_entry(row), ensure_ascii=False, separators=(',', ':')) for row in rows)
+    return text, _history_key(rows[-1]) if len(rows) == HISTORY_CHUNK_SIZE else None
+
+
+# Keyset chunks rather than one .iterator(): mysqlclient buffers a whole
+# result set client-side, so this is what keeps memory flat on MySQL.
+def _stream_history(email, using):
+    yield '['
+    after, separator = None, ''
+    while True:
+        text, after = _history_chunk(email, after, using)
+        if text:
+            yield separator + text
+            separator = ','
+        if after is None:
+            break
+    yield ']'
+
+
+async def _astream_history(email, using):
+    # Under ASGI Django would drain a sync iterator into a list first
+    yield '['
+    after, separator = None, ''
+    while True:
+        text, after = await sync_to_async(_history_chunk)(email, after, using)
+        if text:
+            yield separator + text
+            separator = ','
+        if after is None:
+            break
+    yield ']'
+
+
+def _player_rank(email):
+    """Overall rank from the rank index or the rollups; None when neither is enabled."""
+    if settings.LEADERBOARD_RANK_INDEX:
+        player = rank_indexes.rank(OVERALL, email)
+        return _ranked_player_entry(player) if player is not None else None
+    if settings.LEADERBOARD_USE_ROLLUPS:
+        row = LeaderboardRollup.objects.filter(bucket=OVERALL, email=email).first()
+        return _rollup_entry(row, rank_of(OVERALL, (row.total_score, row.email))) if row is not None else None
+    return None
+
+
+@api_view(['GET'])
+def get_dashboard(request):
+    """
+    Stats, overall rank and recent games of one player in one response.
+    ?email= (required), ?historyLimit= most recent games (default 100, max 500),
+    returned oldest first like game-history.
+    """
+    email = request.GET.get('email')
+    if not email:
+        return Response({'error': 'Email parameter is required'}, status=400)
+    try:
+        limit = min(max(int(request.GET.get('historyLimit', 100)), 1), 500)
+    except ValueError:
+        return Response({'error': 'historyLimit must be an integer'}, status=400)
+
+    recent = list(
+        Crosswordpuzzleresults.objects.filter(email=email).order_by('-createddate', '-id').values(*HISTORY_FIELDS)[: limit + 1]
+    )
+    truncated = len(recent) > limit
+    history = [_history_entry(result) for result in reversed(recent[:limit])]
+
+    return Response({
+        'stats': _player_stats(email),
+        'rank': _player_rank(email),
+        'history': history,
+        'historyTruncated': truncated,
+    })
+
+
 @api_view(['GET'])
 def get_analytics(request):
     """
     Get analytics data for a specific user by email.
     Returns total games, wins, losses, best score, average score, and win rate.
     """
-    from django.db.models import Avg, Max, Count, FloatField, Q
-    from django.db.models.functions import Cast
-    
     # Get email from query parameter
     email = request.GET.get('email')
     
     if not email:
         return Response({'error': 'Email parameter is required'}, status=400)
     
-    # Get all results for this email
-    user_results = Crosswordpuzzleresults.objects.filter(email=email)
-    
-    # Calculate statistics
-    total_games = user_results.count()
-    
-    # Wins are games where status = 1 (all words correct)
-    total_wins = user_results.filter(status=1).count()
-    
-    # Losses are games where status = 0 (not all words correct)
-    total_losses = user_results.filter(status=0).count()
-    
-    # Get best score (max gamescore)
-    best_score_result = user_results.aggregate(
-        best=Max(Cast('gamescore', FloatField()))
-    )
-    best_score = best_score_result['best'] or 0
-    
-    # Get average score
-    avg_score_result = user_results.aggregate(
-        average=Avg(Cast('gamescore', FloatField()))
-    )
-    average_score = avg_score_result['average'] or 0
-    
-    # Calculate win rate
-    win_rate = round((total_wins / total_games * 100) if total_games > 0 else 0)
-    
-    return Response({
-        'totalGames': total_games,
-        'totalWins': total_wins,
-        'totalLosses': total_losses,
-        'bestScore': round(best_score, 2),
-        'averageScore': round(average_score, 2),
-        'winRate': win_rate
-    })
+    return Response(_player_stats(email))
 
 
 @api_view(['GET'])
 def get_game_history(request):
     """
     Get detailed game history for a specific user by email.
-    Returns list of all games with scores, dates, and status.
+    Returns list of all games with scores, dates, and status, streamed.
+    With ?pageSize= or ?cursor= returns {'games', 'nextCursor'} pages instead
+    (pageSize default 50, max 500).
     """
-    from django.db.models import FloatField
-    from django.db.models.functions import Cast
-    
+    from django.utils.dateparse import parse_datetime
+
     # Get email from query parameter
     email = request.GET.get('email')
     
     if not email:
         return Response({'error': 'Email parameter is required'}, status=400)
-    
-    # Get all results for this email ordered by date
-    user_results = Crosswordpuzzleresults.objects.filter(email=email).order_by('createddate')
-    
-    # Format the response
-    games = []
-    for result in user_results:
+
+    if 'pageSize' not in request.GET and 'cursor' not in request.GET:
+        stream = _astream_history if isinstance(request._request, ASGIRequest) else _stream_history
+        # Chosen now: the stream is read after ReadYourWritesMiddleware's use_primary()
+        # has ended, and every chunk should come from the same database
+        using = router.db_for_read(Crosswordpuzzleresults)
+        return StreamingHttpResponse(stream(email, using), content_type='application/json')
+
+    try:
+        page_size = min(max(int(request.GET.get('pageSize', 50)), 1), 500)
+    except ValueError:
+        return Response({'error': 'pageSize must be an integer'}, status=400)
+
+    after = None
+    if request.GET.get('cursor'):
         try:
-            score = float(result.gamescore) if result.gamescore else 0
-        except:
-            score = 0
-            
-        games.append({
-            'puzzleId': result.puzzleid,
-            'score': round(score, 2),
-            'duration': result.duration or '0',
-            'status': result.status,
-            'date': result.createddate.isoformat() if result.createddate else None
-        })
-    
-    return Response(games)
+            created, last_id = _decode_cursor(request.GET['cursor'])
+            after = (parse_datetime(created) if created else None, int(last_id))
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid cursor'}, status=400)
+
+    rows = _history_page(email, after, page_size + 1)
+    page = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size:
+        created, last_id = _history_key(page[-1])
+        next_cursor = _encode_cursor(created.isoformat() if created else None, last_id)
+
+    return Response({
+        'games': [_history_entry(row) for row in page],
+        'nextCursor': next_cursor,
+    })
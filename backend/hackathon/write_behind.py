@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, close_old_connections, router, transaction
+from django.utils.dateparse import parse_datetime
+
+from .db_pool import PoolTimeout
+from .leaderboard import apply_results
+from .models import Crosswordpuzzleresults
+from .result_columns import TYPED_FIELDS
+
+try:
+    import fcntl
+except ImportError:  # Windows: spools of other live processes cannot be told apart
+    fcntl = None
+
+
+SPOOL_PREFIX = 'submissions-'
+DEAD_LETTER_NAME = 'dead-letter.jsonl'
+FLUSH_MAX_BACKOFF_SECONDS = 30.0
+# MySQL errors that go away on a retry: too many connections, lock wait
+# timeout, deadlock, and the client's can't connect / server gone / lost
+# connection codes. Any other OperationalError (e.g. 1054 unknown column) won't.
+TRANSIENT_MYSQL_ERRORS = {1040, 1205, 1213, 2002, 2003, 2006, 2013}
+
+
+def _to_model(record: dict) -> Crosswordpuzzleresults:
+    fields = dict(record['fields'])
+    if not settings.RESULTS_TYPED_COLUMNS_WRITE:
+        # Spooled while the typed columns were still written
+        for name in TYPED_FIELDS:
+            fields.pop(name, None)
+    if fields.get('createddate'):
+        fields['createddate'] = parse_datetime(fields['createddate'])
+    return Crosswordpuzzleresults(**fields)
+
+
+def _transient(exc: BaseException) -> bool:
+    if isinstance(exc, (InterfaceError, PoolTimeout)):
+        return True
+    if not isinstance(exc, OperationalError):
+        return False
+    code = exc.args[0] if exc.args else None
+    if isinstance(code, int):
+        return code in TRANSIENT_MYSQL_ERRORS
+    return 'locked' in str(exc)  # SQLite: database is locked
+
+
+def dead_letter(spool_dir: Path, record: dict, exc: BaseException) -> None:
+    """
+    Set aside a record that cannot be stored; ``replay_submission_spool
+    --dead-letters`` retries them once the cause is fixed.
+    """
+    entry = {'record': record, 'error': f'{type(exc).__name__}: {exc}'}
+    with open(Path(spool_dir) / DEAD_LETTER_NAME, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+    print(f"❌ Dead-lettered queued result {record['seq']}: {exc}")
+
+
+def _store(records: list[dict]) -> int:
+    """
+    Insert records not stored yet and add them to the leaderboard rollups in one
+    transaction, so a retried or replayed batch is never counted twice.
+    """
+    rows = {}
+    for record in records:
+        row = _to_model(record)
+        rows.setdefault((row.attemptid, str(row.puzzleid)) if row.attemptid else record['seq'], row)
+
+    with transaction.atomic(using=router.db_for_write(Crosswordpuzzleresults)):
+        keyed = [key for key in rows if isinstance(key, tuple)]
+        if keyed:
+            stored = set(
+                Crosswordpuzzleresults.objects.filter(
+                    attemptid__in={attempt for attempt, _ in keyed},
+                    puzzleid__in={puzzle for _, puzzle in keyed},
+                ).values_list('attemptid', 'puzzleid')
+            )
+            for attempt, puzzle in stored:
+                rows.pop((attempt, str(puzzle)), None)
+        new_rows = list(rows.values())
+        Crosswordpuzzleresults.objects.bulk_create(new_rows, ignore_conflicts=True)
+        apply_results(new_rows)
+    return len(new_rows)
+
+
+class SubmissionWriter:
+    """
+    Write-behind persistence for scored submissions.
+
+    Each record is appended to a per-process spool file before it is queued, and
+    a background thread bulk_creates queued records when ``batch_size`` is reached
+    or ``flush_interval`` elapses. Flushed records are acknowledged in the spool;
+    unacknowledged records in spools left behind by dead processes are replayed
+    when a writer starts (at process start, see HackathonConfig.ready, and in
+    each forked worker). A full queue makes ``enqueue`` return False so the
+    caller can fall back to a synchronous insert.
+    """
+
+    def __init__(
+        self,
+        spool_dir: Path,
+        max_queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        fsync: bool = False,
+    ):
+        self.spool_dir = Path(spool_dir)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.fsync = fsync
+        self.max_queue_size = max(1, int(max_queue_size))
+        self._pid: int | None = None
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._stopping_at_exit = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_queue_size)
+        self._spool_lock = threading.Lock()
+        self._spool = None
+        self._pending = 0
+        self._stop = threading.Event()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'enqueued': 0,
+            'rejected': 0,
+            'flushed': 0,
+            'flushes': 0,
+            'flushErrors': 0,
+            'deadLettered': 0,
+            'replayed': 0,
+            'lastFlushMs': 0.0,
+            'maxFlushMs': 0.0,
+            'totalFlushMs': 0.0,
+        }
+
+    def start(self) -> None:
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid() and self._thread is not None:
+                self._forget_parent()
+            if self._thread is not None:
+                return
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            path = self.spool_dir / f'{SPOOL_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl'
+            self._spool = open(path, 'a+', encoding='utf-8')
+            if fcntl is not None:
+                fcntl.flock(self._spool.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='submission-writer', daemon=True)
+            self._thread.start()
+            if not self._stopping_at_exit:
+                atexit.register(self.stop)
+                self._stopping_at_exit = True
+
+    def _forget_parent(self) -> None:
+        # A forked child (e.g. a gunicorn --preload worker) inherits the writer
+        # but not its thread. The queued records and the spool stay the parent's:
+        # drop this process's copy of the spool handle so only the parent holds
+        # the lock, and start over with a queue, locks and spool of its own.
+        # (Same idea as hackathon.db_pool's _check_fork.)
+        if self._spool is not None:
+            try:
+                self._spool.close()
+            except OSError:
+                pass
+        self._thread = None
+        self._reset()
+
+    def enqueue(self, fields: dict) -> bool:
+        self.start()
+        record = {'seq': uuid.uuid4().hex, 'fields': fields}
+        with self._spool_lock:
+            if self._queue.full():
+                self._bump('rejected')
+                return False
+            self._append({'record': record})
+            self._pending += 1
+            self._queue.put_nowait(record)
+        self._bump('enqueued')
+        return True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if self._thread is None or self._pid != os.getpid():
+            return  # nothing started here; a forked child must not touch the parent's spool
+        self._stop.set()
+        self._thread.join(timeout)
+        with self._spool_lock:
+            if self._pending == 0 and not self._spool.closed:
+                self._spool.close()
+                Path(self._spool.name).unlink(missing_ok=True)
+
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            data = dict(self._metrics)
+        flushes = data.pop('totalFlushMs')
+        data['avgFlushMs'] = round(flushes / data['flushes'], 3) if data['flushes'] else 0.0
+        data['queueDepth'] = self._queue.qsize()
+        data['unflushed'] = self._pending
+        data['queueCapacity'] = self._queue.maxsize
+        return data
+
+    def _bump(self, name: str, amount: int = 1) -> None:
+        with self._metrics_lock:
+            self._metrics[name] += amount
+
+    def _append(self, entry: dict) -> None:
+        self._spool.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self._spool.flush()
+        if self.fsync:
+            os.fsync(self._spool.fileno())
+
+    def _run(self) -> None:
+        self._replay_orphans()
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch: list[dict]) -> bool:
+        """
+        Store a batch. Lost connections, deadlocks and timeouts are retried with
+        backoff until it is stored: the players were already told their
+        submission succeeded. Any other error will not go away by retrying, so
+        the batch is split up and a record that fails on its own is dead-lettered
+        (see dead_letter) and acknowledged instead of blocking the queue.
+        Returns False only when shutdown interrupts the retries.
+        """
+        started = time.perf_counter()
+        attempt = 0
+        stored = True
+        while True:
+            close_old_connections()
+            try:
+                _store(batch)
+                break
+            except Exception as exc:
+                attempt += 1
+                print(f"❌ Error flushing {len(batch)} queued results (attempt {attempt}): {exc}")
+                traceback.print_exc()
+                self._bump('flushErrors')
+                if not _transient(exc):
+                    if len(batch) > 1:
+                        return all([self._flush([record]) for record in batch])
+                    dead_letter(self.spool_dir, batch[0], exc)
+                    self._bump('deadLettered')
+                    stored = False
+                    break
+            if self._stop.wait(min(0.5 * 2 ** (attempt - 1), FLUSH_MAX_BACKOFF_SECONDS)):
+                # Shutting down: the spool keeps the batch for the next start
+                return False
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._spool_lock:
+            self._append({'ack': [record['seq'] for record in batch]})
+            self._pending -= len(batch)
+            if self._pending == 0:
+                self._spool.seek(0)
+                self._spool.truncate()
+        if not stored:
+            return True
+        with self._metrics_lock:
+            self._metrics['flushed'] += len(batch)
+            self._metrics['flushes'] += 1
+            self._metrics['lastFlushMs'] = round(elapsed_ms, 3)
+            self._metrics['maxFlushMs'] = max(self._metrics['maxFlushMs'], round(elapsed_ms, 3))
+            self._metrics['totalFlushMs'] += elapsed_ms
+        return True
+
+    def _replay_orphans(self) -> None:
+        own = Path(self._spool.name).resolve()
+        for path in sorted(self.spool_dir.glob(f'{SPOOL_PREFIX}*.jsonl')):
+            if path.resolve() == own:
+                continue
+            try:
+                replayed = replay_spool(path)
+            except BlockingIOError:
+                continue  # still owned by a live process
+            except Exception as exc:
+                print(f"❌ Error replaying {path.name}: {exc}")
+                traceback.print_exc()
+                continue
+            self._bump('replayed', replayed)
+
+
+def read_spool(path: Path) -> list[dict]:
+    """Return records in a spool file that were never acknowledged."""
+    records: dict[str, dict] = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn final line from a crash mid-write
+            if 'record' in entry:
+                records[entry['record']['seq']] = entry['record']
+            for seq in entry.get('ack', ()):
+                records.pop(seq, None)
+    return list(records.values())
+
+
+def replay_spool(path: Path) -> int:
+    """
+    Insert the unacknowledged records of an abandoned spool file, delete it and
+    return how many were stored. Records that fail for a non-transient reason are dead-lettered; a transient
+    error is raised with the file left in place (and the records stored so far
+    acknowledged in it) for a later replay. Raises BlockingIOError if another
+    live process still holds the spool.
+    """
+    with open(path, 'a+', encoding='utf-8') as lock_handle:
+        if fcntl is not None:
+            fcntl.flock(lock_handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        records = read_spool(path)
+        dead = 0
+        try:
+            if records:
+                _store(records)
+        except Exception as exc:
+            if _transient(exc):
+                raise
+            for record in records:
+                try:
+                    _store([record])
+                except Exception as record_exc:
+                    if _transient(record_exc):
+                        raise
+                    dead_letter(path.parent, record, record_exc)
+                    dead += 1
+                lock_handle.write(json.dumps({'ack': [record['seq']]}, separators=(',', ':')) + '\n')
+                lock_handle.flush()
+        path.unlink()
+    return len(records) - dead
+
+
+def replay_dead_letters(spool_dir: Path) -> tuple[int, int]:
+    """
+    Retry dead-lettered records once; returns (stored, still failing). Records
+    that fail again are written back to the dead-letter file.
+    """
+    path = Path(spool_dir) / DEAD_LETTER_NAME
+    if not path.exists():
+        return 0, 0
+    # Writers append to the file by name, so new dead letters go to a fresh file
+    claimed = path.with_name(f'{DEAD_LETTER_NAME}.{os.getpid()}-{uuid.uuid4().hex[:8]}')
+    path.rename(claimed)
+    stored = failed = 0
+    entries = []
+    with open(claimed, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    for entry in entries:
+        try:
+            _store([entry['record']])
+            stored += 1
+        except Exception as exc:
+            dead_letter(spool_dir, entry['record'], exc)
+            failed += 1
+    claimed.unlink()
+    return stored, failed
+
+
+_writer: SubmissionWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def submission_writer() -> SubmissionWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = SubmissionWriter(
+                    spool_dir=settings.SUBMISSION_SPOOL_DIR,
+                    max_queue_size=settings.SUBMISSION_QUEUE_MAX_SIZE,
+                    batch_size=settings.SUBMISSION_FLUSH_BATCH_SIZE,
+                    flush_interval=settings.SUBMISSION_FLUSH_INTERVAL_SECONDS,
+                    fsync=settings.SUBMISSION_SPOOL_FSYNC,
+                )
+    return _writer
+
+
+def write_behind_metrics() -> dict | None:
+    return _writer.metrics() if _writer is not None else None
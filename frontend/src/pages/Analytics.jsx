@@ -30,6 +30,7 @@ export default function Analytics() {
   const [showModal, setShowModal] = useState(false);
   const [modalType, setModalType] = useState('');
   const [gameHistory, setGameHistory] = useState([]);
+  const [historyTruncated, setHistoryTruncated] = useState(false);
   const [stats, setStats] = useState({
     totalGames: 0,
     totalWins: 0,
@@ -61,14 +62,16 @@ export default function Analytics() {
   const fetchAnalytics = async () => {
     try {
       const userEmail = localStorage.getItem('userEmail') || 'anonymous@example.com';
-      const response = await fetch(`http://127.0.0.1:8000/api/crossword/analytics?email=${userEmail}`);
+      const response = await fetch(`http://127.0.0.1:8000/api/crossword/dashboard?email=${userEmail}`);
       
       if (!response.ok) {
         throw new Error('Failed to fetch analytics');
       }
       
       const data = await response.json();
-      setStats(data);
+      setStats(data.stats);
+      setGameHistory(data.history);
+      setHistoryTruncated(data.historyTruncated);
     } catch (error) {
       console.error("Failed to fetch analytics:", error);
       // Set mock data if API fails
@@ -105,8 +108,8 @@ export default function Analytics() {
     setModalType(type);
     setShowModal(true);
     
-    // Fetch game history if needed for detailed views
-    if (type === 'attempts' || type === 'progression' || type === 'timeSeries') {
+    // The dashboard only carries recent games; fetch the full history if it was cut
+    if (historyTruncated && (type === 'attempts' || type === 'progression' || type === 'timeSeries')) {
       await fetchGameHistory();
     }
   };
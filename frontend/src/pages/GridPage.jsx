@@ -11,6 +11,11 @@ import { CiWallet } from "react-icons/ci";
 import Wallet from "./Wallet";
 
 
+function newAttemptID() {
+  if (window.crypto?.randomUUID) return window.crypto.randomUUID();
+  return 'attempt_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
+}
+
 function GridPage() {
    const rounds = [101, 102, 103, 105, 106];
   const navigate = useNavigate();
@@ -24,6 +29,8 @@ function GridPage() {
   const [highlightCells, setHighlightCells] = useState([]);
   const [direction, setDirection] = useState('across'); // 'across' or 'down'
   const [puzzle, setPuzzle] = useState(null);
+  const gridRows = puzzle?.rows ?? 9;
+  const gridCols = puzzle?.cols ?? 9;
   const [grid, setGrid] = useState(location.state?.gridData || {});
   const [seconds, setSeconds] = useState(location.state?.timeRemaining ?? 300); // Restore timer or default to 5 min
   const [pencil, setPencil] = useState(false);
@@ -44,6 +51,13 @@ function GridPage() {
   const [showWallet, setShowWallet] = useState(false);
   const [showWalletTooltip, setShowWalletTooltip] = useState(false);
   const [walletBalance, setWalletBalance] = useState(100);
+  // One id per attempt at a round: resends of a submit share it, a retry gets a new one
+  const attemptID = useRef(null);
+
+  // Every navigation here (next round, retry from the score card, replay) starts an attempt
+  useEffect(() => {
+    attemptID.current = newAttemptID();
+  }, [location.key]);
 
   // Track window width for responsive design
   useEffect(() => {
@@ -217,7 +231,7 @@ const handleKeyDown = (cell, e) => {
   const blackCells = puzzle?.blackBoxArray || [];
   
   const moveToCell = (targetCell) => {
-    if (targetCell >= 1 && targetCell <= 81 && !blackCells.includes(targetCell)) {
+    if (targetCell >= 1 && targetCell <= gridRows * gridCols && !blackCells.includes(targetCell)) {
       setActiveCell(targetCell);
       handleCellClick(targetCell);
       setTimeout(() => {
@@ -230,11 +244,11 @@ const handleKeyDown = (cell, e) => {
   switch(e.key) {
     case 'ArrowUp':
       e.preventDefault();
-      moveToCell(cell - 9);
+      moveToCell(cell - gridCols);
       break;
     case 'ArrowDown':
       e.preventDefault();
-      moveToCell(cell + 9);
+      moveToCell(cell + gridCols);
       break;
     case 'ArrowLeft':
       e.preventDefault();
@@ -267,7 +281,7 @@ const handleKeyDown = (cell, e) => {
 };
 
 const getDownWordCells = (startCell, length) => {
-  return Array.from({ length }, (_, i) => startCell + (i * 9));
+  return Array.from({ length }, (_, i) => startCell + (i * gridCols));
 };
 
 const handleCellClick = (cell) => {
@@ -347,6 +361,7 @@ const handleCellClick = (cell) => {
         puzzleID: puzzle.puzzleID,
         teamName: teamName,
         sessionID: sessionID,
+        attemptID: attemptID.current,
         email: userEmail,
         // submittedPuzzle: grid,
         submittedPuzzle: Object.fromEntries(
@@ -383,7 +398,7 @@ const handleCellClick = (cell) => {
         const startCell = parseInt(hint.cellID);
         const answer = hint.answer.toUpperCase();
         for (let i = 0; i < answer.length; i++) {
-          correctAnswers[startCell + (i * 9)] = answer[i];
+          correctAnswers[startCell + (i * gridCols)] = answer[i];
         }
       });
 
@@ -457,6 +472,8 @@ const handleCellClick = (cell) => {
     if (!resultData) return;
     
     setShowContinuePopup(false);
+    // Playing on is a new attempt; its submit must be scored, not replayed
+    attemptID.current = newAttemptID();
     
     // Reset the results view and continue playing with current progress
     setTimeout(() => {
@@ -510,7 +527,7 @@ const handleCellClick = (cell) => {
       const startCell = parseInt(hint.cellID);
       const answer = hint.answer.toUpperCase();
       for (let i = 0; i < answer.length; i++) {
-        if (startCell + (i * 9) === cellNum) {
+        if (startCell + (i * gridCols) === cellNum) {
           return answer[i];
         }
       }
@@ -710,8 +727,8 @@ const handleCellClick = (cell) => {
               <h5>Enjoy Solving, Best of Luck!</h5>
             </div>
 
-            <div className="crossword-grid">
-              {Array.from({ length: 81 }, (_, i) => {
+            <div className="crossword-grid" style={{ '--grid-rows': gridRows, '--grid-cols': gridCols }}>
+              {Array.from({ length: gridRows * gridCols }, (_, i) => {
                 const cell = i + 1;
                 const isBlack = blackCells.includes(cell);
                 const showNumber = clueNumbers.has(cell);
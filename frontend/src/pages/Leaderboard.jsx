@@ -30,6 +30,29 @@ export default function Leaderboard() {
     setTimeout(() => setLoaded(true), 100);
   }, [filter]);
 
+  // Live updates pushed by the server (only available when served over ASGI)
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return;
+    const url = filter === 'today'
+      ? 'http://127.0.0.1:8000/api/crossword/leaderboard/live?filter=today'
+      : 'http://127.0.0.1:8000/api/crossword/leaderboard/live';
+    const source = new EventSource(url);
+    source.addEventListener('snapshot', (event) => {
+      setLeaderboardData(JSON.parse(event.data).rows);
+      setLoading(false);
+    });
+    source.addEventListener('delta', (event) => {
+      const { changed, removed } = JSON.parse(event.data);
+      setLeaderboardData((rows) => {
+        const byEmail = new Map(rows.map((row) => [row.email, row]));
+        removed.forEach((email) => byEmail.delete(email));
+        changed.forEach((row) => byEmail.set(row.email, row));
+        return [...byEmail.values()].sort((a, b) => a.rank - b.rank);
+      });
+    });
+    return () => source.close();
+  }, [filter]);
+
   // Track window width for responsive design
   useEffect(() => {
     const handleResize = () => setWindowWidth(window.innerWidth);